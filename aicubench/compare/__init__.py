@@ -1,6 +1,31 @@
 # aicubench/compare - Multi-model comparison module
-from .runner import ComparisonRunner
-from .models import ModelConfig, load_model_config, BUILTIN_MODELS
-from .grid import create_comparison_grid, create_benchmark_card
+# Exports load on first use, so scripts importing one module (e.g.
+# aicubench.compare.client) do not pull in PIL, the scheduler and the rest
+from importlib import import_module
 
-__all__ = ["ComparisonRunner", "ModelConfig", "load_model_config", "BUILTIN_MODELS", "create_comparison_grid", "create_benchmark_card"]
+_EXPORTS = {
+    "ComfyClient": "client",
+    "RetryPolicy": "client",
+    "ComparisonRunner": "runner",
+    "AsyncComfyClient": "aio",
+    "AsyncComparisonRunner": "aio",
+    "MultiServerScheduler": "scheduler",
+    "DownloadQueue": "downloads",
+    "RunJournal": "journal",
+    "run_sweep": "sweep",
+    "ResultsStore": "store",
+    "TelemetrySampler": "telemetry",
+    "ModelConfig": "models",
+    "load_model_config": "models",
+    "BUILTIN_MODELS": "models",
+    "create_comparison_grid": "grid",
+    "create_benchmark_card": "grid",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(f".{_EXPORTS[name]}", __name__), name)
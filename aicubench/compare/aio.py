@@ -0,0 +1,883 @@
+"""
+asyncio comparison runner: the harness core
+
+Everything that talks to ComfyUI is a coroutine here, on aiohttp: HTTP
+through AsyncComfyClient and the /ws event stream through EventStream.
+ComparisonRunner is the blocking face of this runner (see runner.py).
+"""
+import asyncio
+import functools
+import json
+import time
+import uuid
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from .client import AsyncComfyClient, RetryPolicy
+from .downloads import image_paths, result_images
+from .models import ModelConfig, BUILTIN_MODELS
+from .monitor import EventStream, PromptTrace, describe_failure
+from .pipeline import WindowTuner
+from .runner import (
+    Completion,
+    GenerationJob,
+    GenerationResult,
+    PendingPrompt,
+    PhaseTimings,
+    QUEUE_CHECK_INTERVAL,
+    affinity_key,
+    describe_queue_error,
+    model_stats,
+    order_by_affinity,
+    print_comparison_header,
+    print_comparison_summary,
+    print_model_stats,
+    queue_states,
+    result_to_dict,
+)
+from .stats import TimingStats
+from .telemetry import TelemetrySampler
+from .templates import TemplateCache, WorkflowTemplate, index_injection_points
+from .timeouts import TimeoutPolicy
+
+__all__ = ["AsyncComfyClient", "AsyncComparisonRunner", "RetryPolicy", "in_thread"]
+
+
+async def in_thread(fn: Callable, *args, **kwargs) -> Any:
+    """Run a blocking call in the loop's default executor (asyncio.to_thread needs 3.9)"""
+    return await asyncio.get_running_loop().run_in_executor(None, functools.partial(fn, *args, **kwargs))
+
+
+class AsyncComparisonRunner:
+    """Run image generation across multiple models, inside an event loop.
+
+    Completion follows the /ws event stream (one connection per runner)
+    and falls back to polling /history. At most max_in_flight prompts are
+    on the server at once: run_job calls wait for a slot, and run_jobs
+    keeps that many queued (0 auto-tunes it). Cancelling a run_job task,
+    or its timeout expiring, also cancels the prompt on the server.
+
+    A runner belongs to the event loop it is first used on.
+    """
+
+    def __init__(
+        self,
+        comfyui_url: str = "http://127.0.0.1:8188",
+        workflow_dir: Optional[Path] = None,
+        output_dir: Optional[Path] = None,
+        completion: str = "ws",
+        client_id: Optional[str] = None,
+        verbose: bool = False,
+        max_in_flight: int = 4,
+        timeout: Optional[float] = None,
+        poll_interval: float = 1.0,
+        affinity: bool = True,
+        http: Optional[AsyncComfyClient] = None,
+        telemetry: Optional[TelemetrySampler] = None,
+        timeouts: Optional[TimeoutPolicy] = None,
+    ):
+        """completion: "ws" (WebSocket events, polling if unavailable) or "poll"
+        max_in_flight: prompts queued on the server at once (the backpressure
+            limit and the run_jobs window; 0 = auto-tune the window)
+        timeout: default cap in seconds on waiting for a prompt (None: the
+            timeouts policy's ceiling); hung prompts are caught sooner by
+            their per-model execution limit
+        poll_interval: seconds between /history polls without a WebSocket
+        affinity: group jobs by checkpoint/LoRA set to minimize model swaps
+        http: client to share or configure (timeouts, retries); one is created if omitted
+        telemetry: running sampler; each result gets a summary over its execution window
+        timeouts: per-model execution limits, learned from finished jobs (a fresh policy if omitted)
+        """
+        if completion not in ("ws", "poll"):
+            raise ValueError(f"Unknown completion mode: {completion}")
+        self.comfyui_url = comfyui_url.rstrip("/")
+        self.http = http or AsyncComfyClient(self.comfyui_url)
+        self.templates = TemplateCache()
+        self.telemetry = telemetry
+        self.timeouts = timeouts or TimeoutPolicy()
+        self.workflow_dir = workflow_dir or Path("workflows/api")
+        self.output_dir = output_dir or Path("output")
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.completion = completion
+        self.client_id = client_id or uuid.uuid4().hex
+        self.verbose = verbose
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.affinity = affinity
+        self._loaded_key: Optional[tuple] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._traces: Dict[str, PromptTrace] = {}
+        self._changed: Optional[asyncio.Event] = None
+        self._pump: Optional[asyncio.Task] = None
+        self._connecting: Optional[asyncio.Lock] = None
+        self._ws_failed = False
+
+    def _log(self, *args, **kwargs):
+        """Print progress output unless running quietly"""
+        if self.verbose:
+            print(*args, **kwargs)
+
+    @property
+    def slots(self) -> asyncio.Semaphore:
+        """The max_in_flight semaphore, created on first use so it binds to the running loop"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(max(self.max_in_flight, 1))
+        return self._slots
+
+    async def __aenter__(self) -> "AsyncComparisonRunner":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        """Stop the event stream and close pooled connections"""
+        if self._pump is not None:
+            self._pump.cancel()
+            try:
+                await self._pump
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._pump = None
+        await self.http.close()
+
+    # === Event stream ===
+
+    @property
+    def streaming(self) -> bool:
+        """Whether completions currently arrive over the event stream"""
+        return self._pump is not None and not self._pump.done()
+
+    async def _ensure_events(self) -> bool:
+        """Connect the WebSocket event stream if enabled and available"""
+        if self.completion == "poll" or self._ws_failed:
+            return False
+        if self._connecting is None:
+            self._connecting = asyncio.Lock()
+        async with self._connecting:
+            if self.streaming:
+                return True
+            stream = EventStream(self.comfyui_url, self.client_id)
+            if not await stream.connect():
+                self._ws_failed = True
+                self._log("⚠️  WebSocket unavailable, falling back to polling /history")
+                return False
+            self._pump = asyncio.ensure_future(self._pump_events(stream))
+            return True
+
+    def _trace(self, prompt_id: str) -> PromptTrace:
+        """Get (or start) the trace for a prompt"""
+        if prompt_id not in self._traces:
+            self._traces[prompt_id] = PromptTrace(prompt_id=prompt_id)
+        return self._traces[prompt_id]
+
+    def _change(self) -> asyncio.Event:
+        """Event set the next time a prompt finishes or the stream drops"""
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        return self._changed
+
+    def _notify(self):
+        changed, self._changed = self._changed, None
+        if changed is not None:
+            changed.set()
+
+    async def _pump_events(self, stream: EventStream):
+        """Route event messages into per-prompt traces and wake waiters when one finishes"""
+        try:
+            while True:
+                received = await stream.recv()
+                if received is None:
+                    continue
+                msg_type, data = received
+                prompt_id = data.get("prompt_id")
+                if not prompt_id:
+                    continue
+                trace = self._trace(prompt_id)
+                was_done = trace.done
+                trace.add(msg_type, data, time.perf_counter())
+                if msg_type == "progress":
+                    self._log(".", end="", flush=True)
+                if trace.done and not was_done:
+                    self._notify()
+        except ConnectionError:
+            self._log(" (WebSocket lost, polling)", end="", flush=True)
+        finally:
+            await stream.close()
+            # Waiters whose prompt is unfinished switch to polling
+            self._notify()
+
+    # === API calls ===
+
+    async def queue_prompt(self, workflow: dict, timeout: Optional[float] = None) -> str:
+        """Queue a prompt and return its id
+
+        Failures raise (ComfyHTTPError or OSError) so the caller sees why;
+        describe_queue_error turns them into the server's reason.
+        """
+        result = await self.http.post_json("/prompt", {"prompt": workflow, "client_id": self.client_id}, timeout)
+        prompt_id = result.get("prompt_id", "")
+        if not prompt_id:
+            raise ConnectionError(f"POST /prompt returned no prompt_id: {result}")
+        return prompt_id
+
+    async def interrupt(self, prompt_id: str):
+        """Stop a running prompt (servers that ignore prompt_id stop whatever is running)"""
+        try:
+            await self.http.post_json("/interrupt", {"prompt_id": prompt_id}, timeout=10)
+        except (OSError, ValueError) as e:
+            self._log(f"⚠️  Could not interrupt {prompt_id[:8]}: {e}")
+
+    async def cancel(self, prompt_id: str, timeout: float = 10):
+        """Remove a prompt from the server queue, or interrupt it if it is already running
+
+        Raises (ComfyHTTPError, OSError) if the server cannot be reached.
+        """
+        await self.http.post_json("/queue", {"delete": [prompt_id]}, timeout)
+        if queue_states(await self.http.get_json("/queue", timeout=timeout)).get(prompt_id) == "running":
+            await self.http.post_json("/interrupt", {"prompt_id": prompt_id}, timeout)
+
+    async def _cancel_quietly(self, prompt_id: str):
+        try:
+            await self.cancel(prompt_id)
+        except (OSError, ValueError) as e:
+            self._log(f"⚠️  Could not cancel {prompt_id[:8]}: {e}")
+
+    async def get_history(self, prompt_id: str) -> dict:
+        """Get execution history for a prompt ({} if unavailable)"""
+        try:
+            return await self.http.get_json(f"/history/{prompt_id}", timeout=10)
+        except (OSError, ValueError):
+            return {}
+
+    async def download_image(self, filename: str, subfolder: str = "", timeout: Optional[float] = None) -> bytes:
+        """Download a generated image from ComfyUI"""
+        params = {"filename": filename}
+        if subfolder:
+            params["subfolder"] = subfolder
+        return await self.http.get("/view", params, timeout)
+
+    async def save_image(
+        self,
+        filename: str,
+        dest_path: Path,
+        subfolder: str = "",
+        folder_type: str = "",
+        timeout: Optional[float] = None,
+    ) -> Path:
+        """Stream an image from ComfyUI to a local path"""
+        params = {"filename": filename}
+        if subfolder:
+            params["subfolder"] = subfolder
+        if folder_type:
+            params["type"] = folder_type
+        await self.http.download("/view", dest_path, params, timeout=timeout)
+        return dest_path
+
+    async def save_images(self, result: GenerationResult, dest_dir: Optional[Path] = None, stem: str = "") -> List[Path]:
+        """Download every image of a result concurrently; fills in result.local_paths"""
+        images = result_images(result)
+        paths = image_paths(result, dest_dir or self.output_dir, stem or Path(result.filename).stem)
+        await asyncio.gather(*(
+            self.save_image(image["filename"], path, image.get("subfolder", ""), image.get("type", ""))
+            for image, path in zip(images, paths)
+        ))
+        result.local_paths = [str(p) for p in paths]
+        return paths
+
+    # === Completion ===
+
+    @staticmethod
+    def _history_images(outputs: dict) -> List[Dict[str, Any]]:
+        """Return all image entries from a history outputs dict"""
+        images = []
+        for node_id, node_output in outputs.items():
+            images.extend(node_output.get("images", []))
+        return images
+
+    @staticmethod
+    def _history_cached_nodes(entry: dict) -> Optional[List[str]]:
+        """Node IDs ComfyUI served from cache, per the history status messages"""
+        for message in entry.get("status", {}).get("messages", []):
+            if len(message) == 2 and message[0] == "execution_cached":
+                return [str(n) for n in message[1].get("nodes", [])]
+        return None
+
+    @staticmethod
+    def _history_execution_time(entry: dict) -> Optional[float]:
+        """Server-side execution time from history status message timestamps"""
+        stamps = {}
+        for message in entry.get("status", {}).get("messages", []):
+            if len(message) == 2 and isinstance(message[1], dict):
+                stamps[message[0]] = message[1].get("timestamp")
+        start = stamps.get("execution_start")
+        end = stamps.get("execution_success") or stamps.get("execution_error")
+        if start is None or end is None:
+            return None
+        return (end - start) / 1000.0
+
+    @staticmethod
+    def _trace_completion(trace: PromptTrace, images: List[Dict[str, Any]]) -> Completion:
+        """Completion of a finished trace; images may come from /history when outputs were cached"""
+        execution_time = None
+        if trace.started_at is not None and trace.finished_at is not None:
+            execution_time = trace.finished_at - trace.started_at
+        cached_nodes = None
+        for _, msg_type, data in trace.events:
+            if msg_type == "execution_cached":
+                cached_nodes = [str(n) for n in data.get("nodes", [])]
+        return Completion(
+            images=images,
+            error=trace.error,
+            finished_at=trace.finished_at or time.perf_counter(),
+            started_at=trace.started_at,
+            execution_time=execution_time,
+            cached_nodes=cached_nodes,
+            node_times=trace.node_times(),
+            sampler_its=trace.sampler_rate(),
+        )
+
+    @staticmethod
+    def _history_error(entry: dict) -> Optional[str]:
+        """The failure recorded in a history entry's status messages, if any"""
+        status = entry.get("status", {})
+        for message in status.get("messages", []):
+            if len(message) == 2 and message[0] in ("execution_error", "execution_interrupted"):
+                return describe_failure(message[0], message[1] or {})
+        if status.get("status_str") == "error":
+            return "Execution failed (no details in /history)"
+        return None
+
+    @classmethod
+    def _history_completion(cls, entry: dict) -> Completion:
+        """Completion of a prompt found in /history"""
+        images = cls._history_images(entry.get("outputs", {}))
+        return Completion(
+            images=images,
+            error=cls._history_error(entry) or (None if images else "Finished without output images"),
+            finished_at=time.perf_counter(),
+            execution_time=cls._history_execution_time(entry),
+            cached_nodes=cls._history_cached_nodes(entry),
+        )
+
+    async def _collect_trace(self, trace: PromptTrace) -> Completion:
+        images = trace.images
+        if trace.done and not trace.error and not images:
+            # Outputs were cached, so no executed message carried them
+            history = await self.get_history(trace.prompt_id)
+            images = self._history_images(history.get(trace.prompt_id, {}).get("outputs", {}))
+        return self._trace_completion(trace, images)
+
+    def _queue_verdict(self, pending: PendingPrompt, state: Optional[str], now: float) -> Optional[str]:
+        """Why to stop waiting on a prompt, given its /queue state ("running", "pending" or None)
+
+        None while it is legitimately queued or running. A prompt absent
+        from the queue has finished or been dropped, so check /history
+        before taking the verdict.
+        """
+        if state == "running" and pending.running_since is None:
+            pending.running_since = now
+        if state is None:
+            return "Prompt left the ComfyUI queue without a result (deleted, or the server restarted)"
+        if pending.limit is not None and pending.running_since is not None and now - pending.running_since > pending.limit:
+            model = pending.job.model.id if pending.job is not None else "this prompt"
+            return f"Hung: executing for {now - pending.running_since:.0f}s, over the {pending.limit:.0f}s limit for {model}"
+        return None
+
+    async def _check_queue(self, pending: List[PendingPrompt]) -> Optional[Tuple[PendingPrompt, Completion]]:
+        """Collect a prompt that left the queue unnoticed or is over its limit (interrupting it)"""
+        try:
+            states = queue_states(await self.http.get_json("/queue", timeout=10))
+        except (OSError, ValueError):
+            return None
+        now = time.perf_counter()
+        for p in pending:
+            trace = self._traces.get(p.prompt_id)
+            if p.running_since is None and trace is not None:
+                p.running_since = trace.started_at
+            state = states.get(p.prompt_id)
+            verdict = self._queue_verdict(p, state, now)
+            if verdict is None:
+                continue
+            self._traces.pop(p.prompt_id, None)
+            if state is None:
+                history = await self.get_history(p.prompt_id)
+                if p.prompt_id in history:
+                    return p, self._history_completion(history[p.prompt_id])
+            else:
+                await self.interrupt(p.prompt_id)
+            return p, Completion([], verdict, now, started_at=p.running_since)
+        return None
+
+    async def wait_next(
+        self,
+        pending: List[PendingPrompt],
+        timeout: Optional[float] = None,
+    ) -> Tuple[PendingPrompt, Completion]:
+        """Wait until any pending prompt finishes
+
+        Follows the WebSocket event stream when connected, so completion
+        and failure are seen as soon as the server reports them, and polls
+        /history otherwise or once the stream drops. Every few seconds
+        /queue is checked as well: a prompt that left the queue without a
+        result, or has executed longer than its limit (see TimeoutPolicy),
+        is collected as failed, interrupting it in the latter case.
+        timeout caps the whole wait (default: the runner's timeout, else
+        the policy's ceiling); if it expires the oldest prompt is cancelled
+        on the server and reported as timed out.
+        """
+        if timeout is None:
+            timeout = self.timeouts.ceiling if self.timeout is None else self.timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        next_check = loop.time() + QUEUE_CHECK_INTERVAL
+        if self.streaming:
+            for p in pending:
+                if p.output_nodes:
+                    self._trace(p.prompt_id).expect(p.output_nodes)
+
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            if self.streaming:
+                changed = self._change()
+                for p in pending:
+                    trace = self._traces.get(p.prompt_id)
+                    if trace is not None and trace.done:
+                        del self._traces[p.prompt_id]
+                        return p, await self._collect_trace(trace)
+                try:
+                    await asyncio.wait_for(changed.wait(), max(min(remaining, next_check - loop.time()), 0))
+                    continue
+                except asyncio.TimeoutError:
+                    if loop.time() >= deadline:
+                        break
+            else:
+                for p in pending:
+                    history = await self.get_history(p.prompt_id)
+                    if p.prompt_id in history:
+                        self._traces.pop(p.prompt_id, None)
+                        return p, self._history_completion(history[p.prompt_id])
+
+            checked = await self._check_queue(pending)
+            if checked is not None:
+                return checked
+            next_check = loop.time() + QUEUE_CHECK_INTERVAL
+            if not self.streaming:
+                self._log(".", end="", flush=True)
+                await asyncio.sleep(max(min(self.poll_interval, deadline - loop.time()), 0))
+        self._traces.pop(pending[0].prompt_id, None)
+        # Left alone it would keep the GPU busy and delay every later job
+        await self._cancel_quietly(pending[0].prompt_id)
+        return pending[0], Completion([], f"Timeout: nothing finished within {timeout:g}s", time.perf_counter())
+
+    async def wait_for_completion(self, pending: PendingPrompt, timeout: Optional[float] = None) -> Completion:
+        """Wait until a queued prompt finishes or fails (see wait_next)"""
+        _, completion = await self.wait_next([pending], timeout)
+        return completion
+
+    # === Jobs ===
+
+    def load_workflow(self, model: ModelConfig) -> dict:
+        """Load and return workflow for a model (a mutable copy of the cached template)"""
+        return self.templates.get(self.workflow_dir / model.workflow_file, model).copy()
+
+    def inject_prompt(
+        self,
+        workflow: dict,
+        model: ModelConfig,
+        positive: str,
+        negative: str,
+        seed: int,
+        output_prefix: str,
+    ) -> dict:
+        """Inject prompt and parameters into workflow, in place
+
+        Indexes the workflow like a compiled template and renders into it,
+        so it injects exactly what _prepare_job does.
+        """
+        template = WorkflowTemplate(Path(), "", workflow, index_injection_points(workflow, model))
+        workflow.update(template.render({
+            "positive": positive,
+            "negative": negative,
+            "seed": seed,
+            "output_prefix": output_prefix,
+        }))
+        return workflow
+
+    def _failed_result(self, job: GenerationJob, error: str, elapsed: float = 0.0, server: str = "") -> GenerationResult:
+        """Result for a job that never produced a prompt (or never finished)"""
+        return GenerationResult(
+            model_id=job.model.id,
+            seed=job.seed,
+            filename="",
+            prompt_id="",
+            elapsed_time=elapsed,
+            success=False,
+            error=error,
+            server=server,
+            repeat=job.repeat,
+            warmup=job.warmup,
+            prompt_name=job.prompt_name,
+        )
+
+    def _queue_failure(self, job: GenerationJob, e: Exception, elapsed: float) -> GenerationResult:
+        """Result for a job whose POST /prompt failed, marked so schedulers can retire the server"""
+        result = self._failed_result(job, f"Failed to queue prompt: {describe_queue_error(e)}", elapsed, self.comfyui_url)
+        result.queue_failed = True
+        return result
+
+    def _prepare_job(self, job: GenerationJob) -> Union[Tuple[WorkflowTemplate, dict], GenerationResult]:
+        """The job's template and rendered workflow, or a failed result if the workflow is missing"""
+        model = job.model
+        try:
+            template = self.templates.get(self.workflow_dir / model.workflow_file, model)
+        except FileNotFoundError as e:
+            return self._failed_result(job, str(e))
+        workflow = template.render({
+            "positive": job.positive,
+            "negative": job.negative,
+            "seed": job.seed,
+            "output_prefix": f"{model.id}_{job.seed:04d}",
+            **job.overrides,
+        })
+        return template, workflow
+
+    def _pending_prompt(
+        self,
+        job: GenerationJob,
+        template: WorkflowTemplate,
+        prompt_id: str,
+        submitted_at: float,
+        post_started_at: float,
+        queued_at: float,
+    ) -> PendingPrompt:
+        """Track a queued job, predicting whether its model load is cold"""
+        # Prompts run in submission order, so the key queued last is what
+        # will be loaded when this one starts
+        key = affinity_key(job.model)
+        predicted_cold = key != self._loaded_key
+        self._loaded_key = key
+        return PendingPrompt(
+            job,
+            prompt_id,
+            template.output_nodes,
+            submitted_at,
+            template.loader_nodes,
+            predicted_cold,
+            node_types=template.node_types,
+            post_started_at=post_started_at,
+            queued_at=queued_at,
+            limit=self.timeouts.limit(job.model.id, predicted_cold),
+        )
+
+    async def submit_job(self, job: GenerationJob) -> Union[PendingPrompt, GenerationResult]:
+        """Build and queue the workflow for a job without waiting for it
+
+        Returns a PendingPrompt, or a failed GenerationResult (with the
+        server's reason) if the job could not be queued. Does not take a
+        max_in_flight slot; run_job does.
+        """
+        submitted_at = time.perf_counter()
+        prepared = self._prepare_job(job)
+        if isinstance(prepared, GenerationResult):
+            return prepared
+        template, workflow = prepared
+
+        # Subscribe before queueing so no execution message is missed, and
+        # so the handshake is not billed as queue latency
+        await self._ensure_events()
+        post_started_at = time.perf_counter()
+        try:
+            prompt_id = await self.queue_prompt(workflow)
+        except (OSError, ValueError) as e:
+            return self._queue_failure(job, e, time.perf_counter() - submitted_at)
+        queued_at = time.perf_counter()
+        if self.streaming:
+            self._trace(prompt_id).expect(template.output_nodes)
+        return self._pending_prompt(job, template, prompt_id, submitted_at, post_started_at, queued_at)
+
+    def _make_result(self, pending: PendingPrompt, completion: Completion) -> GenerationResult:
+        """Turn a finished prompt into a GenerationResult"""
+        elapsed = completion.finished_at - pending.submitted_at
+        execution_time = completion.execution_time
+        queue_time = None
+        if completion.started_at is not None:
+            queue_time = completion.started_at - pending.submitted_at
+        elif execution_time is not None:
+            queue_time = max(elapsed - execution_time, 0.0)
+
+        phases = PhaseTimings(execution=execution_time, sampler_its=completion.sampler_its)
+        if pending.post_started_at is not None and pending.queued_at is not None:
+            phases.prepare = pending.post_started_at - pending.submitted_at
+            phases.http_queue = pending.queued_at - pending.post_started_at
+            if completion.started_at is not None:
+                phases.queue_wait = completion.started_at - pending.queued_at
+            elif execution_time is not None:
+                phases.queue_wait = max(completion.finished_at - pending.queued_at - execution_time, 0.0)
+        for node_id, seconds in completion.node_times.items():
+            class_type = pending.node_types.get(node_id, node_id)
+            phases.nodes[class_type] = phases.nodes.get(class_type, 0.0) + seconds
+
+        # Trust ComfyUI's cache report for the loader nodes when we have one
+        cold_load = pending.predicted_cold
+        if completion.cached_nodes is not None and pending.loader_nodes:
+            cached = set(completion.cached_nodes)
+            cold_load = not all(node_id in cached for node_id in pending.loader_nodes)
+
+        telemetry = {}
+        if self.telemetry is not None:
+            window_start = completion.started_at or pending.queued_at or pending.submitted_at
+            telemetry = self.telemetry.summary(window_start, completion.finished_at)
+
+        filename = "" if completion.error else completion.filename
+        result = GenerationResult(
+            model_id=pending.job.model.id,
+            seed=pending.job.seed,
+            filename=filename,
+            prompt_id=pending.prompt_id,
+            elapsed_time=elapsed,
+            success=bool(filename),
+            error=None if filename else (completion.error or "Finished without output images"),
+            server=self.comfyui_url,
+            queue_time=queue_time,
+            execution_time=execution_time,
+            cold_load=cold_load,
+            phases=phases,
+            repeat=pending.job.repeat,
+            warmup=pending.job.warmup,
+            prompt_name=pending.job.prompt_name,
+            images=list(completion.images) if filename else [],
+            telemetry=telemetry,
+        )
+        if result.success:
+            self.timeouts.observe(result.model_id, execution_time or elapsed, cold_load)
+        return result
+
+    async def run_job(self, job: GenerationJob, timeout: Optional[float] = None) -> GenerationResult:
+        """Queue one job and wait for it, holding one of the max_in_flight slots
+
+        If the timeout expires the prompt is cancelled on the server and a
+        failed result returned. If the calling task is cancelled, the
+        prompt is cancelled too and CancelledError propagates.
+        """
+        async with self.slots:
+            pending = await self.submit_job(job)
+            if isinstance(pending, GenerationResult):
+                return pending
+            try:
+                completion = await self.wait_for_completion(pending, timeout)
+            except asyncio.CancelledError:
+                self._traces.pop(pending.prompt_id, None)
+                await self._cancel_quietly(pending.prompt_id)
+                raise
+        return self._make_result(pending, completion)
+
+    async def _run_job(self, job: GenerationJob, timeout: Optional[float] = None) -> GenerationResult:
+        """run_job, with a progress line per job"""
+        model = job.model
+        self._log(f"\n[{model.name}] Queueing... ", end="", flush=True)
+        async with self.slots:
+            submitted = await self.submit_job(job)
+            if isinstance(submitted, GenerationResult):
+                return submitted
+
+            self._log(f"OK ({submitted.prompt_id[:8]})")
+            self._log(f"[{model.name}] Generating", end="", flush=True)
+            result = self._make_result(*await self.wait_next([submitted], timeout))
+        if result.success:
+            self._log(f" Done! ({result.elapsed_time:.1f}s) -> {result.filename}")
+        else:
+            self._log(f" ❌ {result.error}")
+        return result
+
+    async def run_single(
+        self,
+        model: ModelConfig,
+        positive: str,
+        negative: str = "",
+        seed: int = 42,
+    ) -> GenerationResult:
+        """Run a single generation for one model"""
+        return await self._run_job(GenerationJob(0, model, positive, negative, seed))
+
+    async def run_workflow(self, workflow: dict, timeout: Optional[float] = None) -> Tuple[str, Completion]:
+        """Queue a ready-made API workflow and wait for it to finish
+
+        Returns (prompt_id, completion); prompt_id is empty if queueing failed.
+        """
+        submitted_at = time.perf_counter()
+        await self._ensure_events()
+        try:
+            prompt_id = await self.queue_prompt(workflow)
+        except (OSError, ValueError) as e:
+            return "", Completion([], f"Failed to queue prompt: {describe_queue_error(e)}", time.perf_counter())
+        output_nodes = [
+            node_id for node_id, node in workflow.items()
+            if node.get("class_type") == "SaveImage"
+        ]
+        pending = PendingPrompt(None, prompt_id, output_nodes, submitted_at)
+        return prompt_id, await self.wait_for_completion(pending, timeout)
+
+    async def run_pipeline(
+        self,
+        next_job: Callable[[bool], Optional[GenerationJob]],
+        on_result: Callable[[GenerationJob, GenerationResult], bool],
+        window: int = 1,
+        timeout: Optional[float] = None,
+    ) -> WindowTuner:
+        """Keep up to `window` prompts queued on this server at once
+
+        next_job(block) returns the next job, or None when there is nothing
+        to submit (with block=True: nothing left at all). on_result is
+        called for every finished job and may return False to stop
+        submitting. Both are plain functions run in worker threads, so they
+        may block. window=0 auto-tunes the window from measured images/s.
+        """
+        tuner = WindowTuner(window)
+        pending: List[PendingPrompt] = []
+        stopped = False
+        job = None
+
+        while True:
+            while not stopped and len(pending) < tuner.window:
+                job = await in_thread(next_job, not pending)
+                if job is None:
+                    break
+                submitted = await self.submit_job(job)
+                if isinstance(submitted, GenerationResult):
+                    stopped = await in_thread(on_result, job, submitted) is False
+                else:
+                    pending.append(submitted)
+
+            if not pending:
+                if stopped or job is None:
+                    return tuner
+                continue
+
+            done, completion = await self.wait_next(pending, timeout)
+            pending.remove(done)
+            tuner.record(completion.finished_at)
+            if await in_thread(on_result, done.job, self._make_result(done, completion)) is False:
+                stopped = True
+
+    def build_jobs(
+        self,
+        model_ids: List[str],
+        positive: str,
+        negative: str = "",
+        seed: int = 42,
+        custom_models: Optional[Dict[str, ModelConfig]] = None,
+        warmup: int = 0,
+        repeats: int = 1,
+    ) -> List[GenerationJob]:
+        """Resolve model IDs into generation jobs, skipping unknown models
+
+        Each model gets `warmup` discarded runs followed by `repeats`
+        measured runs. Every run uses its own seed so ComfyUI's cache
+        cannot short-circuit it: measured repeat r uses seed + r, warmups
+        use the seeds after the measured ones.
+        """
+        models = {**BUILTIN_MODELS, **(custom_models or {})}
+        jobs = []
+        for model_id in model_ids:
+            if model_id not in models:
+                print(f"\n⚠️  Model not found: {model_id}")
+                continue
+            model = models[model_id]
+            for w in range(warmup):
+                jobs.append(GenerationJob(len(jobs), model, positive, negative, seed + repeats + w, repeat=w, warmup=True))
+            for r in range(repeats):
+                jobs.append(GenerationJob(len(jobs), model, positive, negative, seed + r, repeat=r))
+        return jobs
+
+    async def run_jobs(
+        self,
+        jobs: List[GenerationJob],
+        on_result: Optional[Callable[[GenerationJob, GenerationResult], None]] = None,
+        timeout: Optional[float] = None,
+        window: Optional[int] = None,
+    ) -> List[GenerationResult]:
+        """Run jobs on this server, keeping `window` prompts in flight; results in job order
+
+        window defaults to max_in_flight; 1 runs the jobs one at a time
+        with a progress line each, 0 auto-tunes. Jobs are queued in
+        affinity order. on_result, if given, is called as each job
+        finishes (in a worker thread, so it may block).
+        """
+        window = self.max_in_flight if window is None else window
+        ordered = order_by_affinity(jobs, self._loaded_key) if self.affinity else jobs
+        results: Dict[int, GenerationResult] = {}
+        if window == 1:
+            for job in ordered:
+                results[job.index] = await self._run_job(job, timeout)
+                if on_result:
+                    await in_thread(on_result, job, results[job.index])
+            return [results[job.index] for job in jobs]
+
+        queue = list(reversed(ordered))
+
+        def collect(job: GenerationJob, result: GenerationResult) -> bool:
+            results[job.index] = result
+            if on_result:
+                on_result(job, result)
+            status = "✅" if result.success else "❌"
+            self._log(
+                f"{status} [{job.model.name}] {result.elapsed_time:.1f}s "
+                f"(queue {result.queue_time or 0:.1f}s) -> {result.filename or result.error}"
+            )
+            return True
+
+        tuner = await self.run_pipeline(lambda block: queue.pop() if queue else None, collect, window, timeout)
+        if window == 0:
+            self._log(f"Pipeline window auto-tuned to {tuner.window}")
+        return [results[job.index] for job in jobs if job.index in results]
+
+    async def run_comparison(
+        self,
+        model_ids: List[str],
+        positive: str,
+        negative: str = "",
+        seed: int = 42,
+        custom_models: Optional[Dict[str, ModelConfig]] = None,
+        warmup: int = 0,
+        repeats: int = 1,
+        outlier_rule: str = "iqr",
+        on_result: Optional[Callable[[GenerationJob, GenerationResult], None]] = None,
+    ) -> List[GenerationResult]:
+        """Run comparison across multiple models
+
+        on_result, if given, is called as each job finishes.
+        """
+        print_comparison_header(model_ids, seed)
+        jobs = self.build_jobs(model_ids, positive, negative, seed, custom_models, warmup, repeats)
+        results = await self.run_jobs(jobs, on_result=on_result)
+        print_comparison_summary(results)
+        if repeats > 1:
+            print_model_stats(model_stats(results, outlier_rule))
+        return results
+
+    def save_results(
+        self,
+        results: List[GenerationResult],
+        output_path: Path,
+        stats: Optional[Dict[str, TimingStats]] = None,
+        http: Optional[Dict[str, Any]] = None,
+    ):
+        """Save results (and per-model statistics, if given) to JSON
+
+        http: HTTP latency counters per server URL (default: this runner's)
+        """
+        data = {
+            "timestamp": datetime.now().isoformat(),
+            "results": [result_to_dict(r) for r in results],
+        }
+        if stats:
+            data["stats"] = {model_id: asdict(st) for model_id, st in stats.items()}
+        data["http"] = http or {self.comfyui_url: self.http.stats()}
+        output_path.write_text(json.dumps(data, indent=2))
+        print(f"\nResults saved to: {output_path}")
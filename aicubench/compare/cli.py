@@ -2,11 +2,241 @@
 CLI interface for multi-model comparison
 """
 import argparse
+import hashlib
+import json
+import os
+from dataclasses import asdict
 from pathlib import Path
+from typing import Optional
 
-from .runner import ComparisonRunner
+from ..spool import DEFAULT_ENDPOINT, SPOOL_DIR, SubmissionSpool, SubmitPolicy, drain, print_drain
+from .costmodel import parse_steps, print_cost_models, run_calibration, save_cost_models
+from .downloads import DownloadQueue, download_hook
+from .journal import RunJournal
+from .overhead import find_regressions, load_baseline, print_overhead, run_overhead_suite, save_overhead
+from .load import ARRIVALS, mark_saturation, print_load, run_load, save_load
+from .regression import compare_runs, load_run, print_check
+from .runner import (
+    ComparisonRunner,
+    GenerationJob,
+    generation_seconds,
+    model_stats,
+    print_comparison_summary,
+    print_model_stats,
+    result_from_dict,
+    result_to_dict,
+)
+from .scheduler import MultiServerScheduler
 from .models import BUILTIN_MODELS
-from .grid import create_comparison_grid, create_benchmark_card
+from .grid import ThumbnailCache, collect_grid_images, create_comparison_grid, create_benchmark_card
+from .scaling import parse_batches, parse_resolutions, print_scaling, run_scaling, save_scaling
+from .stats import OUTLIER_RULES
+from .store import TREND_METRICS, ResultsStore, host_fingerprint, print_trend, run_metadata
+from .sweep import build_sweep_jobs, load_prompts, parse_seeds, run_sweep
+from .telemetry import TelemetrySampler
+from .timeouts import TimeoutPolicy
+
+
+def _window_arg(value: str) -> int:
+    """Parse --window: a positive integer or 'auto' (0)"""
+    if value == "auto":
+        return 0
+    try:
+        window = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid window: {value}")
+    if window < 1:
+        raise argparse.ArgumentTypeError("window must be >= 1 or 'auto'")
+    return window
+
+
+def _add_repeat_args(parser: argparse.ArgumentParser):
+    """Options for warmup runs, repeats and statistics"""
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=0,
+        help="Warmup runs per model, excluded from statistics (default: 0)",
+    )
+    parser.add_argument(
+        "--repeats",
+        type=int,
+        default=1,
+        help="Measured runs per model (default: 1)",
+    )
+    parser.add_argument(
+        "--outliers",
+        choices=list(OUTLIER_RULES),
+        default="iqr",
+        help="Outlier rule applied before statistics (default: iqr)",
+    )
+
+
+def _add_server_args(parser: argparse.ArgumentParser):
+    """Options selecting the ComfyUI server(s) and how jobs are submitted"""
+    parser.add_argument(
+        "--url",
+        type=str,
+        default="http://127.0.0.1:8188",
+        help="ComfyUI URL, or comma-separated URLs to spread jobs over several servers (default: http://127.0.0.1:8188)",
+    )
+    parser.add_argument(
+        "--window",
+        type=_window_arg,
+        default=1,
+        help="Prompts kept queued per server, or 'auto' to tune by images/s (default: 1)",
+    )
+    parser.add_argument(
+        "--no-affinity",
+        action="store_true",
+        help="Run models in the given order instead of grouping by checkpoint/LoRA set",
+    )
+    parser.add_argument(
+        "--completion",
+        choices=["ws", "poll"],
+        default="ws",
+        help="Completion tracking: ws (WebSocket events, falls back to polling) or poll (default: ws)",
+    )
+    parser.add_argument(
+        "--workflow-dir",
+        type=str,
+        default="workflows/api",
+        help="Workflow directory (default: workflows/api)",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        type=str,
+        default="output",
+        help="Output directory (default: output)",
+    )
+    parser.add_argument(
+        "--telemetry",
+        type=float,
+        metavar="SECONDS",
+        default=None,
+        help="Sample GPU/host telemetry at this interval and save it to <output>/telemetry.json",
+    )
+    parser.add_argument(
+        "--db",
+        type=str,
+        default="results.db",
+        help="Results database every run is appended to (default: results.db)",
+    )
+    parser.add_argument(
+        "--no-db",
+        action="store_true",
+        help="Do not record this run in the results database",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        metavar="SECONDS",
+        default=300,
+        help="Execution limit for models without enough history in the results database (default: 300)",
+    )
+    parser.add_argument(
+        "--timeout-factor",
+        type=float,
+        default=3.0,
+        help="Execution limit as a multiple of a model's p99 execution time on this host (default: 3.0)",
+    )
+
+
+def _add_spool_arg(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--spool",
+        type=str,
+        metavar="DIR",
+        default=None,
+        help=f"Also spool each result once its images are downloaded, for the submit command (e.g. {SPOOL_DIR})",
+    )
+
+
+def _spooler(args):
+    """(job, result) callback spooling each final result, or None without --spool"""
+    if not args.spool:
+        return None
+    spool = SubmissionSpool(Path(args.spool))
+    host = host_fingerprint()[0]
+
+    def on_done(job, result):
+        payload = dict(result_to_dict(result), host=host)
+        # One record per prompt, even if a resumed sweep reports it again
+        key = f"{result.server}|{result.prompt_id}" if result.prompt_id else None
+        spool.append("generation_result", payload, key=key)
+
+    return on_done
+
+
+def _start_telemetry(args) -> Optional[TelemetrySampler]:
+    if not args.telemetry:
+        return None
+    return TelemetrySampler(interval=args.telemetry).start()
+
+
+def _stop_telemetry(sampler: Optional[TelemetrySampler], output_dir: Path):
+    if sampler is None:
+        return
+    sampler.stop()
+    if not sampler.fields:
+        print("⚠️ No telemetry source available (nvidia-smi / psutil)")
+        return
+    sampler.export(output_dir / "telemetry.json")
+    print(f"Telemetry saved to: {output_dir / 'telemetry.json'}")
+
+
+def _record_run(args, results, metadata):
+    """Append a finished run to the results database, unless --no-db"""
+    if args.no_db or not results:
+        return
+    with ResultsStore(Path(args.db)) as store:
+        run_id = store.append(results, metadata, label=args.output)
+    print(f"Recorded as run #{run_id} in {args.db}")
+
+
+def _timeout_policy(args) -> TimeoutPolicy:
+    """Execution limits, seeded from this host's runs in the results database"""
+    settings = {"default": args.timeout, "factor": args.timeout_factor}
+    if args.no_db or not Path(args.db).exists():
+        return TimeoutPolicy(**settings)
+    with ResultsStore(Path(args.db)) as store:
+        policy = TimeoutPolicy.from_store(store, host_fingerprint()[0], **settings)
+    limits = policy.limits()
+    if limits:
+        shown = ", ".join(
+            f"{model_id} {' / '.join(f'{kind} {seconds:.0f}s' for kind, seconds in by_kind.items())}"
+            for model_id, by_kind in limits.items()
+        )
+        print(f"⏱️  Execution limits from {args.db}: {shown} (others {args.timeout:.0f}s)")
+    return policy
+
+
+def _make_runner(args, telemetry: Optional[TelemetrySampler] = None):
+    """Build a ComparisonRunner, or a MultiServerScheduler for several URLs"""
+    timeouts = _timeout_policy(args)
+    urls = [u.strip() for u in args.url.split(",") if u.strip()]
+    if len(urls) > 1:
+        return MultiServerScheduler(
+            comfyui_urls=urls,
+            workflow_dir=Path(args.workflow_dir),
+            output_dir=Path(args.output),
+            completion=args.completion,
+            window=args.window,
+            affinity=not args.no_affinity,
+            telemetry=telemetry,
+            timeouts=timeouts,
+        )
+    return ComparisonRunner(
+        comfyui_url=urls[0],
+        workflow_dir=Path(args.workflow_dir),
+        output_dir=Path(args.output),
+        completion=args.completion,
+        window=args.window,
+        affinity=not args.no_affinity,
+        telemetry=telemetry,
+        timeouts=timeouts,
+    )
 
 
 def main():
@@ -57,24 +287,110 @@ def main():
         default=42,
         help="Random seed (default: 42)",
     )
-    run_parser.add_argument(
-        "--url",
+    _add_repeat_args(run_parser)
+    _add_server_args(run_parser)
+    _add_spool_arg(run_parser)
+
+    # Sweep command
+    sweep_parser = subparsers.add_parser(
+        "sweep", help="Run a resumable model x prompt x seed sweep"
+    )
+    sweep_parser.add_argument(
+        "--models",
+        "-m",
         type=str,
-        default="http://127.0.0.1:8188",
-        help="ComfyUI URL (default: http://127.0.0.1:8188)",
+        required=True,
+        help="Comma-separated list of model IDs",
     )
-    run_parser.add_argument(
+    sweep_parser.add_argument(
+        "--prompts",
+        type=str,
+        default="prompts",
+        help="Comma-separated prompt files or directories; directories use every *.txt "
+        "not named *negative* (default: prompts)",
+    )
+    sweep_parser.add_argument(
+        "--negative",
+        "-n",
+        type=str,
+        default="",
+        help="Negative prompt text",
+    )
+    sweep_parser.add_argument(
+        "--negative-file",
+        type=str,
+        help="Path to negative prompt file",
+    )
+    sweep_parser.add_argument(
+        "--seeds",
+        type=str,
+        default="42",
+        help="Seeds, e.g. 1,2,10-15 (default: 42)",
+    )
+    sweep_parser.add_argument(
+        "--journal",
+        type=str,
+        help="JSONL journal to stream results to and resume from (default: <output>/journal.jsonl)",
+    )
+    sweep_parser.add_argument(
+        "--download",
+        action="store_true",
+        help="Download images of measured runs not yet on disk",
+    )
+    _add_repeat_args(sweep_parser)
+    _add_server_args(sweep_parser)
+    _add_spool_arg(sweep_parser)
+
+    # Overhead command
+    overhead_parser = subparsers.add_parser(
+        "overhead", help="Measure harness overhead against a local fake ComfyUI"
+    )
+    overhead_parser.add_argument(
+        "--jobs",
+        type=int,
+        default=20,
+        help="Jobs per round-trip benchmark (default: 20)",
+    )
+    overhead_parser.add_argument(
+        "--window",
+        type=int,
+        default=4,
+        help="In-flight window for the pipelined benchmark (default: 4)",
+    )
+    overhead_parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="Also measure /history polling (slow: polls every 2s)",
+    )
+    overhead_parser.add_argument(
+        "--model",
+        type=str,
+        default="sdxl",
+        help="Built-in model whose workflow is exercised (default: sdxl)",
+    )
+    overhead_parser.add_argument(
         "--workflow-dir",
         type=str,
         default="workflows/api",
         help="Workflow directory (default: workflows/api)",
     )
-    run_parser.add_argument(
+    overhead_parser.add_argument(
         "--output",
         "-o",
         type=str,
-        default="output",
-        help="Output directory (default: output)",
+        default="output/overhead.json",
+        help="Where to save the results (default: output/overhead.json)",
+    )
+    overhead_parser.add_argument(
+        "--baseline",
+        type=str,
+        help="Previous overhead.json; exit non-zero if any benchmark regressed",
+    )
+    overhead_parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown vs baseline as a fraction (default: 0.25)",
     )
 
     # Grid command
@@ -102,6 +418,154 @@ def main():
         action="store_true",
         help="Hide model labels",
     )
+    grid_parser.add_argument(
+        "--results",
+        type=str,
+        default=None,
+        help="results.json used to pick and label cells (default: results.json next to input_dir, if any)",
+    )
+    grid_parser.add_argument(
+        "--cell-size",
+        type=str,
+        default="512x768",
+        help="Cell size WxH (default: 512x768)",
+    )
+    grid_parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Thumbnail cache directory (default: .thumbs next to the output image)",
+    )
+    grid_parser.add_argument(
+        "--cache-in-input",
+        action="store_true",
+        help="Keep the thumbnail cache in <input_dir>/.thumbs instead",
+    )
+    grid_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Decode every image again instead of reusing cached thumbnails",
+    )
+    grid_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processes decoding images (default: one per CPU)",
+    )
+
+    # Batch size / resolution scaling
+    scale_parser = subparsers.add_parser("scale", help="Sweep batch size and resolution for throughput")
+    scale_parser.add_argument("--models", "-m", type=str, required=True, help="Comma-separated model IDs")
+    scale_parser.add_argument("--prompt", "-p", type=str, default="a photo of a cat", help="Positive prompt")
+    scale_parser.add_argument("--negative", "-n", type=str, default="", help="Negative prompt")
+    scale_parser.add_argument("--seed", "-s", type=int, default=42, help="Base seed (default: 42)")
+    scale_parser.add_argument(
+        "--resolutions",
+        type=str,
+        default="512x512,768x768,1024x1024",
+        help="Comma-separated WxH (default: 512x512,768x768,1024x1024)",
+    )
+    scale_parser.add_argument("--batches", type=str, default="1,2,4,8", help="Comma-separated batch sizes (default: 1,2,4,8)")
+    scale_parser.add_argument("--repeats", type=int, default=3, help="Measured prompts per point (default: 3)")
+    scale_parser.add_argument("--warmup", type=int, default=1, help="Discarded prompts per point (default: 1)")
+    _add_server_args(scale_parser)
+
+    # Step cost calibration command
+    calibrate_parser = subparsers.add_parser("calibrate", help="Fit fixed overhead and per-step time per model")
+    calibrate_parser.add_argument("--models", "-m", type=str, required=True, help="Comma-separated model IDs")
+    calibrate_parser.add_argument("--prompt", "-p", type=str, default="a photo of a cat", help="Positive prompt")
+    calibrate_parser.add_argument("--negative", "-n", type=str, default="", help="Negative prompt")
+    calibrate_parser.add_argument("--seed", "-s", type=int, default=42, help="Base seed (default: 42)")
+    calibrate_parser.add_argument("--steps", type=str, default="4,8,16,32", help="Comma-separated step counts (default: 4,8,16,32)")
+    calibrate_parser.add_argument("--repeats", type=int, default=3, help="Measured prompts per step count (default: 3)")
+    calibrate_parser.add_argument("--warmup", type=int, default=1, help="Discarded prompts per model (default: 1)")
+    calibrate_parser.add_argument("--predict", type=str, default="", help="Comma-separated step counts to predict latency for")
+    _add_server_args(calibrate_parser)
+
+    # Open-loop load test
+    load_parser = subparsers.add_parser("load", help="Open-loop load test at fixed arrival rates")
+    load_parser.add_argument("--models", "-m", type=str, required=True, help="Comma-separated model IDs, used round-robin")
+    load_parser.add_argument("--prompt", "-p", type=str, default="a photo of a cat", help="Positive prompt")
+    load_parser.add_argument("--negative", "-n", type=str, default="", help="Negative prompt")
+    load_parser.add_argument("--seed", "-s", type=int, default=42, help="Base seed; request i uses seed + i (default: 42)")
+    load_parser.add_argument("--rates", type=str, default="0.5,1,2", help="Comma-separated arrival rates in requests/s (default: 0.5,1,2)")
+    load_parser.add_argument("--duration", type=float, default=60, help="Seconds of arrivals per rate (default: 60)")
+    load_parser.add_argument("--arrival", choices=ARRIVALS, default="poisson", help="Arrival process (default: poisson)")
+    load_parser.add_argument("--warmup", type=int, default=1, help="Closed-loop runs per model before the test (default: 1)")
+    load_parser.add_argument("--timeout", type=float, default=600, help="Seconds to wait for any one request (default: 600)")
+    load_parser.add_argument("--url", type=str, default="http://127.0.0.1:8188", help="ComfyUI URL (default: http://127.0.0.1:8188)")
+    load_parser.add_argument(
+        "--completion",
+        choices=["ws", "poll"],
+        default="ws",
+        help="Completion tracking; poll only sees completions every 2s (default: ws)",
+    )
+    load_parser.add_argument("--workflow-dir", type=str, default="workflows/api", help="Workflow directory (default: workflows/api)")
+    load_parser.add_argument("--output", "-o", type=str, default="output", help="Output directory (default: output)")
+
+    # Trends from the results database
+    trends_parser = subparsers.add_parser("trends", help="Show a model's timing across recorded runs")
+    trends_parser.add_argument("--model", "-m", type=str, help="Model ID (omit to list recorded hosts)")
+    trends_parser.add_argument("--host", type=str, default=None, help="Host name or fingerprint prefix")
+    trends_parser.add_argument("--last", type=int, default=30, help="Number of most recent runs (default: 30)")
+    trends_parser.add_argument(
+        "--metric",
+        choices=TREND_METRICS,
+        default="elapsed_time",
+        help="Timing to report (default: elapsed_time)",
+    )
+    trends_parser.add_argument("--db", type=str, default="results.db", help="Results database (default: results.db)")
+
+    # Import old results.json files into the results database
+    import_parser = subparsers.add_parser("import", help="Add existing results.json files to the results database")
+    import_parser.add_argument("paths", nargs="+", help="results.json files or directories containing one")
+    import_parser.add_argument("--host", type=str, default=None, help="Host name to record (default: this machine)")
+    import_parser.add_argument("--db", type=str, default="results.db", help="Results database (default: results.db)")
+
+    # Regression gate against a baseline run
+    check_parser = subparsers.add_parser("check", help="Compare a run against a baseline; exit 1 on regression")
+    check_parser.add_argument("current", help="results.json, its directory, or run:<id> from --db")
+    check_parser.add_argument("--baseline", "-b", required=True, help="Baseline: results.json, its directory, or run:<id>")
+    check_parser.add_argument("--db", type=str, default="results.db", help="Results database for run:<id> (default: results.db)")
+    check_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Median slowdown tolerated, as a fraction (default: 0.10)",
+    )
+    check_parser.add_argument("--alpha", type=float, default=0.05, help="Significance level (default: 0.05)")
+    check_parser.add_argument(
+        "--floor",
+        type=float,
+        default=0.05,
+        help="Slowdowns below this many seconds are ignored (default: 0.05)",
+    )
+    check_parser.add_argument(
+        "--metrics",
+        type=str,
+        default=None,
+        help="Comma-separated metrics to check, e.g. elapsed_time,execution,node:KSampler (default: all)",
+    )
+    check_parser.add_argument("--verbose", "-v", action="store_true", help="Show unchanged phases too")
+
+    # Drain the submission spool
+    submit_parser = subparsers.add_parser("submit", help="Send spooled results to the collection endpoint")
+    submit_parser.add_argument("--spool", type=str, default=str(SPOOL_DIR), help=f"Spool directory (default: {SPOOL_DIR})")
+    submit_parser.add_argument(
+        "--endpoint",
+        type=str,
+        default=os.environ.get("GAS_ENDPOINT", DEFAULT_ENDPOINT),
+        help="Collection endpoint (default: $GAS_ENDPOINT or the AICU Apps Script)",
+    )
+    submit_parser.add_argument("--batch-size", type=int, default=50, help="Records per request (default: 50)")
+    submit_parser.add_argument(
+        "--format",
+        choices=["auto", "batch", "flat"],
+        default="auto",
+        help="batch: gzip JSON batches; flat: one flattened record per POST; auto: flat for Apps Script (default: auto)",
+    )
+    submit_parser.add_argument("--no-compress", action="store_true", help="Send batches uncompressed")
+    submit_parser.add_argument("--retries", type=int, default=5, help="Retries per request (default: 5)")
 
     args = parser.parse_args()
 
@@ -134,43 +598,56 @@ def main():
         model_ids = [m.strip() for m in args.models.split(",")]
 
         # Run comparison
-        runner = ComparisonRunner(
-            comfyui_url=args.url,
-            workflow_dir=Path(args.workflow_dir),
-            output_dir=Path(args.output),
-        )
+        telemetry = _start_telemetry(args)
+        runner = _make_runner(args, telemetry)
 
+        # Images of each model are fetched in the background while the next one generates
+        images_dir = Path(args.output) / "images"
+        downloads = DownloadQueue()
         results = runner.run_comparison(
             model_ids=model_ids,
             positive=positive,
             negative=negative,
             seed=args.seed,
+            warmup=args.warmup,
+            repeats=args.repeats,
+            outlier_rule=args.outliers,
+            on_result=download_hook(
+                downloads, runner, lambda r: images_dir, lambda r: f"{r.model_id}_{r.seed}",
+                on_done=_spooler(args),
+            ),
         )
+        stats = model_stats(results, args.outliers) if args.repeats > 1 else None
+        downloads.close()
+        metadata = None if args.no_db else run_metadata(runner, model_ids)
+        runner.close()
+        _stop_telemetry(telemetry, Path(args.output))
 
-        # Save results JSON
-        output_path = Path(args.output) / "results.json"
-        runner.save_results(results, output_path)
-
-        # Download images and create benchmark card
+        # Benchmark card (one image per model)
         card_data = []
-        images_dir = Path(args.output) / "images"
         for r in results:
-            if r.success and r.filename:
-                try:
-                    local_path = images_dir / f"{r.model_id}_{r.seed}.png"
-                    runner.save_image(r.filename, local_path)
-                    model = BUILTIN_MODELS.get(r.model_id)
-                    card_data.append({
-                        "model_id": r.model_id,
-                        "model_name": model.name if model else r.model_id,
-                        "filename": r.filename,
-                        "elapsed_time": r.elapsed_time,
-                        "success": r.success,
-                        "local_path": str(local_path),
-                    })
-                    print(f"Downloaded: {r.filename} -> {local_path}")
-                except Exception as e:
-                    print(f"Failed to download {r.filename}: {e}")
+            if r.success and r.local_paths and not r.warmup and r.repeat == 0:
+                model = BUILTIN_MODELS.get(r.model_id)
+                entry = {
+                    "model_id": r.model_id,
+                    "model_name": model.name if model else r.model_id,
+                    "filename": r.filename,
+                    "elapsed_time": generation_seconds(r),
+                    "success": r.success,
+                    "local_path": r.local_paths[0],
+                    "phases": asdict(r.phases),
+                }
+                model_st = (stats or {}).get(r.model_id)
+                if model_st:
+                    entry["elapsed_time"] = model_st.median
+                    entry["spread"] = model_st.spread
+                    entry["runs"] = model_st.n
+                card_data.append(entry)
+
+        # Save results JSON (after downloads, so download times are included)
+        output_path = Path(args.output) / "results.json"
+        runner.save_results(results, output_path, stats)
+        _record_run(args, results, metadata)
 
         if card_data:
             card_path = Path(args.output) / "benchmark_card.png"
@@ -182,10 +659,272 @@ def main():
                 seed=args.seed,
             )
 
+    elif args.command == "sweep":
+        if args.negative_file:
+            negative = Path(args.negative_file).read_text().strip()
+        else:
+            negative = args.negative
+
+        prompts = load_prompts([Path(p.strip()) for p in args.prompts.split(",") if p.strip()])
+        if not prompts:
+            print(f"Error: no prompts found in {args.prompts}")
+            return 1
+        seeds = parse_seeds(args.seeds)
+        model_ids = [m.strip() for m in args.models.split(",")]
+        jobs = build_sweep_jobs(model_ids, prompts, seeds, negative, args.warmup, args.repeats)
+
+        output_dir = Path(args.output)
+        journal = RunJournal(Path(args.journal) if args.journal else output_dir / "journal.jsonl")
+        print(f"Prompts: {', '.join(name for name, _ in prompts)}")
+        print(f"Seeds: {', '.join(str(seed) for seed in seeds)}")
+
+        telemetry = _start_telemetry(args)
+        runner = _make_runner(args, telemetry)
+        downloads = DownloadQueue()
+        images_dir = output_dir / "images"
+        placement = (lambda r: images_dir / (r.prompt_name or "prompt"), lambda r: f"{r.model_id}_{r.seed}")
+        spool = _spooler(args)
+        hook = download_hook(downloads, runner, *placement, skip_existing=True, on_done=spool)
+        fresh = []
+
+        def on_result(job, result):
+            # Only jobs run now go to the database and spool; journaled ones were recorded by their own run
+            fresh.append(result)
+            if args.download:
+                hook(job, result)
+            elif spool:
+                spool(job, result)
+
+        results = run_sweep(runner, jobs, journal, on_result=on_result)
+        if args.download:
+            # Images of jobs journaled by an earlier, interrupted run
+            backfill = download_hook(downloads, runner, *placement, skip_existing=True)
+            for r in results:
+                if not r.local_paths:
+                    backfill(None, r)
+        downloads.close()
+        metadata = None if args.no_db else run_metadata(runner, model_ids)
+        runner.close()
+        _stop_telemetry(telemetry, output_dir)
+
+        print_comparison_summary(results)
+        stats = model_stats(results, args.outliers) if args.repeats > 1 else None
+        if stats:
+            print_model_stats(stats)
+
+        runner.save_results(results, output_dir / "results.json", stats)
+        _record_run(args, fresh, metadata)
+
+    elif args.command == "overhead":
+        results = run_overhead_suite(
+            workflow_dir=Path(args.workflow_dir),
+            model_id=args.model,
+            jobs=args.jobs,
+            window=args.window,
+            include_poll=args.poll,
+        )
+        baseline = load_baseline(Path(args.baseline)) if args.baseline else None
+        print_overhead(results, baseline)
+        save_overhead(results, Path(args.output))
+        if baseline:
+            regressions = find_regressions(results, baseline, args.tolerance)
+            for line in regressions:
+                print(f"❌ Regression: {line}")
+            if regressions:
+                return 1
+
     elif args.command == "grid":
-        # TODO: Implement grid from directory
-        print("Grid command not fully implemented yet")
-        return 1
+        input_dir = Path(args.input_dir)
+        if not input_dir.is_dir():
+            print(f"Error: {input_dir} is not a directory")
+            return 1
+        results_path = Path(args.results) if args.results else input_dir.parent / "results.json"
+        results = None
+        if results_path.exists():
+            results = json.loads(results_path.read_text()).get("results", [])
+            print(f"Labels from: {results_path}")
+        elif args.results:
+            print(f"Error: {results_path} not found")
+            return 1
+
+        images = collect_grid_images(input_dir, results)
+        if not images:
+            print(f"No images found in {input_dir}")
+            return 1
+        try:
+            cell_width, cell_height = (int(v) for v in args.cell_size.lower().split("x"))
+        except ValueError:
+            print(f"Error: invalid --cell-size: {args.cell_size}")
+            return 1
+
+        cache = None
+        if not args.no_cache:
+            if args.cache_dir:
+                cache_dir = Path(args.cache_dir)
+            elif args.cache_in_input:
+                cache_dir = input_dir / ".thumbs"
+            else:
+                # The input may be read-only or shared; the output side is ours to write
+                cache_dir = Path(args.output).parent / ".thumbs"
+            cache = ThumbnailCache(cache_dir)
+        create_comparison_grid(
+            images,
+            Path(args.output),
+            cell_width=cell_width,
+            cell_height=cell_height,
+            cols=args.cols,
+            show_labels=not args.no_labels,
+            workers=args.workers,
+            cache=cache,
+        )
+        if cache is not None:
+            print(f"🗂️ Thumbnails: {cache.hits} cached, {cache.misses} decoded")
+
+    elif args.command == "scale":
+        try:
+            resolutions = parse_resolutions(args.resolutions)
+            batches = parse_batches(args.batches)
+        except ValueError:
+            print("Error: invalid --resolutions or --batches")
+            return 1
+        telemetry = _start_telemetry(args)
+        runner = _make_runner(args, telemetry)
+        runner.verbose = False  # one line per operating point instead
+        points = run_scaling(
+            runner,
+            [m.strip() for m in args.models.split(",")],
+            resolutions,
+            batches,
+            args.prompt,
+            args.negative,
+            args.seed,
+            args.repeats,
+            args.warmup,
+            telemetry,
+        )
+        runner.close()
+        _stop_telemetry(telemetry, Path(args.output))
+        print_scaling(points)
+        save_scaling(points, Path(args.output) / "scaling.json")
+
+    elif args.command == "calibrate":
+        try:
+            step_counts = parse_steps(args.steps)
+            predict = parse_steps(args.predict) if args.predict else []
+        except ValueError:
+            print("Error: invalid --steps or --predict")
+            return 1
+        if len(step_counts) < 2:
+            print("Error: --steps needs at least two step counts")
+            return 1
+        model_ids = [m.strip() for m in args.models.split(",")]
+        runner = _make_runner(args)
+        runner.verbose = False  # one line per model instead
+        fits = run_calibration(
+            runner, model_ids, step_counts, args.prompt, args.negative, args.seed, args.repeats, args.warmup
+        )
+        metadata = run_metadata(runner, model_ids)
+        runner.close()
+        print_cost_models(fits, predict)
+        save_cost_models(fits, Path(args.output) / "cost_model.json")
+        if not args.no_db and any(f.error is None for f in fits):
+            with ResultsStore(Path(args.db)) as store:
+                store.append_step_costs(fits, metadata)
+            print(f"Coefficients recorded in {args.db}")
+
+    elif args.command == "load":
+        try:
+            rates = sorted(float(r) for r in args.rates.split(",") if r.strip())
+        except ValueError:
+            print(f"Error: invalid --rates: {args.rates}")
+            return 1
+        runner = ComparisonRunner(
+            comfyui_url=args.url,
+            workflow_dir=Path(args.workflow_dir),
+            output_dir=Path(args.output),
+            completion=args.completion,
+            verbose=False,
+        )
+        models = [BUILTIN_MODELS[m.strip()] for m in args.models.split(",") if m.strip() in BUILTIN_MODELS]
+        if not models:
+            print(f"Error: no known model in {args.models}")
+            return 1
+        if args.warmup:
+            print("Warming up...")
+            runner.run_jobs(runner.build_jobs([m.id for m in models], args.prompt, args.negative, args.seed - 1000, repeats=args.warmup))
+
+        def make_job(i):
+            return GenerationJob(i, models[i % len(models)], args.prompt, args.negative, args.seed + i)
+
+        levels, samples = [], {}
+        for rate in rates:
+            print(f"🚦 {rate:g} req/s ({args.arrival}) for {args.duration:g}s...")
+            level, level_samples = run_load(runner, make_job, rate, args.duration, args.arrival, args.seed, args.timeout)
+            levels.append(level)
+            samples[rate] = level_samples
+        runner.close()
+        saturation = mark_saturation(levels)
+        print_load(levels, saturation)
+        save_load(levels, samples, Path(args.output) / "load.json")
+
+    elif args.command == "trends":
+        if not Path(args.db).exists():
+            print(f"Error: {args.db} not found")
+            return 1
+        with ResultsStore(Path(args.db)) as store:
+            if not args.model:
+                for fingerprint, host_name, runs in store.hosts():
+                    print(f"  {fingerprint}  {host_name:<24} {runs} runs")
+                return 0
+            print_trend(args.model, store.trend(args.model, args.host, args.last, args.metric), args.metric)
+
+    elif args.command == "import":
+        with ResultsStore(Path(args.db)) as store:
+            for raw in args.paths:
+                path = Path(raw)
+                if path.is_dir():
+                    path = path / "results.json"
+                if not path.exists():
+                    print(f"⚠️ {path} not found, skipping")
+                    continue
+                data = json.loads(path.read_text())
+                results = [result_from_dict(r) for r in data.get("results", [])]
+                host = None
+                if args.host:
+                    host = (hashlib.sha1(args.host.encode("utf-8")).hexdigest()[:12], {"node": args.host})
+                run_id = store.append(
+                    results,
+                    label=str(path.parent),
+                    started_at=data.get("timestamp"),
+                    host=host,
+                )
+                print(f"Imported {path}: {len(results)} results as run #{run_id}")
+
+    elif args.command == "check":
+        try:
+            baseline = load_run(args.baseline, Path(args.db))
+            current = load_run(args.current, Path(args.db))
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            return 2
+        metrics = [m.strip() for m in args.metrics.split(",")] if args.metrics else None
+        diffs = compare_runs(baseline, current, args.threshold, args.alpha, args.floor, metrics)
+        if not diffs:
+            print("Error: no model/metric in common between the two runs")
+            return 2
+        print_check(diffs, args.verbose, args.alpha)
+        if any(d.status == "regression" for d in diffs):
+            return 1
+
+    elif args.command == "submit":
+        spool = SubmissionSpool(Path(args.spool))
+        counts = spool.counts()
+        print(f"📥 {args.spool}: {counts['pending']} pending, {counts['submitted']} submitted, {counts['rejected']} rejected")
+        policy = SubmitPolicy(batch_size=args.batch_size, compress=not args.no_compress, retries=args.retries)
+        report = drain(spool, args.endpoint, policy, args.format)
+        print_drain(report, args.endpoint)
+        if report.remaining:
+            return 1
 
     else:
         parser.print_help()
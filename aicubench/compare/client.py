@@ -0,0 +1,403 @@
+"""
+Pooled keep-alive HTTP client for the ComfyUI API
+
+AsyncComfyClient is the implementation, on aiohttp. ComfyClient is its
+blocking face: it runs the same coroutines on a background event loop
+shared by every blocking caller in the process (see run_sync).
+"""
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+from urllib.parse import urlencode, urlparse
+
+import aiohttp
+
+T = TypeVar("T")
+
+# Idle pooled connections are closed after this many seconds, well before
+# ComfyUI's aiohttp server (75s) would drop them under a request
+KEEPALIVE_SECONDS = 15.0
+
+
+class _StaleConnection(ConnectionError):
+    """A reused pooled connection was closed by the server before any response"""
+
+
+class ComfyHTTPError(IOError):
+    """Non-2xx response from ComfyUI"""
+
+    def __init__(self, method: str, path: str, status: int, body: bytes):
+        self.status = status
+        self.body = body
+        super().__init__(f"{method} {path} -> HTTP {status}: {body[:200].decode('utf-8', 'replace')}")
+
+
+@dataclass
+class RetryPolicy:
+    """When and how often a failed request is retried
+
+    Idempotent methods are retried on connection errors and on the listed
+    statuses, with exponential backoff and jitter. Other methods (POST
+    /prompt) are only re-sent when a pooled connection was found closed
+    before the server could have read the request.
+    """
+    retries: int = 2
+    backoff: float = 0.5
+    backoff_max: float = 8.0
+    statuses: Tuple[int, ...] = (502, 503, 504)
+    methods: Tuple[str, ...] = ("GET", "HEAD")
+
+    def delay(self, attempt: int) -> float:
+        return min(self.backoff * 2 ** attempt, self.backoff_max) * random.uniform(0.5, 1.0)
+
+
+@dataclass
+class EndpointStats:
+    """Latency counters for one endpoint, in seconds"""
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.requests if self.requests else 0.0
+
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def background_loop() -> asyncio.AbstractEventLoop:
+    """The event loop blocking callers run coroutines on, started in a daemon thread on first use"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="aicubench-loop", daemon=True).start()
+        return _loop
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """Run a coroutine on the background loop and block until it returns or raises
+
+    If the caller is interrupted (KeyboardInterrupt), the coroutine is
+    cancelled too. Must not be called from the background loop itself.
+    """
+    loop = background_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("Blocking call made from the background event loop; await the coroutine instead")
+    future: Future = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return future.result()
+    except BaseException:
+        future.cancel()
+        raise
+
+
+class AsyncComfyClient:
+    """HTTP client for one ComfyUI server, reusing connections across calls.
+
+    At most pool_size connections are open at once (further requests wait
+    for one); idle ones are kept for KEEPALIVE_SECONDS, so polling and
+    downloads skip the TCP (and TLS) handshake. The aiohttp session is
+    created on first use and bound to the event loop running it.
+    Per-endpoint latency counters are available from stats().
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 30.0,
+        connect_timeout: float = 5.0,
+        pool_size: int = 8,
+        retry: Optional[RetryPolicy] = None,
+    ):
+        """timeout: seconds a response may stall between reads"""
+        parsed = urlparse(base_url)
+        if parsed.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {base_url}")
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.pool_size = pool_size
+        self.retry = retry or RetryPolicy()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._lock = threading.Lock()
+        self._stats: Dict[str, EndpointStats] = {}
+        self.connections_opened = 0
+
+    # === Connection pool ===
+
+    async def _on_connect(self, session, context, params):
+        with self._lock:
+            self.connections_opened += 1
+
+    async def _on_reuse(self, session, context, params):
+        if context.trace_request_ctx is not None:
+            context.trace_request_ctx["reused"] = True
+
+    def _open(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            trace = aiohttp.TraceConfig()
+            trace.on_connection_create_end.append(self._on_connect)
+            trace.on_connection_reuseconn.append(self._on_reuse)
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=KEEPALIVE_SECONDS),
+                timeout=self._timeout(self.timeout),
+                trace_configs=[trace],
+            )
+        return self._session
+
+    def _timeout(self, read: float) -> aiohttp.ClientTimeout:
+        return aiohttp.ClientTimeout(total=None, sock_connect=self.connect_timeout, sock_read=read)
+
+    async def close(self):
+        """Close the session and its pooled connections"""
+        session, self._session = self._session, None
+        if session is not None:
+            await session.close()
+
+    # === Requests ===
+
+    @staticmethod
+    def _endpoint(path: str) -> str:
+        """Counter name for a path: /history/<id> and /history count together"""
+        return "/" + path.lstrip("/").split("?", 1)[0].split("/", 1)[0]
+
+    def _record(self, endpoint: str, seconds: float, error: bool = False, retried: bool = False):
+        with self._lock:
+            stats = self._stats.setdefault(endpoint, EndpointStats())
+            if retried:
+                stats.retries += 1
+                return
+            stats.requests += 1
+            stats.total += seconds
+            stats.max = max(stats.max, seconds)
+            if error:
+                stats.errors += 1
+
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        body: Optional[bytes],
+        headers: Optional[Dict[str, str]],
+        timeout: Optional[float],
+        sink: Optional[Callable[[aiohttp.ClientResponse], Awaitable[Any]]],
+    ) -> Tuple[int, Any]:
+        """One request on a pooled connection; transport failures raise OSError
+
+        sink, if given, consumes successful responses instead of reading
+        the body into memory; its return value is returned as the data.
+        """
+        session = self._open()
+        options = {} if timeout is None else {"timeout": self._timeout(timeout)}
+        context = {"reused": False}
+        try:
+            async with session.request(
+                method, self.base_url + path, data=body, headers=headers, trace_request_ctx=context, **options
+            ) as resp:
+                if sink is not None and resp.status < 300:
+                    return resp.status, await sink(resp)
+                return resp.status, await resp.read()
+        except asyncio.TimeoutError as e:
+            raise TimeoutError(f"{method} {path}: timed out") from e
+        except aiohttp.ServerDisconnectedError as e:
+            if context["reused"]:
+                raise _StaleConnection(f"{method} {path}: {e}") from e
+            raise ConnectionError(f"{method} {path}: {e}") from e
+        except aiohttp.ClientError as e:
+            raise ConnectionError(f"{method} {path}: {e}") from e
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        sink: Optional[Callable[[aiohttp.ClientResponse], Awaitable[Any]]] = None,
+    ) -> Any:
+        """Send a request and return the response body (or what sink returns)
+
+        Raises ComfyHTTPError on a non-2xx status and OSError (including
+        TimeoutError) on connection failures, after retries.
+        """
+        endpoint = self._endpoint(path)
+        retryable = method in self.retry.methods
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                status, data = await self._send(method, path, body, headers, timeout, sink)
+            except OSError as e:
+                if isinstance(e, _StaleConnection) and not retryable and attempt == 0:
+                    # Closed while idle in the pool: the server never read it
+                    attempt += 1
+                    continue
+                if retryable and attempt < self.retry.retries:
+                    self._record(endpoint, 0.0, retried=True)
+                    await asyncio.sleep(self.retry.delay(attempt))
+                    attempt += 1
+                    continue
+                self._record(endpoint, time.perf_counter() - start, error=True)
+                raise
+
+            elapsed = time.perf_counter() - start
+            if status in self.retry.statuses and retryable and attempt < self.retry.retries:
+                self._record(endpoint, 0.0, retried=True)
+                await asyncio.sleep(self.retry.delay(attempt))
+                attempt += 1
+                continue
+            self._record(endpoint, elapsed, error=status >= 400)
+            if status >= 400:
+                raise ComfyHTTPError(method, path, status, data)
+            return data
+
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> bytes:
+        if params:
+            path = f"{path}?{urlencode(params)}"
+        return await self.request("GET", path, timeout=timeout)
+
+    async def download(
+        self,
+        path: str,
+        dest_path: Path,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        chunk_size: int = 256 * 1024,
+    ) -> int:
+        """Stream a response body to a file in chunks; returns bytes written
+
+        The body goes to a .part file that is renamed into place once
+        complete, so an interrupted download never leaves a truncated image.
+        """
+        if params:
+            path = f"{path}?{urlencode(params)}"
+        dest_path = Path(dest_path)
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
+        part_path = dest_path.with_name(dest_path.name + ".part")
+
+        async def write(resp: aiohttp.ClientResponse) -> int:
+            written = 0
+            with open(part_path, "wb") as f:
+                async for chunk in resp.content.iter_chunked(chunk_size):
+                    f.write(chunk)
+                    written += len(chunk)
+            return written
+
+        try:
+            written = await self.request("GET", path, timeout=timeout, sink=write)
+        except BaseException:
+            if part_path.exists():
+                part_path.unlink()
+            raise
+        os.replace(part_path, dest_path)
+        return written
+
+    async def get_json(self, path: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Any:
+        return json.loads((await self.get(path, params, timeout)).decode("utf-8"))
+
+    async def post_json(self, path: str, payload: Any, timeout: Optional[float] = None) -> Any:
+        body = json.dumps(payload).encode("utf-8")
+        data = await self.request("POST", path, body, {"Content-Type": "application/json"}, timeout)
+        return json.loads(data.decode("utf-8")) if data else {}
+
+    # === Counters ===
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-endpoint request counts and latencies (ms), plus connections opened"""
+        with self._lock:
+            endpoints = {
+                name: {
+                    **asdict(s),
+                    "total": round(s.total * 1000, 3),
+                    "max": round(s.max * 1000, 3),
+                    "mean": round(s.mean * 1000, 3),
+                }
+                for name, s in sorted(self._stats.items())
+            }
+            return {"connections_opened": self.connections_opened, "endpoints_ms": endpoints}
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+            self.connections_opened = 0
+
+
+class ComfyClient:
+    """Blocking face of AsyncComfyClient, for one ComfyUI server.
+
+    Every call runs the async client's coroutine on the background event
+    loop (run_sync), so pooling, RetryPolicy, errors (ComfyHTTPError,
+    OSError) and stats() are the same in both. Safe to share between
+    threads. Pass client to wrap an existing AsyncComfyClient.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 30.0,
+        connect_timeout: float = 5.0,
+        pool_size: int = 8,
+        retry: Optional[RetryPolicy] = None,
+        client: Optional[AsyncComfyClient] = None,
+    ):
+        self.aio = client or AsyncComfyClient(base_url, timeout, connect_timeout, pool_size, retry)
+        self.base_url = self.aio.base_url
+
+    def close(self):
+        """Close all pooled connections"""
+        run_sync(self.aio.close())
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> bytes:
+        """Send a request and return the response body; see AsyncComfyClient.request"""
+        return run_sync(self.aio.request(method, path, body, headers, timeout))
+
+    def get(self, path: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> bytes:
+        return run_sync(self.aio.get(path, params, timeout))
+
+    def download(
+        self,
+        path: str,
+        dest_path: Path,
+        params: Optional[Dict[str, Any]] = None,
+        chunk_size: int = 256 * 1024,
+        timeout: Optional[float] = None,
+    ) -> int:
+        """Stream a response body to a file via a .part file; returns bytes written"""
+        return run_sync(self.aio.download(path, dest_path, params, timeout, chunk_size))
+
+    def get_json(self, path: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Any:
+        return run_sync(self.aio.get_json(path, params, timeout))
+
+    def post_json(self, path: str, payload: Any, timeout: Optional[float] = None) -> Any:
+        return run_sync(self.aio.post_json(path, payload, timeout))
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-endpoint request counts and latencies (ms), plus connections opened"""
+        return self.aio.stats()
+
+    def reset_stats(self):
+        self.aio.reset_stats()
@@ -0,0 +1,164 @@
+"""
+Step-count cost model: fixed overhead plus per-step sampling time per model
+"""
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .models import BUILTIN_MODELS, ModelConfig
+from .runner import GenerationJob
+from .stats import linear_fit, median
+
+
+@dataclass
+class StepCostFit:
+    """Execution time of one model as fixed + per_step * steps"""
+    model_id: str
+    sampler: str = ""
+    scheduler: str = ""
+    cfg: Optional[float] = None
+    fixed: Optional[float] = None      # seconds per prompt regardless of steps (encode, decode, save)
+    per_step: Optional[float] = None   # seconds per sampler step
+    r2: Optional[float] = None
+    samples: int = 0
+    points: Dict[int, float] = field(default_factory=dict)  # steps -> median seconds
+    error: Optional[str] = None
+
+    def predict(self, steps: int) -> Optional[float]:
+        """Predicted execution seconds at a step count, or None if not fitted"""
+        if self.fixed is None or self.per_step is None:
+            return None
+        return self.fixed + self.per_step * steps
+
+
+def sampling_overrides(model: ModelConfig, steps: int) -> Dict[str, Any]:
+    """Template values that run a model with its configured sampler at `steps`"""
+    return {"steps": steps, "cfg": model.cfg, "sampler_name": model.sampler, "scheduler": model.scheduler}
+
+
+def parse_steps(value: str) -> List[int]:
+    steps = sorted({int(v) for v in value.split(",") if v.strip()})
+    if any(s <= 0 for s in steps):
+        raise ValueError("step counts must be positive")
+    return steps
+
+
+def calibrate_model(
+    runner,
+    model_id: str,
+    step_counts: List[int],
+    positive: str,
+    negative: str = "",
+    seed: int = 42,
+    repeats: int = 3,
+    warmup: int = 1,
+) -> StepCostFit:
+    """Time a model at each step count and fit execution time against steps
+
+    Warmups run first so the model load is not billed to any step count;
+    measured runs cycle through the step counts so slow drift (clocks,
+    thermals) spreads over all of them. Each point is the median
+    execution time of its runs, and the line is fitted to those medians.
+    """
+    model = BUILTIN_MODELS[model_id]
+    fit = StepCostFit(model_id, model.sampler, model.scheduler, model.cfg)
+    first = getattr(runner, "runners", [runner])[0]
+    try:
+        template = first.templates.get(first.workflow_dir / model.workflow_file, model)
+    except FileNotFoundError as e:
+        fit.error = str(e)
+        return fit
+    if "steps" not in template.points:
+        fit.error = "workflow has no literal steps input to rewrite"
+        return fit
+
+    # Every job gets its own seed so ComfyUI's cache cannot skip the sampler
+    jobs: List[GenerationJob] = []
+    for w in range(warmup):
+        jobs.append(GenerationJob(
+            len(jobs), model, positive, negative, seed + len(jobs),
+            repeat=w, warmup=True, overrides=sampling_overrides(model, step_counts[0]),
+        ))
+    for r in range(repeats):
+        for steps in step_counts:
+            jobs.append(GenerationJob(
+                len(jobs), model, positive, negative, seed + len(jobs),
+                repeat=r, overrides=sampling_overrides(model, steps),
+            ))
+    steps_by_seed = {job.seed: job.overrides["steps"] for job in jobs if not job.warmup}
+
+    results = runner.run_jobs(jobs)
+    times: Dict[int, List[float]] = {}
+    for result in results:
+        if result.warmup or not result.success or result.seed not in steps_by_seed:
+            continue
+        seconds = result.execution_time if result.execution_time is not None else result.elapsed_time
+        times.setdefault(steps_by_seed[result.seed], []).append(seconds)
+
+    fit.points = {steps: median(values) for steps, values in sorted(times.items())}
+    fit.samples = sum(len(values) for values in times.values())
+    if len(fit.points) < 2:
+        failed = next((r for r in results if not r.success), None)
+        fit.error = failed.error if failed else "fewer than two step counts measured"
+        return fit
+    fit.fixed, fit.per_step, fit.r2 = linear_fit(list(fit.points), list(fit.points.values()))
+    return fit
+
+
+def run_calibration(
+    runner,
+    model_ids: List[str],
+    step_counts: List[int],
+    positive: str,
+    negative: str = "",
+    seed: int = 42,
+    repeats: int = 3,
+    warmup: int = 1,
+) -> List[StepCostFit]:
+    fits = []
+    for model_id in model_ids:
+        if model_id not in BUILTIN_MODELS:
+            print(f"\n⚠️  Model not found: {model_id}")
+            continue
+        print(f"📏 [{model_id}] steps {','.join(map(str, step_counts))} x{repeats}...", end="", flush=True)
+        fit = calibrate_model(runner, model_id, step_counts, positive, negative, seed, repeats, warmup)
+        fits.append(fit)
+        if fit.error:
+            print(f" ❌ {fit.error}")
+        else:
+            print(f" {fit.fixed:.2f}s + {fit.per_step * 1000:.1f}ms/step (r²={fit.r2:.3f})")
+    return fits
+
+
+def print_cost_models(fits: List[StepCostFit], predict: Optional[List[int]] = None):
+    """Fitted coefficients plus predicted seconds at `predict` and at each model's configured steps"""
+    predict = predict or []
+    print(f"\n{'=' * 78}")
+    print("STEP COST MODEL (execution seconds = fixed + per step x steps)")
+    print("=" * 78)
+    header = "".join(f" {'@' + str(s):>7}" for s in predict)
+    print(f"  {'model':<16} {'fixed':>7} {'ms/step':>8} {'r²':>6}{header} {'config':>12}")
+    for fit in fits:
+        if fit.error:
+            print(f"❌ {fit.model_id:<16} {fit.error}")
+            continue
+        configured = BUILTIN_MODELS[fit.model_id].steps
+        predicted = "".join(f" {fit.predict(s):7.2f}" for s in predict)
+        print(
+            f"{'⚠️' if fit.r2 < 0.9 else '  '} {fit.model_id:<16} {fit.fixed:7.2f} {fit.per_step * 1000:8.1f} {fit.r2:6.3f}"
+            f"{predicted} {fit.predict(configured):7.2f}@{configured:<4}"
+        )
+    if any(f.r2 is not None and f.r2 < 0.9 for f in fits):
+        print("\n⚠️ = r² below 0.9: time is not linear in steps here, or too noisy; add --repeats")
+
+
+def save_cost_models(fits: List[StepCostFit], output_path: Path):
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "models": [asdict(f) for f in fits],
+    }
+    output_path.write_text(json.dumps(data, indent=2))
+    print(f"\nCost model saved to: {output_path}")
@@ -0,0 +1,142 @@
+"""
+Background image downloads that overlap with generation
+"""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .runner import GenerationResult
+from .scheduler import MultiServerScheduler
+
+
+def result_images(result: GenerationResult) -> List[Dict[str, Any]]:
+    """Every image of a result; results journaled before images were recorded only have filename"""
+    if result.images:
+        return result.images
+    return [{"filename": result.filename}] if result.filename else []
+
+
+def image_paths(result: GenerationResult, dest_dir: Path, stem: str) -> List[Path]:
+    """Local paths for every image of a result: stem.png, stem_1.png, ..."""
+    return [
+        dest_dir / (f"{stem}.png" if i == 0 else f"{stem}_{i}.png")
+        for i in range(len(result_images(result)))
+    ]
+
+
+def source_for(runner, result: GenerationResult):
+    """The ComparisonRunner that can download a result's images"""
+    if isinstance(runner, MultiServerScheduler):
+        return runner.runner_for(result.server)
+    return runner
+
+
+class DownloadQueue:
+    """Fetch the images of finished jobs on a small thread pool.
+
+    Jobs are submitted from on_result callbacks, so a model's images are
+    streamed to disk while the next model is generating. Each result gets
+    its local_paths and phases.download (wall time for all its images)
+    filled in by the time wait() returns.
+    """
+
+    def __init__(self, max_workers: int = 4, verbose: bool = True):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="download")
+        self._futures: List[Future] = []
+        self._lock = threading.Lock()
+        self.verbose = verbose
+        self.failed = 0
+
+    def submit(
+        self,
+        source,
+        result: GenerationResult,
+        dest_dir: Path,
+        stem: str,
+        skip_existing: bool = False,
+        on_done: Optional[Callable[[GenerationResult], None]] = None,
+    ) -> Future:
+        """Queue downloads of all of a result's images
+
+        source is the ComparisonRunner of the server that produced it.
+        on_done, if given, is called with the result once its local_paths
+        and download time are filled in, before the future completes.
+        """
+        future = self._pool.submit(self._download, source, result, Path(dest_dir), stem, skip_existing, on_done)
+        with self._lock:
+            self._futures.append(future)
+        return future
+
+    def _download(
+        self,
+        source,
+        result: GenerationResult,
+        dest_dir: Path,
+        stem: str,
+        skip_existing: bool,
+        on_done: Optional[Callable[[GenerationResult], None]],
+    ):
+        start = time.perf_counter()
+        local_paths = []
+        for image, local_path in zip(result_images(result), image_paths(result, dest_dir, stem)):
+            filename = image.get("filename", "")
+            if not (skip_existing and local_path.exists()):
+                try:
+                    source.save_image(filename, local_path, image.get("subfolder", ""), image.get("type", ""))
+                except Exception as e:
+                    with self._lock:
+                        self.failed += 1
+                    print(f"Failed to download {filename}: {e}")
+                    continue
+                if self.verbose:
+                    print(f"Downloaded: {filename} -> {local_path}")
+            local_paths.append(str(local_path))
+        result.local_paths = local_paths
+        result.phases.download = time.perf_counter() - start
+        if on_done:
+            on_done(result)
+
+    def wait(self):
+        """Block until every queued download has finished"""
+        while True:
+            with self._lock:
+                pending = [f for f in self._futures if not f.done()]
+            if not pending:
+                return
+            for future in pending:
+                future.result()
+
+    def close(self):
+        self.wait()
+        self._pool.shutdown()
+
+    def __enter__(self) -> "DownloadQueue":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def download_hook(
+    queue: DownloadQueue,
+    runner,
+    dest_dir: Callable[[GenerationResult], Path],
+    stem: Callable[[GenerationResult], str],
+    skip_existing: bool = False,
+    on_done: Optional[Callable[[Any, GenerationResult], None]] = None,
+):
+    """on_result callback queueing images of measured repeat-0 results
+
+    runner is a ComparisonRunner or MultiServerScheduler. on_done, if
+    given, gets (job, result) once the result is final: after its images
+    are downloaded, or right away for results that download nothing.
+    """
+    def on_result(job, result: GenerationResult):
+        if result.success and result.filename and not result.warmup and result.repeat == 0:
+            done = (lambda r: on_done(job, r)) if on_done else None
+            queue.submit(source_for(runner, result), result, dest_dir(result), stem(result), skip_existing, done)
+        elif on_done:
+            on_done(job, result)
+    return on_result
@@ -0,0 +1,674 @@
+"""
+Local ComfyUI stand-in for exercising the harness without a GPU
+
+Implements the parts of the ComfyUI API the harness talks to: /prompt,
+/history, /view, /queue, /interrupt, /system_stats and the /ws event stream. Prompts
+execute one at a time, node by node, sleeping a configurable latency per
+node class instead of running anything. FakeCollector stands in for the
+result collection endpoint the submission spool drains to.
+
+Run standalone with:
+    python -m aicubench.compare.fakeserver --port 8188 --latency KSampler=2.0
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import random
+import socket
+import struct
+import threading
+import time
+import uuid
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from aiohttp import web
+
+from .templates import MODEL_LOADER_TYPES
+
+SAMPLER_TYPES = ("KSampler", "KSamplerAdvanced", "SamplerCustom", "SamplerCustomAdvanced")
+
+
+def make_png(width: int, height: int, color: Tuple[int, int, int] = (200, 40, 40)) -> bytes:
+    """Encode a solid-color RGB PNG with the standard library only"""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    row = b"\x00" + bytes(color) * width
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(row * height))
+        + chunk(b"IEND", b"")
+    )
+
+
+class FakeComfyUI:
+    """An aiohttp server mimicking ComfyUI's API, like the real one built on aiohttp.web.
+
+    The server runs its own event loop in a thread; prompts execute in
+    another, which hands event messages to each /ws connection's queue.
+
+    latency: seconds per node class_type (e.g. {"KSampler": 1.5}); other
+        nodes take default_latency
+    fail_rate: probability that a prompt fails in its sampler node
+    fail_types: node class_types that always fail
+    image_size: (width, height) of the PNG served by /view
+
+    Loader nodes whose inputs match the previous prompt are reported as
+    cached and take no time, like a warm ComfyUI.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: Optional[Dict[str, float]] = None,
+        default_latency: float = 0.0,
+        fail_rate: float = 0.0,
+        fail_types: Iterable[str] = (),
+        image_size: Tuple[int, int] = (64, 96),
+        seed: int = 0,
+        vram_mp: Optional[float] = None,
+        step_latency: float = 0.0,
+    ):
+        """vram_mp: batch x megapixels the fake GPU fits; beyond it samplers
+        fail with OutOfMemoryError, and sampler latency scales with the
+        batch's megapixels (latency is then per megapixel).
+        step_latency: seconds per sampler step, added to the sampler's latency"""
+        self.latency = dict(latency or {})
+        self.step_latency = step_latency
+        self.vram_mp = vram_mp
+        self._peak_mp = 0.0
+        self.default_latency = default_latency
+        self.fail_rate = fail_rate
+        self.fail_types = set(fail_types)
+        self.image = make_png(*image_size)
+        self._rng = random.Random(seed)
+
+        self._cv = threading.Condition()
+        self._queue: List[Tuple[str, dict, str]] = []
+        self._history: Dict[str, Dict[str, Any]] = {}
+        self._clients: Dict[str, List[asyncio.Queue]] = {}
+        self._loaded: Dict[str, str] = {}
+        self._running: Optional[str] = None
+        self._interrupted = False
+        self._stopped = False
+
+        # Bound now so url is known before start()
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((host, port))
+        self._address = self._sock.getsockname()[:2]
+        self._loop = asyncio.new_event_loop()
+        self._sockets: List[web.WebSocketResponse] = []
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def url(self) -> str:
+        host, port = self._address
+        return f"http://{host}:{port}"
+
+    def devices(self) -> List[Dict[str, Any]]:
+        """/system_stats devices; torch's reserved VRAM follows the largest batch run (1 MP = 1 GB)"""
+        if self.vram_mp is None:
+            return []
+        total = int(self.vram_mp * 2**30)
+        reserved = int(self._peak_mp * 2**30)
+        return [{
+            "name": "fake", "type": "cuda", "index": 0,
+            "vram_total": total, "vram_free": total - reserved,
+            "torch_vram_total": reserved, "torch_vram_free": 0,
+        }]
+
+    @property
+    def prompts_run(self) -> int:
+        with self._cv:
+            return len(self._history)
+
+    def start(self) -> "FakeComfyUI":
+        ready = threading.Event()
+        for target, args in ((self._serve, (ready,)), (self._execute_loop, ())):
+            thread = threading.Thread(target=target, args=args, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        ready.wait()
+        return self
+
+    def stop(self):
+        with self._cv:
+            self._stopped = True
+            self._cv.notify_all()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+    # === HTTP and WebSocket ===
+
+    def _serve(self, ready: threading.Event):
+        asyncio.set_event_loop(self._loop)
+        app = web.Application()
+        app.router.add_get("/ws", self._websocket)
+        app.router.add_get("/history", self._get_history)
+        app.router.add_get("/history/{prompt_id}", self._get_history)
+        app.router.add_get("/queue", self._get_queue)
+        app.router.add_get("/view", self._get_view)
+        app.router.add_get("/system_stats", self._get_system_stats)
+        app.router.add_post("/prompt", self._post_prompt)
+        app.router.add_post("/queue", self._post_queue)
+        app.router.add_post("/interrupt", self._post_interrupt)
+        app.on_shutdown.append(self._close_sockets)
+        runner = web.AppRunner(app, access_log=None)
+        self._loop.run_until_complete(runner.setup())
+        self._loop.run_until_complete(web.SockSite(runner, self._sock).start())
+        ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.run_until_complete(runner.cleanup())
+            self._loop.close()
+
+    async def _close_sockets(self, app: web.Application):
+        for ws in list(self._sockets):
+            await ws.close()
+
+    @staticmethod
+    async def _body(request: web.Request) -> Optional[dict]:
+        try:
+            body = json.loads(await request.read() or b"{}")
+        except ValueError:
+            return None
+        return body if isinstance(body, dict) else None
+
+    async def _get_history(self, request: web.Request) -> web.Response:
+        return web.json_response(self.history(request.match_info.get("prompt_id")))
+
+    async def _get_queue(self, request: web.Request) -> web.Response:
+        return web.json_response(self.queue_state())
+
+    async def _get_view(self, request: web.Request) -> web.Response:
+        return web.Response(body=self.image, content_type="image/png")
+
+    async def _get_system_stats(self, request: web.Request) -> web.Response:
+        return web.json_response({"system": {"comfyui_version": "fake", "os": "posix"}, "devices": self.devices()})
+
+    async def _post_prompt(self, request: web.Request) -> web.Response:
+        body = await self._body(request)
+        if body is None:
+            return web.json_response({"error": "invalid json"}, status=400)
+        workflow = body.get("prompt")
+        if not isinstance(workflow, dict) or not workflow:
+            return web.json_response({"error": {"type": "invalid_prompt", "message": "No prompt provided"}, "node_errors": {}}, status=400)
+        prompt_id = self.submit(workflow, body.get("client_id", ""))
+        return web.json_response({"prompt_id": prompt_id, "number": self.prompts_run, "node_errors": {}})
+
+    async def _post_queue(self, request: web.Request) -> web.Response:
+        body = await self._body(request)
+        if body is None:
+            return web.json_response({"error": "invalid json"}, status=400)
+        return web.json_response({"deleted": self.delete(body.get("delete") or [])})
+
+    async def _post_interrupt(self, request: web.Request) -> web.Response:
+        body = await self._body(request)
+        if body is None:
+            return web.json_response({"error": "invalid json"}, status=400)
+        self.interrupt(body.get("prompt_id"))
+        return web.json_response({})
+
+    async def _websocket(self, request: web.Request) -> web.WebSocketResponse:
+        client_id = request.query.get("clientId", "")
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        messages: asyncio.Queue = asyncio.Queue()
+        with self._cv:
+            self._clients.setdefault(client_id, []).append(messages)
+        self._sockets.append(ws)
+
+        async def forward():
+            try:
+                while True:
+                    await ws.send_str(await messages.get())
+            except ConnectionError:
+                pass
+
+        await ws.send_json({"type": "status", "data": {"sid": client_id, "status": {"exec_info": {"queue_remaining": 0}}}})
+        writer = asyncio.ensure_future(forward())
+        try:
+            # Client messages are not interpreted; the connection lives
+            # until the client hangs up
+            async for _ in ws:
+                pass
+        finally:
+            writer.cancel()
+            self._sockets.remove(ws)
+            with self._cv:
+                self._clients[client_id].remove(messages)
+        return ws
+
+    def __enter__(self) -> "FakeComfyUI":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # === Prompt execution ===
+
+    def submit(self, workflow: dict, client_id: str) -> str:
+        prompt_id = str(uuid.uuid4())
+        with self._cv:
+            self._queue.append((prompt_id, workflow, client_id))
+            self._cv.notify_all()
+        return prompt_id
+
+    def delete(self, prompt_ids: Iterable[str]) -> int:
+        """Drop prompts still waiting in the queue; returns how many were removed"""
+        prompt_ids = set(prompt_ids)
+        with self._cv:
+            before = len(self._queue)
+            self._queue[1:] = [q for q in self._queue[1:] if q[0] not in prompt_ids]
+            return before - len(self._queue)
+
+    def interrupt(self, prompt_id: Optional[str] = None):
+        """Stop the running prompt (only if it is prompt_id, when given)"""
+        with self._cv:
+            if self._running is not None and prompt_id in (None, self._running):
+                self._interrupted = True
+
+    def queue_state(self) -> Dict[str, list]:
+        with self._cv:
+            entries = [[i, prompt_id, workflow, {}, []] for i, (prompt_id, workflow, _) in enumerate(self._queue)]
+        return {"queue_running": entries[:1], "queue_pending": entries[1:]}
+
+    def history(self, prompt_id: Optional[str] = None) -> Dict[str, Any]:
+        with self._cv:
+            if prompt_id is None:
+                return dict(self._history)
+            return {prompt_id: self._history[prompt_id]} if prompt_id in self._history else {}
+
+    def _send(self, client_id: str, msg_type: str, data: Dict[str, Any]):
+        """Hand a message to every /ws connection of client_id (from the execution thread)"""
+        with self._cv:
+            queues = list(self._clients.get(client_id, []))
+        text = json.dumps({"type": msg_type, "data": data})
+        for messages in queues:
+            try:
+                self._loop.call_soon_threadsafe(messages.put_nowait, text)
+            except RuntimeError:
+                # The server loop has stopped
+                pass
+
+    def _execute_loop(self):
+        while True:
+            with self._cv:
+                while not self._queue and not self._stopped:
+                    self._cv.wait()
+                if self._stopped:
+                    return
+                prompt_id, workflow, client_id = self._queue[0]
+                self._running, self._interrupted = prompt_id, False
+            entry = self._execute(prompt_id, workflow, client_id)
+            with self._cv:
+                self._running = None
+                self._queue.pop(0)
+                self._history[prompt_id] = entry
+
+    def _execute(self, prompt_id: str, workflow: dict, client_id: str) -> Dict[str, Any]:
+        messages = []
+
+        def emit(msg_type: str, data: Dict[str, Any]):
+            data = {**data, "prompt_id": prompt_id}
+            if msg_type.startswith("execution_"):
+                messages.append([msg_type, {**data, "timestamp": int(time.time() * 1000)}])
+            self._send(client_id, msg_type, data)
+
+        emit("execution_start", {})
+        cached = [
+            node_id for node_id, node in workflow.items()
+            if node.get("class_type") in MODEL_LOADER_TYPES
+            and self._loaded.get(node_id) == json.dumps(node.get("inputs"), sort_keys=True)
+        ]
+        emit("execution_cached", {"nodes": cached})
+
+        # SaveImage emits one file per latent in the batch, like ComfyUI
+        batch = max(
+            [n.get("inputs", {}).get("batch_size", 1) for n in workflow.values()
+             if str(n.get("class_type", "")).startswith("EmptyLatent")] or [1]
+        )
+        batch = batch if isinstance(batch, int) else 1
+        width, height = max(
+            [(n.get("inputs", {}).get("width", 512), n.get("inputs", {}).get("height", 512)) for n in workflow.values()
+             if str(n.get("class_type", "")).startswith("EmptyLatent")] or [(512, 512)]
+        )
+        work_mp = batch * width * height / 1e6 if isinstance(width, int) and isinstance(height, int) else 0.0
+        fail = self._rng.random() < self.fail_rate
+        outputs: Dict[str, Any] = {}
+        error = None
+        for node_id, node in workflow.items():
+            if node_id in cached:
+                continue
+            class_type = node.get("class_type", "")
+            inputs = node.get("inputs", {})
+            emit("executing", {"node": node_id})
+            error = self._run_node(node_id, class_type, inputs, fail, emit, work_mp)
+            if self._interrupted:
+                error = "interrupted"
+                emit("execution_interrupted", {"node_id": node_id, "node_type": class_type})
+                break
+            if error:
+                emit("execution_error", {
+                    "node_id": node_id,
+                    "node_type": class_type,
+                    "exception_type": "torch.OutOfMemoryError" if "out of memory" in error else "RuntimeError",
+                    "exception_message": error,
+                })
+                break
+            if class_type in MODEL_LOADER_TYPES:
+                self._loaded[node_id] = json.dumps(inputs, sort_keys=True)
+            if class_type == "SaveImage":
+                prefix = inputs.get("filename_prefix", "ComfyUI")
+                images = [
+                    {"filename": f"{prefix}_{i + 1:05d}_.png", "subfolder": "", "type": "output"}
+                    for i in range(batch)
+                ]
+                outputs[node_id] = {"images": images}
+                emit("executed", {"node": node_id, "output": {"images": images}})
+
+        if not error:
+            emit("executing", {"node": None})
+            emit("execution_success", {})
+        return {
+            "prompt": [0, prompt_id, workflow, {}, list(outputs)],
+            "outputs": outputs,
+            "status": {
+                "status_str": "error" if error else "success",
+                "completed": not error,
+                "messages": messages,
+            },
+        }
+
+    def _run_node(self, node_id: str, class_type: str, inputs: dict, fail: bool, emit, work_mp: float = 0.0) -> Optional[str]:
+        """Sleep for the node's latency; return an error message if it fails"""
+        seconds = self.latency.get(class_type, self.default_latency)
+        steps = inputs.get("steps")
+        steps = steps if isinstance(steps, int) and steps > 0 else 20
+        if class_type in SAMPLER_TYPES:
+            seconds += self.step_latency * steps
+        if class_type in SAMPLER_TYPES and self.vram_mp is not None:
+            if work_mp > self.vram_mp:
+                return f"CUDA out of memory: batch needs {work_mp:.1f} MP, fake GPU fits {self.vram_mp:.1f} MP"
+            self._peak_mp = max(self._peak_mp, work_mp)
+            # Batching amortizes per-step overhead, so time grows sublinearly
+            seconds *= work_mp ** 0.8
+        if class_type in SAMPLER_TYPES:
+            for step in range(steps):
+                if self._interrupted:
+                    return None
+                time.sleep(seconds / steps)
+                emit("progress", {"value": step + 1, "max": steps, "node": node_id})
+            if fail:
+                return "simulated sampler failure"
+        elif seconds:
+            time.sleep(seconds)
+        if class_type in self.fail_types:
+            return f"simulated {class_type} failure"
+        return None
+
+
+class FakeFileServer:
+    """Static file server with HTTP range support, for the model downloader.
+
+    drop_after: close each response after this many body bytes, to exercise
+        resume (a ranged retry then continues from there)
+    ranges: set False to behave like a server without Range support
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        drop_after: Optional[int] = None,
+        ranges: bool = True,
+    ):
+        self.directory = Path(directory)
+        self.drop_after = drop_after
+        self.ranges = ranges
+        self.requests: List[Tuple[str, Optional[str]]] = []  # (path, Range header)
+        self._httpd = ThreadingHTTPServer((host, port), _FileHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.files = self
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeFileServer":
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeFileServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _FileHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        files: FakeFileServer = self.server.files
+        range_header = self.headers.get("Range")
+        files.requests.append((self.path, range_header))
+        path = files.directory / Path(urlparse(self.path).path).name
+        if not path.is_file():
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        size = path.stat().st_size
+        start, end = 0, size - 1
+        if files.ranges and range_header and range_header.startswith("bytes="):
+            first, _, last = range_header[len("bytes="):].partition("-")
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+        if files.ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+
+        remaining = end - start + 1
+        if files.drop_after is not None and remaining > files.drop_after:
+            remaining = files.drop_after
+            self.close_connection = True
+        with open(path, "rb") as f:
+            f.seek(start)
+            try:
+                while remaining > 0:
+                    chunk = f.read(min(remaining, 64 * 1024))
+                    if not chunk:
+                        break
+                    self.wfile.write(chunk)
+                    remaining -= len(chunk)
+            except (BrokenPipeError, ConnectionResetError):
+                # Clients probing the size hang up after the headers
+                self.close_connection = True
+
+
+class FakeCollector:
+    """Result collection endpoint stand-in, for the submission spool.
+
+    Accepts batches ({"records": [...]}, optionally gzip) and flat single
+    records, and keeps each record id once however often it is resent.
+
+    fail_first: answer this many requests with `fail_status` before accepting
+    fail_status: status of those failures (503, 429, ...)
+    retry_after: Retry-After header sent with them, if any
+    reject_ids: record ids refused with 422
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        fail_first: int = 0,
+        fail_status: int = 503,
+        retry_after: Optional[str] = None,
+        reject_ids: Iterable[str] = (),
+    ):
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.retry_after = retry_after
+        self.reject_ids = set(reject_ids)
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self.requests: List[Dict[str, Any]] = []  # headers and record count of every request
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _CollectorHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.collector = self
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/collect"
+
+    def start(self) -> "FakeCollector":
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeCollector":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def receive(self, headers, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        with self._lock:
+            entry = {"encoding": headers.get("Content-Encoding"), "key": headers.get("Idempotency-Key"), "bytes": len(body)}
+            self.requests.append(entry)
+            if self.fail_first > 0:
+                self.fail_first -= 1
+                return self.fail_status, {"error": "unavailable"}
+            if entry["encoding"] == "gzip":
+                body = gzip.decompress(body)
+            data = json.loads(body)
+            records = data["records"] if "records" in data else [{"id": data.get("uuid"), "payload": data}]
+            entry["records"] = len(records)
+            refused = [r["id"] for r in records if r["id"] in self.reject_ids]
+            if refused:
+                return 422, {"error": "invalid record", "ids": refused}
+            duplicates = sum(1 for r in records if r["id"] in self.records)
+            for record in records:
+                self.records.setdefault(record["id"], record)
+            return 200, {"accepted": len(records) - duplicates, "duplicates": duplicates}
+
+
+class _CollectorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        collector: FakeCollector = self.server.collector
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        code, reply = collector.receive(self.headers, body)
+        data = json.dumps(reply).encode()
+        self.send_response(code)
+        if code == collector.fail_status and collector.retry_after:
+            self.send_header("Retry-After", collector.retry_after)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _latency_arg(value: str) -> Tuple[str, float]:
+    class_type, _, seconds = value.partition("=")
+    if not seconds:
+        raise argparse.ArgumentTypeError("expected CLASS_TYPE=SECONDS")
+    return class_type, float(seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local ComfyUI stand-in for harness testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8188)
+    parser.add_argument(
+        "--latency",
+        type=_latency_arg,
+        action="append",
+        default=[],
+        help="Per-node latency as CLASS_TYPE=SECONDS (repeatable)",
+    )
+    parser.add_argument("--default-latency", type=float, default=0.0, help="Latency of other nodes")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of prompts that fail")
+    parser.add_argument("--fail-type", action="append", default=[], help="Node class_type that always fails")
+    parser.add_argument("--image-size", type=str, default="64x96", help="WIDTHxHEIGHT of served images")
+    parser.add_argument(
+        "--vram-mp",
+        type=float,
+        default=None,
+        help="Batch megapixels the fake GPU fits; larger batches fail with out of memory",
+    )
+    parser.add_argument("--step-latency", type=float, default=0.0, help="Seconds per sampler step")
+    parser.add_argument("--collector", action="store_true", help="Serve a result collection endpoint instead")
+    parser.add_argument("--collector-fail", type=int, default=0, help="Requests the collector answers with 503 first")
+    args = parser.parse_args()
+
+    if args.collector:
+        collector = FakeCollector(host=args.host, port=args.port, fail_first=args.collector_fail).start()
+        print(f"🧪 Fake collector listening on {collector.url}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            print(f"Received {len(collector.records)} record(s) in {len(collector.requests)} request(s)")
+            collector.stop()
+        return
+
+    width, height = (int(v) for v in args.image_size.lower().split("x"))
+    server = FakeComfyUI(
+        host=args.host,
+        port=args.port,
+        latency=dict(args.latency),
+        default_latency=args.default_latency,
+        fail_rate=args.fail_rate,
+        fail_types=args.fail_type,
+        image_size=(width, height),
+        vram_mp=args.vram_mp,
+        step_latency=args.step_latency,
+    ).start()
+    print(f"🧪 Fake ComfyUI listening on {server.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,19 @@
 Comparison grid image generator
 Based on elena-comparison/combine_images.py
 """
+import hashlib
+import io
+import json
+import os
 import platform
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Tuple, Optional, Dict, Any
+from typing import Iterable, Iterator, List, Tuple, Optional, Dict, Any
 
 try:
     from PIL import Image, ImageDraw, ImageFont
@@ -15,8 +24,59 @@ except ImportError:
     ImageFont = None
 
 
+# Card colors for each timing phase, in drawing order
+PHASE_COLORS = [
+    ("queue", "#555577"),
+    ("load", "#f5a623"),
+    ("encode", "#4a90e2"),
+    ("sample", "#00ff88"),
+    ("decode", "#bd10e0"),
+    ("save", "#50e3c2"),
+    ("other", "#888888"),
+    ("download", "#e94560"),
+]
+
+# Below this many cells a process pool costs more than it saves
+PARALLEL_MIN_CELLS = 8
+PNG_COMPRESS_LEVEL = 6
+
+# Node class_type -> card phase
+NODE_PHASES = {
+    "CheckpointLoaderSimple": "load",
+    "CheckpointLoader": "load",
+    "UNETLoader": "load",
+    "CLIPLoader": "load",
+    "VAELoader": "load",
+    "LoraLoader": "load",
+    "CLIPTextEncode": "encode",
+    "KSampler": "sample",
+    "KSamplerAdvanced": "sample",
+    "SamplerCustomAdvanced": "sample",
+    "VAEDecode": "decode",
+    "SaveImage": "save",
+}
+
+
+def phase_segments(phases: Dict[str, Any]) -> List[Tuple[str, float]]:
+    """Collapse a result's phase timings into card phases (name, seconds)"""
+    totals: Dict[str, float] = {}
+    totals["queue"] = sum(
+        phases.get(key) or 0 for key in ("prepare", "http_queue", "queue_wait")
+    )
+    nodes = phases.get("nodes") or {}
+    for class_type, seconds in nodes.items():
+        phase = NODE_PHASES.get(class_type, "other")
+        totals[phase] = totals.get(phase, 0) + seconds
+    execution = phases.get("execution")
+    if execution:
+        totals["other"] = totals.get("other", 0) + max(execution - sum(nodes.values()), 0)
+    totals["download"] = phases.get("download") or 0
+    return [(name, totals[name]) for name, _ in PHASE_COLORS if totals.get(name, 0) > 0]
+
+
+@lru_cache(maxsize=None)
 def get_font(size: int):
-    """Get a font, with fallback to default"""
+    """Get a font, with fallback to default (cached per size)"""
     if ImageFont is None:
         return None
 
@@ -56,6 +116,245 @@ def get_environment_info() -> str:
     return f"{os_label} / {machine} / RAM {ram_gb:.0f}GB / {node}"
 
 
+def load_cell(path: Path, size: Tuple[int, int], cached: Optional[Path] = None):
+    """Decode an image scaled to fit size, or None if it is missing/unreadable
+
+    thumbnail() with a reducing_gap lets JPEG decode at reduced resolution
+    (draft) and shrinks other formats with a cheap integer reduce() before
+    the final LANCZOS pass, so full-size pixels are resampled only once.
+    With `cached`, a thumbnail already there is used as is, and a freshly
+    decoded one is stored there.
+    """
+    if cached is not None and cached.exists():
+        try:
+            with Image.open(cached) as img:
+                return img.convert("RGB")
+        except (OSError, ValueError):
+            pass  # damaged cache entry: decode again
+    try:
+        with Image.open(path) as img:
+            img.thumbnail(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+            cell = img.convert("RGB")
+    except (OSError, ValueError):
+        return None
+    if cached is not None:
+        tmp = cached.with_name(f"{cached.stem}.{os.getpid()}.tmp")
+        cell.save(tmp, "PNG", compress_level=1)
+        os.replace(tmp, cached)
+    return cell
+
+
+class ThumbnailCache:
+    """Downscaled cells on disk, keyed by source content hash and cell size.
+
+    index.json maps each source path to its (mtime, size, sha1), so only
+    new or modified sources are hashed again; a changed image gets a new
+    hash and therefore a new thumbnail.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.index_path = self.directory / "index.json"
+        self.hits = 0
+        self.misses = 0
+        try:
+            self._index: Dict[str, list] = json.loads(self.index_path.read_text())
+        except (OSError, ValueError):
+            self._index = {}
+        self._dirty = False
+
+    def path_for(self, source: Path, size: Tuple[int, int]) -> Optional[Path]:
+        """Cache file for source at size, or None if the source is missing"""
+        try:
+            st = os.stat(source)
+        except OSError:
+            return None
+        key = str(Path(source).resolve())
+        stamp = [st.st_mtime_ns, st.st_size]
+        entry = self._index.get(key)
+        if entry and entry[:2] == stamp:
+            digest = entry[2]
+        else:
+            digest = hashlib.sha1(Path(source).read_bytes()).hexdigest()
+            self._index[key] = stamp + [digest]
+            self._dirty = True
+        return self.directory / f"{digest}_{size[0]}x{size[1]}.png"
+
+    def save(self):
+        if self._dirty:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self.index_path.write_text(json.dumps(self._index))
+            self._dirty = False
+
+
+def load_cells(
+    paths: Iterable[Path],
+    size: Tuple[int, int],
+    workers: Optional[int] = None,
+    ahead: int = 0,
+    cache: Optional[ThumbnailCache] = None,
+) -> Iterator:
+    """Yield load_cell() for each path, in order, decoding in a process pool
+
+    At most `ahead` cells (default: 2 per worker) are decoded but not yet
+    consumed, so memory stays bounded however many cells there are. With
+    a cache, only cells missing from it are decoded from the source.
+    """
+    paths = list(paths)
+    cached: List[Optional[Path]] = [None] * len(paths)
+    if cache is not None:
+        cache.directory.mkdir(parents=True, exist_ok=True)
+        cached = [cache.path_for(path, size) for path in paths]
+        cache.save()
+        hits = sum(1 for c in cached if c is not None and c.exists())
+        cache.hits += hits
+        cache.misses += len(paths) - hits
+        decode_count = len(paths) - hits
+    else:
+        decode_count = len(paths)
+
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or decode_count < PARALLEL_MIN_CELLS:
+        for path, cache_path in zip(paths, cached):
+            yield load_cell(path, size, cache_path)
+        return
+
+    ahead = ahead or workers * 2
+    jobs = list(zip(paths, cached))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque(pool.submit(load_cell, path, size, c) for path, c in jobs[:ahead])
+        for path, c in jobs[ahead:]:
+            yield pending.popleft().result()
+            pending.append(pool.submit(load_cell, path, size, c))
+        while pending:
+            yield pending.popleft().result()
+
+
+def collect_grid_images(image_dir: Path, results: Optional[List[Dict[str, Any]]] = None) -> List[Tuple[str, str, Path]]:
+    """(id, label, path) per grid cell
+
+    With results (results.json entries), one cell per downloaded image of
+    each successful measured run, labeled by model; sweep cells also show
+    prompt and seed. Results without local_paths (older results.json) are
+    matched to <model>_<seed>.png or their ComfyUI file name. Without
+    results, or if none match, every PNG/JPEG under image_dir, by file name.
+    """
+    from .models import BUILTIN_MODELS
+
+    image_dir = Path(image_dir)
+    if results is None:
+        files = sorted(
+            p for p in image_dir.rglob("*")
+            if p.suffix.lower() in (".png", ".jpg", ".jpeg", ".webp")
+            and not any(part.startswith(".") for part in p.relative_to(image_dir).parts)  # e.g. .thumbs
+        )
+        return [(str(i + 1), str(p.relative_to(image_dir).with_suffix("")), p) for i, p in enumerate(files)]
+
+    cells = []
+    seen = set()
+    for r in results:
+        if not r.get("success") or r.get("warmup"):
+            continue
+        model = BUILTIN_MODELS.get(r["model_id"])
+        name = model.name if model else r["model_id"]
+        if r.get("prompt_name"):
+            name = f"{name} [{r['prompt_name']} #{r['seed']}]"
+        paths = []
+        for local in r.get("local_paths") or []:
+            path = Path(local)
+            if not path.exists():
+                # results.json paths are relative to where the run started
+                for candidate in (image_dir / path.name, image_dir / path.parent.name / path.name):
+                    if candidate.exists():
+                        path = candidate
+                        break
+            paths.append(path)
+        if not any(path.exists() for path in paths):
+            # results.json from before local_paths: the download naming, or ComfyUI's file name
+            dirs = [image_dir / r["prompt_name"], image_dir] if r.get("prompt_name") else [image_dir]
+            names = [f"{r['model_id']}_{r['seed']}.png", r.get("filename") or ""]
+            found = next((d / n for d in dirs for n in names if n and (d / n).exists()), None)
+            paths = [found] if found else []
+        for path in paths:
+            if path in seen:
+                continue
+            seen.add(path)
+            cells.append((r["model_id"], name, path))
+    if not cells:
+        # Nothing in results.json matches the files here; show them unlabeled
+        return collect_grid_images(image_dir)
+    return cells
+
+
+@lru_cache(maxsize=1024)
+def _label_image(text: str, width: int, height: int, font_size: int, bg_color: str, text_color: str):
+    """A centered text label, rendered once per distinct text and style"""
+    label = Image.new("RGB", (width, height), bg_color)
+    draw = ImageDraw.Draw(label)
+    font = get_font(font_size)
+    bbox = draw.textbbox((0, 0), text, font=font)
+    text_x = (width - (bbox[2] - bbox[0])) // 2 - bbox[0]
+    text_y = (height - (bbox[3] - bbox[1])) // 2 - bbox[1]
+    draw.text((text_x, text_y), text, fill=text_color, font=font)
+    return label
+
+
+def _filtered_rows(image) -> bytes:
+    """PNG scanlines of an RGB image with Pillow's adaptive row filters applied
+
+    Pillow is asked for an uncompressed PNG, whose IDAT payload is then
+    just the filtered rows behind a stored-block zlib wrapper.
+    """
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG", compress_level=0)
+    data = buffer.getvalue()
+    idat = []
+    pos = 8
+    while pos < len(data):
+        length, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        if kind == b"IDAT":
+            idat.append(data[pos + 8:pos + 8 + length])
+        pos += length + 12
+    return zlib.decompress(b"".join(idat))
+
+
+class _PNGBandWriter:
+    """Write an RGB PNG band by band, so the full image is never in memory"""
+
+    def __init__(self, path: Path, width: int, height: int, level: int = PNG_COMPRESS_LEVEL):
+        self.file = open(path, "wb")
+        self.width = width
+        self._compressor = zlib.compressobj(level)
+        self._last_row = None
+        self.file.write(b"\x89PNG\r\n\x1a\n")
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def _chunk(self, kind: bytes, data: bytes):
+        self.file.write(struct.pack(">I", len(data)) + kind + data)
+        self.file.write(struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+    def write(self, band):
+        """Append the rows of an RGB image as wide as the PNG"""
+        if self._last_row is None:
+            rows = _filtered_rows(band)
+        else:
+            # Filters may refer to the row above, so encode the band below
+            # the previous band's last row and drop that row again
+            context = Image.new("RGB", (self.width, band.height + 1))
+            context.paste(self._last_row, (0, 0))
+            context.paste(band, (0, 1))
+            rows = _filtered_rows(context)[self.width * 3 + 1:]
+        self._last_row = band.crop((0, band.height - 1, self.width, band.height))
+        data = self._compressor.compress(rows)
+        if data:
+            self._chunk(b"IDAT", data)
+
+    def close(self):
+        self._chunk(b"IDAT", self._compressor.flush())
+        self._chunk(b"IEND", b"")
+        self.file.close()
+
+
 def create_comparison_grid(
     images: List[Tuple[str, str, Path]],  # List of (id, name, path)
     output_path: Path,
@@ -67,68 +366,60 @@ def create_comparison_grid(
     bg_color: str = "#FFFFFF",
     label_bg_color: str = "#333333",
     label_text_color: str = "#FFFFFF",
+    workers: Optional[int] = None,
+    cache: Optional[ThumbnailCache] = None,
 ) -> bool:
-    """Create a comparison grid from multiple images"""
+    """Create a comparison grid from multiple images
+
+    workers: processes decoding cells (default: one per CPU)
+    cache: thumbnail cache, so unchanged cells are not decoded again
+    """
     if Image is None:
         print("Error: Pillow is required. Install with: pip install Pillow")
         return False
 
     rows = (len(images) + cols - 1) // cols
+    label = label_height if show_labels else 0
+    row_height = cell_height + label
 
     # Canvas size
     total_width = cell_width * cols
-    total_height = (cell_height + (label_height if show_labels else 0)) * rows
-
-    # Create canvas
-    canvas = Image.new("RGB", (total_width, total_height), bg_color)
-    draw = ImageDraw.Draw(canvas)
-    font = get_font(24)
-
-    for idx, (model_id, model_name, img_path) in enumerate(images):
-        col = idx % cols
-        row = idx // cols
-
-        # Position calculation
-        x = col * cell_width
-        y = row * (cell_height + (label_height if show_labels else 0))
-
-        # Load image
-        if not img_path.exists():
-            print(f"Warning: {img_path} not found, skipping")
-            continue
-
-        img = Image.open(img_path)
-
-        # Resize maintaining aspect ratio
-        img.thumbnail((cell_width, cell_height), Image.Resampling.LANCZOS)
-
-        # Center offset
-        offset_x = (cell_width - img.width) // 2
-        offset_y = (cell_height - img.height) // 2
+    total_height = row_height * rows
 
-        # Paste image
-        canvas.paste(img, (x + offset_x, y + offset_y))
-
-        # Draw label
-        if show_labels:
-            label_y = y + cell_height
-            # Label background
-            draw.rectangle(
-                [x, label_y, x + cell_width, label_y + label_height],
-                fill=label_bg_color,
-            )
-            # Text
-            label_text = f"{model_id}. {model_name}"
-            bbox = draw.textbbox((0, 0), label_text, font=font)
-            text_width = bbox[2] - bbox[0]
-            text_x = x + (cell_width - text_width) // 2
-            text_y = label_y + (label_height - (bbox[3] - bbox[1])) // 2
-            draw.text((text_x, text_y), label_text, fill=label_text_color, font=font)
-
-        print(f"Added: {model_id}. {model_name}")
+    # Compose one row of cells at a time and stream it into the PNG; cells
+    # are decoded and downscaled in parallel, a few rows ahead
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    writer = _PNGBandWriter(output_path, total_width, total_height)
+    cells = load_cells((path for _, _, path in images), (cell_width, cell_height), workers, cache=cache)
+    band = None
+    try:
+        for idx, ((model_id, model_name, img_path), img) in enumerate(zip(images, cells)):
+            col = idx % cols
+            if col == 0:
+                band = Image.new("RGB", (total_width, row_height), bg_color)
+            x = col * cell_width
+
+            if img is None:
+                print(f"Warning: {img_path} not found, skipping")
+            else:
+                # Center in the cell
+                offset_x = (cell_width - img.width) // 2
+                offset_y = (cell_height - img.height) // 2
+                band.paste(img, (x + offset_x, offset_y))
+
+                if show_labels:
+                    band.paste(
+                        _label_image(f"{model_id}. {model_name}", cell_width, label_height, 24, label_bg_color, label_text_color),
+                        (x, cell_height),
+                    )
+                print(f"Added: {model_id}. {model_name}")
+
+            if col == cols - 1 or idx == len(images) - 1:
+                writer.write(band)
+    finally:
+        writer.close()
 
-    # Save
-    canvas.save(output_path, "PNG", optimize=True)
     print(f"\nSaved: {output_path}")
     print(f"Size: {total_width}x{total_height}")
     return True
@@ -143,10 +434,14 @@ def create_benchmark_card(
     cell_width: int = 512,
     cell_height: int = 768,
     cols: int = 0,
+    workers: Optional[int] = None,
 ) -> bool:
     """Create a benchmark result card with images, model info, times, and environment.
 
-    results: list of dicts with keys: model_id, model_name, filename, elapsed_time, success, local_path
+    results: list of dicts with keys: model_id, model_name, filename, elapsed_time, success, local_path,
+    and optionally phases (GenerationResult.phases as a dict) for the per-phase breakdown,
+    and spread/runs when elapsed_time is a median over repeated runs
+    workers: processes decoding cells (default: one per CPU)
     """
     if Image is None:
         print("Error: Pillow is required. Install with: pip install Pillow")
@@ -164,9 +459,10 @@ def create_benchmark_card(
     rows = (len(valid) + cols - 1) // cols
 
     # Layout sizes
+    show_phases = any(phase_segments(r.get("phases") or {}) for r in valid)
     padding = 20
     header_height = 100
-    label_height = 60
+    label_height = 100 if show_phases else 60
     footer_height = 80
 
     grid_width = cell_width * cols
@@ -210,22 +506,18 @@ def create_benchmark_card(
 
     # === Image grid ===
     grid_y_start = header_height
+    cells = load_cells((Path(r["local_path"]) for r in valid), (cell_width - 8, cell_height - 8), workers)
 
-    for idx, r in enumerate(valid):
+    for idx, (r, img) in enumerate(zip(valid, cells)):
         col = idx % cols
         row = idx // cols
 
         x = padding + col * cell_width
         y = grid_y_start + row * (cell_height + label_height)
 
-        # Load image
-        img_path = Path(r["local_path"])
-        if not img_path.exists():
+        if img is None:
             continue
 
-        img = Image.open(img_path)
-        img.thumbnail((cell_width - 8, cell_height - 8), Image.Resampling.LANCZOS)
-
         # Center
         offset_x = (cell_width - img.width) // 2
         offset_y = (cell_height - img.height) // 2
@@ -247,9 +539,11 @@ def create_benchmark_card(
             font=font_label,
         )
 
-        # Elapsed time
+        # Elapsed time (median ± CI half-width over repeated runs, if given)
         elapsed = r.get("elapsed_time", 0)
         time_text = f"{elapsed:.1f}s"
+        if r.get("spread") is not None:
+            time_text = f"{elapsed:.1f}s ±{r['spread']:.1f} (n={r.get('runs', 0)})"
         bbox = draw.textbbox((0, 0), time_text, font=font_time)
         time_w = bbox[2] - bbox[0]
         draw.text(
@@ -267,6 +561,35 @@ def create_benchmark_card(
             font=font_time,
         )
 
+        # Phase breakdown: stacked bar plus the largest phases as text
+        segments = phase_segments(r.get("phases") or {})
+        if show_phases and segments:
+            bar_x, bar_w = x + 8, cell_width - 16
+            total = sum(seconds for _, seconds in segments)
+            colors = dict(PHASE_COLORS)
+            elapsed_so_far = 0.0
+            for name, seconds in segments:
+                seg_start = bar_x + int(bar_w * elapsed_so_far / total)
+                elapsed_so_far += seconds
+                seg_end = bar_x + int(bar_w * elapsed_so_far / total)
+                if seg_end > seg_start:
+                    draw.rectangle(
+                        [seg_start, label_y + 56, seg_end, label_y + 64],
+                        fill=colors[name],
+                    )
+
+            top = sorted(segments, key=lambda seg: seg[1], reverse=True)[:4]
+            parts = [f"{name} {seconds:.1f}s" for name, seconds in top]
+            sampler_its = (r.get("phases") or {}).get("sampler_its")
+            if sampler_its:
+                parts.append(f"{sampler_its:.1f} it/s")
+            draw.text(
+                (x + 8, label_y + 72),
+                "  ".join(parts),
+                fill="#aaaaaa",
+                font=font_footer,
+            )
+
     # === Footer ===
     footer_y = grid_y_start + grid_height + 8
     draw.line(
@@ -285,8 +608,17 @@ def create_benchmark_card(
             font=font_footer,
         )
 
+    if show_phases:
+        legend_x = padding
+        for name, color in PHASE_COLORS:
+            draw.rectangle([legend_x, footer_y + 40, legend_x + 10, footer_y + 50], fill=color)
+            draw.text((legend_x + 14, footer_y + 37), name, fill="#888888", font=font_footer)
+            bbox = draw.textbbox((0, 0), name, font=font_footer)
+            legend_x += 14 + (bbox[2] - bbox[0]) + 16
+
     total_time = sum(r.get("elapsed_time", 0) for r in valid)
-    summary = f"{len(valid)} models  |  Total: {total_time:.1f}s  |  github.com/aicuai/aicubench"
+    total_label = "Total of medians" if any(r.get("spread") is not None for r in valid) else "Total"
+    summary = f"{len(valid)} models  |  {total_label}: {total_time:.1f}s  |  github.com/aicuai/aicubench"
     bbox = draw.textbbox((0, 0), summary, font=font_footer)
     summary_w = bbox[2] - bbox[0]
     draw.text(
@@ -299,7 +631,7 @@ def create_benchmark_card(
     # Save
     output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    canvas.save(output_path, "PNG", optimize=True)
+    canvas.save(output_path, "PNG", compress_level=PNG_COMPRESS_LEVEL)
     print(f"\nBenchmark card saved: {output_path}")
     print(f"Size: {total_width}x{total_height}")
     return True
@@ -0,0 +1,67 @@
+"""
+Append-only JSONL journal of finished generation jobs
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+from .runner import GenerationJob, GenerationResult, result_from_dict, result_to_dict
+
+
+def job_key(job: GenerationJob) -> str:
+    """Stable identity of a job: model, prompt text, seed, repeat slot and any overrides"""
+    digest = hashlib.sha1(f"{job.positive}\0{job.negative}".encode("utf-8")).hexdigest()[:12]
+    kind = "warmup" if job.warmup else "run"
+    key = f"{job.model.id}|{digest}|{job.seed}|{kind}{job.repeat}"
+    if job.overrides:
+        key += "|" + ",".join(f"{k}={v}" for k, v in sorted(job.overrides.items()))
+    return key
+
+
+class RunJournal:
+    """One JSON line per finished job, flushed to disk as it arrives.
+
+    Lines are only ever appended, so an interrupted run leaves every job
+    finished so far on disk. A truncated final line is ignored on load.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def append(self, job: GenerationJob, result: GenerationResult):
+        entry = {
+            "key": job_key(job),
+            "recorded_at": datetime.now().isoformat(),
+            **result_to_dict(result),
+        }
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def load(self) -> Dict[str, GenerationResult]:
+        """Latest journaled result per job key"""
+        entries: Dict[str, GenerationResult] = {}
+        if not self.path.exists():
+            return entries
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    continue
+                entries[data["key"]] = result_from_dict(data)
+        return entries
+
+    def completed(self) -> Dict[str, GenerationResult]:
+        """Journaled jobs that succeeded and need not be run again"""
+        return {key: r for key, r in self.load().items() if r.success}
+
+    def results_for(self, jobs: List[GenerationJob]) -> List[GenerationResult]:
+        """Journaled results for the given jobs, in job order"""
+        entries = self.load()
+        return [entries[job_key(job)] for job in jobs if job_key(job) in entries]
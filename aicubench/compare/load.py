@@ -0,0 +1,232 @@
+"""
+Open-loop load test: submit prompts at a fixed arrival rate and measure latency
+"""
+import asyncio
+import json
+import random
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .aio import AsyncComparisonRunner
+from .client import run_sync
+from .runner import ComparisonRunner, GenerationJob, GenerationResult, PendingPrompt
+from .stats import percentile
+ARRIVALS = ("constant", "poisson")
+
+
+@dataclass
+class LoadSample:
+    """One request; times are perf_counter seconds"""
+    scheduled_at: float
+    submitted_at: float
+    finished_at: float
+    queue_wait: Optional[float]
+    success: bool
+    error: Optional[str] = None
+
+    @property
+    def latency(self) -> float:
+        """End to end from the scheduled arrival, so a late submitter is not hidden"""
+        return self.finished_at - self.scheduled_at
+
+
+@dataclass
+class LoadLevel:
+    """Outcome of one arrival rate"""
+    rate: float
+    arrival: str
+    duration: float
+    offered: int
+    completed: int
+    failed: int
+    throughput: float            # successful requests/s, first arrival to last completion
+    p50: Optional[float] = None
+    p90: Optional[float] = None
+    p99: Optional[float] = None
+    mean_queue_wait: Optional[float] = None
+    growing: bool = False        # latency still climbing at the end: the queue never drained
+    saturated: bool = False
+
+
+def arrival_times(rate: float, duration: float, arrival: str = "constant", seed: int = 0) -> List[float]:
+    """Offsets in seconds of each arrival within [0, duration)"""
+    if arrival not in ARRIVALS:
+        raise ValueError(f"Unknown arrival process: {arrival}")
+    if arrival == "constant":
+        return [i / rate for i in range(int(rate * duration))]
+    times = []
+    rng = random.Random(seed)
+    t = rng.expovariate(rate)
+    while t < duration:
+        times.append(t)
+        t += rng.expovariate(rate)
+    return times
+
+
+def run_load(
+    runner: ComparisonRunner,
+    make_job: Callable[[int], GenerationJob],
+    rate: float,
+    duration: float,
+    arrival: str = "constant",
+    seed: int = 0,
+    timeout: float = 600,
+) -> Tuple[LoadLevel, List[LoadSample]]:
+    """Submit make_job(i) at each arrival, without waiting for earlier ones
+
+    A submitter task follows the arrival schedule while completions are
+    collected alongside it, both on the runner's event loop, so they never
+    touch its traces or connections concurrently. Completion times come
+    from the server's event stream, so collection order does not skew
+    them. After the last arrival, in-flight prompts are drained (up to
+    `timeout` each).
+    """
+    return run_sync(_run_load(runner.core, make_job, rate, duration, arrival, seed, timeout))
+
+
+async def _run_load(
+    core: AsyncComparisonRunner,
+    make_job: Callable[[int], GenerationJob],
+    rate: float,
+    duration: float,
+    arrival: str,
+    seed: int,
+    timeout: float,
+) -> Tuple[LoadLevel, List[LoadSample]]:
+    schedule = arrival_times(rate, duration, arrival, seed)
+    in_flight: Dict[str, Tuple[PendingPrompt, float]] = {}
+    samples: List[LoadSample] = []
+    submitted = asyncio.Event()
+    start = time.perf_counter() + 0.05
+
+    async def submit():
+        try:
+            for i, offset in enumerate(schedule):
+                at = start + offset
+                delay = at - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                pending = await core.submit_job(make_job(i))
+                if isinstance(pending, GenerationResult):
+                    now = time.perf_counter()
+                    samples.append(LoadSample(at, now, now, None, False, pending.error))
+                else:
+                    in_flight[pending.prompt_id] = (pending, at)
+                submitted.set()
+        finally:
+            submitted.set()
+
+    submitter = asyncio.ensure_future(submit())
+    try:
+        while True:
+            if not in_flight:
+                if submitter.done():
+                    break
+                submitted.clear()
+                await submitted.wait()
+                continue
+            pending, completion = await core.wait_next([p for p, _ in in_flight.values()], timeout)
+            _, scheduled_at = in_flight.pop(pending.prompt_id)
+            queue_wait = None
+            if completion.started_at is not None and pending.queued_at is not None:
+                queue_wait = max(completion.started_at - pending.queued_at, 0.0)
+            success = not completion.error and bool(completion.images)
+            samples.append(LoadSample(
+                scheduled_at, pending.submitted_at, completion.finished_at, queue_wait, success,
+                None if success else (completion.error or "no output images"),
+            ))
+        await submitter
+    finally:
+        submitter.cancel()
+    return summarize_level(rate, arrival, duration, start, samples), samples
+
+
+def summarize_level(rate: float, arrival: str, duration: float, start: float, samples: List[LoadSample]) -> LoadLevel:
+    ok = sorted((s for s in samples if s.success), key=lambda s: s.scheduled_at)
+    level = LoadLevel(rate, arrival, duration, len(samples), len(ok), len(samples) - len(ok), 0.0)
+    if not ok:
+        return level
+    span = max(s.finished_at for s in ok) - start
+    level.throughput = len(ok) / span if span > 0 else 0.0
+    latencies = [s.latency for s in ok]
+    level.p50 = percentile(latencies, 50)
+    level.p90 = percentile(latencies, 90)
+    level.p99 = percentile(latencies, 99)
+    waits = [s.queue_wait for s in ok if s.queue_wait is not None]
+    level.mean_queue_wait = sum(waits) / len(waits) if waits else None
+    if len(ok) >= 6:
+        third = len(ok) // 3
+        early = percentile([s.latency for s in ok[:third]], 50)
+        late = percentile([s.latency for s in ok[-third:]], 50)
+        level.growing = late > early * 1.5
+    return level
+
+
+def mark_saturation(levels: List[LoadLevel], factor: float = 3.0) -> Optional[LoadLevel]:
+    """Flag the first rate where latency blows up; returns it
+
+    Saturated means p99 above `factor` times the p99 at the lowest rate,
+    throughput below 90% of the arrivals actually offered, or latency
+    still climbing at the end of the run.
+    """
+    measured = sorted((l for l in levels if l.p99 is not None), key=lambda l: l.rate)
+    if not measured:
+        return None
+    base = measured[0].p99
+    for level in measured:
+        offered_rate = level.offered / level.duration
+        if level.p99 > base * factor or level.throughput < offered_rate * 0.9 or level.growing:
+            level.saturated = True
+            return level
+    return None
+
+
+def print_load(levels: List[LoadLevel], saturation: Optional[LoadLevel]):
+    print(f"\n{'=' * 78}")
+    print("OPEN-LOOP LOAD (latency from scheduled arrival, seconds)")
+    print("=" * 78)
+    print(f"  {'rate/s':>7} {'done/s':>7} {'ok':>5} {'fail':>5} {'p50':>8} {'p90':>8} {'p99':>8} {'queue':>7}")
+    for l in levels:
+        mark = "🔥" if l.saturated else "  "
+        if l.p50 is None:
+            print(f"{mark} {l.rate:7.2f} {l.throughput:7.2f} {l.completed:5d} {l.failed:5d}   no successful requests")
+            continue
+        queue = f"{l.mean_queue_wait:7.2f}" if l.mean_queue_wait is not None else f"{'-':>7}"
+        print(
+            f"{mark} {l.rate:7.2f} {l.throughput:7.2f} {l.completed:5d} {l.failed:5d}"
+            f" {l.p50:8.2f} {l.p90:8.2f} {l.p99:8.2f} {queue}{'  ↗' if l.growing else ''}"
+        )
+    if saturation:
+        print(f"\n🔥 Saturation at {saturation.rate:.2f} req/s (achieved {saturation.throughput:.2f} req/s)")
+    else:
+        print("\n✅ No saturation within the tested rates")
+
+
+def _relative(samples: List[LoadSample]) -> List[Dict[str, object]]:
+    """Samples with times in seconds from the first arrival"""
+    if not samples:
+        return []
+    t0 = min(s.scheduled_at for s in samples)
+    return [
+        {
+            **asdict(s),
+            "scheduled_at": s.scheduled_at - t0,
+            "submitted_at": s.submitted_at - t0,
+            "finished_at": s.finished_at - t0,
+            "latency": s.latency,
+        }
+        for s in sorted(samples, key=lambda s: s.scheduled_at)
+    ]
+
+
+def save_load(levels: List[LoadLevel], samples: Dict[float, List[LoadSample]], output_path: Path):
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "levels": [asdict(l) for l in levels],
+        "samples": {str(rate): _relative(level_samples) for rate, level_samples in samples.items()},
+    }
+    output_path.write_text(json.dumps(data, indent=2))
+    print(f"\nLoad results saved to: {output_path}")
@@ -0,0 +1,171 @@
+"""
+ComfyUI execution monitor over the /ws event stream
+"""
+import asyncio
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+
+
+def describe_failure(msg_type: str, data: Dict[str, Any]) -> str:
+    """Readable error from an execution_error or execution_interrupted message"""
+    if msg_type == "execution_interrupted":
+        return f"Interrupted (node {data.get('node_id')} {data.get('node_type', '')})".strip()
+    return (
+        f"{data.get('exception_type', 'Error')}: "
+        f"{data.get('exception_message', '').strip()} "
+        f"(node {data.get('node_id')} {data.get('node_type', '')})"
+    ).strip()
+
+
+@dataclass
+class PromptTrace:
+    """Execution events received for a single prompt"""
+    prompt_id: str
+    events: List[Tuple[float, str, Dict[str, Any]]] = field(default_factory=list)
+    images: List[Dict[str, Any]] = field(default_factory=list)
+    pending_outputs: Optional[set] = None
+    done: bool = False
+    error: Optional[str] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def add(self, msg_type: str, data: Dict[str, Any], t: float):
+        """Record one event and update completion state"""
+        self.events.append((t, msg_type, data))
+        if self.started_at is None and msg_type in ("execution_start", "executing"):
+            self.started_at = t
+        was_done = self.done
+
+        if msg_type == "executed":
+            output = data.get("output") or {}
+            images = output.get("images") or []
+            self.images.extend(images)
+            if self.pending_outputs is not None:
+                self.pending_outputs.discard(str(data.get("node")))
+                if not self.pending_outputs:
+                    self.done = True
+            elif images:
+                self.done = True
+
+        elif msg_type == "execution_cached":
+            if self.pending_outputs is not None:
+                for node_id in data.get("nodes") or []:
+                    self.pending_outputs.discard(str(node_id))
+
+        elif msg_type == "executing":
+            if data.get("node") is None:
+                self.done = True
+
+        elif msg_type == "execution_success":
+            self.done = True
+
+        elif msg_type in ("execution_error", "execution_interrupted"):
+            self.error = describe_failure(msg_type, data)
+            self.done = True
+
+        if self.done and not was_done:
+            self.finished_at = t
+
+    def expect(self, output_nodes: Iterable[str]):
+        """Declare which output nodes must report before the prompt is done"""
+        self.pending_outputs = {str(n) for n in output_nodes}
+        for _, msg_type, data in self.events:
+            if msg_type == "executed":
+                self.pending_outputs.discard(str(data.get("node")))
+            elif msg_type == "execution_cached":
+                for node_id in data.get("nodes") or []:
+                    self.pending_outputs.discard(str(node_id))
+        if not self.pending_outputs and any(m == "executed" for _, m, _ in self.events):
+            self.done = True
+            self.finished_at = self.events[-1][0]
+
+    def node_times(self) -> Dict[str, float]:
+        """Seconds spent in each executed node, from executing transitions"""
+        times: Dict[str, float] = {}
+        current, since = None, 0.0
+        for t, msg_type, data in self.events:
+            if msg_type not in ("executing", "execution_success", "execution_error", "execution_interrupted"):
+                continue
+            if current is not None:
+                times[current] = times.get(current, 0.0) + t - since
+            node = data.get("node") if msg_type == "executing" else None
+            current, since = (str(node), t) if node is not None else (None, 0.0)
+
+        # The wait ends on the last output's executed message, before the
+        # closing executing event arrives
+        if current is not None and self.finished_at is not None and self.finished_at > since:
+            times[current] = times.get(current, 0.0) + self.finished_at - since
+        return times
+
+    def sampler_rate(self) -> Optional[float]:
+        """Sampler iterations per second from progress messages"""
+        by_node: Dict[str, List[Tuple[float, int]]] = {}
+        for t, msg_type, data in self.events:
+            if msg_type == "progress":
+                by_node.setdefault(str(data.get("node")), []).append((t, data.get("value", 0)))
+        if not by_node:
+            return None
+        points = max(by_node.values(), key=len)
+        (t0, v0), (t1, v1) = points[0], points[-1]
+        if t1 <= t0 or v1 <= v0:
+            return None
+        return (v1 - v0) / (t1 - t0)
+
+
+class EventStream:
+    """ComfyUI's /ws event stream for one client_id, on aiohttp's WebSocket client.
+
+    Execution messages for every prompt queued with this client_id arrive
+    here, so several prompts can be tracked over one connection.
+    """
+
+    def __init__(self, comfyui_url: str, client_id: str, connect_timeout: float = 5.0):
+        self.ws_url = f"{comfyui_url.rstrip('/')}/ws?clientId={client_id}"
+        self.client_id = client_id
+        self.connect_timeout = connect_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None and not self._ws.closed
+
+    async def connect(self) -> bool:
+        """Open the WebSocket connection. Returns False if unavailable."""
+        self._session = aiohttp.ClientSession()
+        try:
+            self._ws = await asyncio.wait_for(self._session.ws_connect(self.ws_url, autoping=True), self.connect_timeout)
+        except (aiohttp.ClientError, OSError, asyncio.TimeoutError):
+            await self.close()
+            return False
+        return True
+
+    async def close(self):
+        ws, self._ws = self._ws, None
+        session, self._session = self._session, None
+        if ws is not None:
+            await ws.close()
+        if session is not None:
+            await session.close()
+
+    async def recv(self) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Receive one message as (type, data); None for binary previews
+
+        Raises ConnectionError when the socket closes.
+        """
+        if self._ws is None:
+            raise ConnectionError("WebSocket not connected")
+        msg = await self._ws.receive()
+        # Binary frames carry live previews
+        if msg.type == aiohttp.WSMsgType.BINARY:
+            return None
+        if msg.type != aiohttp.WSMsgType.TEXT:
+            raise ConnectionError(f"WebSocket closed ({msg.type.name.lower()})")
+        try:
+            data = json.loads(msg.data)
+        except ValueError:
+            return None
+        return data.get("type", ""), data.get("data") or {}
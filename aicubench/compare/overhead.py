@@ -0,0 +1,183 @@
+"""
+Harness overhead benchmarks against the local ComfyUI stand-in
+
+Every node in the fake server takes zero time, so what is measured is the
+cost of the harness itself: building workflows, queueing, completion
+tracking, downloads and card rendering.
+"""
+import json
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from . import grid
+from .fakeserver import FakeComfyUI, FakeFileServer
+from .models import BUILTIN_MODELS
+from .runner import ComparisonRunner
+from .stats import median, percentile
+
+
+@dataclass
+class OverheadResult:
+    """Per-item cost of one harness operation, in milliseconds"""
+    name: str
+    n: int
+    median_ms: float
+    p95_ms: float
+    total_s: float
+
+
+def _result(name: str, samples: List[float], total: float) -> OverheadResult:
+    return OverheadResult(
+        name=name,
+        n=len(samples),
+        median_ms=median(samples) * 1000,
+        p95_ms=percentile(samples, 95) * 1000,
+        total_s=total,
+    )
+
+
+def _time_each(name: str, n: int, fn: Callable[[int], None]) -> OverheadResult:
+    samples = []
+    start = time.perf_counter()
+    for i in range(n):
+        t0 = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - t0)
+    return _result(name, samples, time.perf_counter() - start)
+
+
+def run_overhead_suite(
+    workflow_dir: Path = Path("workflows/api"),
+    model_id: str = "sdxl",
+    jobs: int = 20,
+    window: int = 4,
+    include_poll: bool = False,
+    image_size: tuple = (512, 768),
+) -> List[OverheadResult]:
+    """Measure harness overhead per job against a zero-latency fake server
+
+    round_trip entries use each job's submit-to-completion time; the
+    pipelined entry reports wall time divided by jobs, i.e. the cost per
+    image at steady state.
+    """
+    model = BUILTIN_MODELS[model_id]
+    results: List[OverheadResult] = []
+
+    with FakeComfyUI(image_size=image_size) as server, tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        runner = ComparisonRunner(server.url, workflow_dir, tmp, verbose=False)
+
+        def inject(i: int):
+            workflow = runner.load_workflow(model)
+            runner.inject_prompt(workflow, model, "a red apple", "blurry", i, f"{model.id}_{i:04d}")
+
+        results.append(_time_each("inject_prompt", jobs * 10, inject))
+
+        def render(i: int):
+            template = runner.templates.get(workflow_dir / model.workflow_file, model)
+            template.render({"positive": "a red apple", "negative": "blurry", "seed": i, "output_prefix": f"{model.id}_{i:04d}"})
+
+        results.append(_time_each("render_template", jobs * 10, render))
+
+        modes = [("ws", 1), ("ws", window)]
+        if include_poll:
+            modes.append(("poll", 1))
+        filenames: List[str] = []
+        for completion, w in modes:
+            runner = ComparisonRunner(server.url, workflow_dir, tmp, completion=completion, verbose=False)
+            job_list = runner.build_jobs([model.id], "a red apple", "blurry", repeats=jobs)
+            start = time.perf_counter()
+            generated = runner.run_jobs(job_list, window=w)
+            total = time.perf_counter() - start
+            runner.close()
+            failed = [r for r in generated if not r.success]
+            if failed:
+                raise RuntimeError(f"Fake server run failed: {failed[0].error}")
+            filenames = [r.filename for r in generated]
+            if w == 1:
+                results.append(_result(f"round_trip[{completion}]", [r.elapsed_time for r in generated], total))
+            else:
+                per_job = total / len(generated)
+                results.append(OverheadResult(f"pipelined[{completion},window={w}]", len(generated), per_job * 1000, per_job * 1000, total))
+
+        images_dir = tmp / "images"
+        results.append(_time_each(
+            "download",
+            len(filenames),
+            lambda i: runner.save_image(filenames[i], images_dir / f"{i}.png"),
+        ))
+        runner.close()
+
+        if grid.Image is not None:
+            entries = [
+                {
+                    "model_id": f"{model.id}-{i}",
+                    "model_name": model.name,
+                    "filename": filenames[i],
+                    "elapsed_time": 1.0,
+                    "success": True,
+                    "local_path": str(images_dir / f"{i}.png"),
+                }
+                for i in range(min(len(filenames), 8))
+            ]
+            card = _time_each(
+                "grid_card",
+                3,
+                lambda i: grid.create_benchmark_card(entries, images_dir, tmp / "card.png", prompt="a red apple"),
+            )
+            # Report per image on the card, comparable to the other per-job rows
+            scale = 1 / len(entries)
+            results.append(OverheadResult(f"grid_card/image[{len(entries)}]", card.n, card.median_ms * scale, card.p95_ms * scale, card.total_s))
+
+    return results
+
+
+def print_overhead(results: List[OverheadResult], baseline: Optional[Dict[str, float]] = None):
+    print(f"\n{'=' * 60}")
+    print("HARNESS OVERHEAD (ms per job)")
+    print("=" * 60)
+    for r in results:
+        line = f"  {r.name:<30} median {r.median_ms:8.2f}  p95 {r.p95_ms:8.2f}  (n={r.n})"
+        if baseline and r.name in baseline:
+            line += f"  [{(r.median_ms / baseline[r.name] - 1) * 100:+.0f}% vs baseline]"
+        print(line)
+
+
+def load_baseline(path: Path) -> Dict[str, float]:
+    """Median ms per benchmark from a previously saved overhead.json"""
+    data = json.loads(Path(path).read_text())
+    return {entry["name"]: entry["median_ms"] for entry in data.get("results", [])}
+
+
+def find_regressions(
+    results: List[OverheadResult],
+    baseline: Dict[str, float],
+    tolerance: float = 0.25,
+    floor_ms: float = 1.0,
+) -> List[str]:
+    """Benchmarks slower than baseline by more than `tolerance`
+
+    Differences under floor_ms are ignored; sub-millisecond timings are
+    too noisy to gate on.
+    """
+    regressions = []
+    for r in results:
+        base = baseline.get(r.name)
+        if base is None:
+            continue
+        if r.median_ms > base * (1 + tolerance) and r.median_ms - base > floor_ms:
+            regressions.append(f"{r.name}: {base:.2f}ms -> {r.median_ms:.2f}ms")
+    return regressions
+
+
+def save_overhead(results: List[OverheadResult], output_path: Path):
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": [asdict(r) for r in results],
+    }
+    output_path.write_text(json.dumps(data, indent=2))
+    print(f"\nOverhead results saved to: {output_path}")
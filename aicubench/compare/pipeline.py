@@ -0,0 +1,58 @@
+"""
+In-flight window control for pipelined prompt submission
+"""
+from typing import List, Optional, Tuple
+
+
+class WindowTuner:
+    """Decide how many prompts to keep queued on a server.
+
+    A fixed window (> 0) is used as-is. With window=0 the tuner starts at 1
+    and measures images/s over `sample` completions at each size, growing the
+    window while throughput improves by at least `min_gain`. Once growth
+    stops paying off it settles on the best window seen.
+    """
+
+    def __init__(self, window: int = 0, max_window: int = 8, sample: int = 3, min_gain: float = 0.05):
+        if window < 0:
+            raise ValueError("window must be >= 0")
+        self.auto = window == 0
+        self.window = window or 1
+        self.max_window = max_window
+        self.sample = sample
+        self.min_gain = min_gain
+        self.history: List[Tuple[int, float]] = []  # (window, images/s)
+        self._best: Optional[Tuple[int, float]] = None
+        self._clock: Optional[float] = None
+        self._count = 0
+
+    def record(self, finished_at: float):
+        """Record one completion (perf_counter timestamp)"""
+        if not self.auto:
+            return
+
+        # The clock starts at the first completion at the current size,
+        # so pipeline fill time is not counted against the window
+        if self._clock is None:
+            self._clock = finished_at
+            return
+        self._count += 1
+        if self._count < self.sample:
+            return
+
+        elapsed = finished_at - self._clock
+        rate = self._count / elapsed if elapsed > 0 else float("inf")
+        self.history.append((self.window, rate))
+
+        if self._best is None or rate > self._best[1] * (1 + self.min_gain):
+            self._best = (self.window, rate)
+            if self.window < self.max_window:
+                self.window += 1
+            else:
+                self.auto = False
+        else:
+            self.window = self._best[0]
+            self.auto = False
+
+        self._clock = finished_at
+        self._count = 0
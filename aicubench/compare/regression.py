@@ -0,0 +1,147 @@
+"""
+Performance regression check of a run against a baseline run
+"""
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .runner import GenerationResult, result_from_dict
+from .stats import mann_whitney_greater, mann_whitney_min_p, median, repeats_for_alpha
+
+# PhaseTimings fields compared per model, besides elapsed_time and per-node times
+PHASE_METRICS = ("prepare", "http_queue", "queue_wait", "execution", "download")
+
+
+@dataclass
+class MetricDiff:
+    """One model/metric compared between baseline and current samples"""
+    model_id: str
+    metric: str
+    baseline_median: float
+    current_median: float
+    baseline_n: int
+    current_n: int
+    p_value: float
+    status: str  # ok, regression, improved, slower (beyond threshold, not significant)
+    tested: bool = True  # False: too few samples to reach alpha, verdict on the threshold alone
+
+    @property
+    def change(self) -> float:
+        if self.baseline_median <= 0:
+            return 0.0
+        return self.current_median / self.baseline_median - 1
+
+
+def result_metrics(result: GenerationResult) -> Dict[str, float]:
+    """Timings of one result by metric name; node times are "node:<class_type>" """
+    metrics = {"elapsed_time": result.elapsed_time}
+    for name in PHASE_METRICS:
+        value = getattr(result.phases, name)
+        if value is not None:
+            metrics[name] = value
+    for class_type, seconds in result.phases.nodes.items():
+        metrics[f"node:{class_type}"] = seconds
+    return metrics
+
+
+def collect_samples(results: List[GenerationResult]) -> Dict[str, Dict[str, List[float]]]:
+    """model -> metric -> samples, from successful measured runs"""
+    samples: Dict[str, Dict[str, List[float]]] = {}
+    for r in results:
+        if not r.success or r.warmup:
+            continue
+        for metric, value in result_metrics(r).items():
+            samples.setdefault(r.model_id, {}).setdefault(metric, []).append(value)
+    return samples
+
+
+def load_run(source: str, db: Optional[Path] = None) -> List[GenerationResult]:
+    """Results of a run: a results.json, a directory holding one, or run:<id> in the results database"""
+    if source.startswith("run:"):
+        from .store import ResultsStore
+        if db is None or not Path(db).exists():
+            raise FileNotFoundError(f"Results database not found: {db}")
+        with ResultsStore(Path(db)) as store:
+            results = store.run_results(int(source[4:]))
+        if not results:
+            raise ValueError(f"No results recorded for {source}")
+        return results
+    path = Path(source)
+    if path.is_dir():
+        path = path / "results.json"
+    data = json.loads(path.read_text())
+    return [result_from_dict(r) for r in data.get("results", [])]
+
+
+def compare_runs(
+    baseline: List[GenerationResult],
+    current: List[GenerationResult],
+    threshold: float = 0.10,
+    alpha: float = 0.05,
+    floor: float = 0.05,
+    metrics: Optional[List[str]] = None,
+) -> List[MetricDiff]:
+    """Compare every model/metric present in both runs
+
+    A regression is a median slowdown beyond `threshold` (fraction) and
+    `floor` (seconds) that a one-sided Mann–Whitney test finds significant
+    at `alpha`. A slowdown that is not significant is reported as "slower"
+    but does not fail the check. When the samples are too few for the test
+    to ever reach `alpha` (e.g. 3 vs 3 at 0.05; see repeats_for_alpha), the
+    threshold alone decides and the diff is marked untested.
+    """
+    base_samples = collect_samples(baseline)
+    cur_samples = collect_samples(current)
+    diffs = []
+    for model_id in sorted(set(base_samples) & set(cur_samples)):
+        names = sorted(set(base_samples[model_id]) & set(cur_samples[model_id]))
+        names.sort(key=lambda m: (m != "elapsed_time", m.startswith("node:"), m))
+        for metric in names:
+            if metrics and metric not in metrics:
+                continue
+            base = base_samples[model_id][metric]
+            cur = cur_samples[model_id][metric]
+            base_median, cur_median = median(base), median(cur)
+            delta = cur_median - base_median
+            status = "ok"
+            p_value = 1.0
+            tested = mann_whitney_min_p(len(cur), len(base)) < alpha
+            if delta > max(base_median * threshold, floor):
+                p_value = mann_whitney_greater(cur, base)
+                status = "regression" if p_value < alpha or not tested else "slower"
+            elif -delta > max(base_median * threshold, floor):
+                p_value = mann_whitney_greater(base, cur)
+                if p_value < alpha or not tested:
+                    status = "improved"
+            diffs.append(MetricDiff(model_id, metric, base_median, cur_median, len(base), len(cur), p_value, status, tested))
+    return diffs
+
+
+STATUS_MARKS = {"ok": "✅", "improved": "🚀", "slower": "⚠️", "regression": "❌"}
+
+
+def print_check(diffs: List[MetricDiff], verbose: bool = False, alpha: float = 0.05):
+    """Diff table; unchanged metrics other than elapsed_time are shown only if verbose"""
+    print(f"\n{'=' * 78}")
+    print("PERFORMANCE CHECK (median seconds, baseline -> current)")
+    print("=" * 78)
+    print(f"  {'model':<16} {'metric':<24} {'baseline':>9} {'current':>9} {'change':>8} {'p':>7}")
+    for d in diffs:
+        if d.status == "ok" and d.metric != "elapsed_time" and not verbose:
+            continue
+        print(
+            f"{STATUS_MARKS[d.status]} {d.model_id:<16} {d.metric:<24} {d.baseline_median:9.3f} {d.current_median:9.3f}"
+            f" {d.change * 100:+7.1f}% {d.p_value:7.3f}  (n={d.baseline_n}/{d.current_n})"
+        )
+    regressions = sum(d.status == "regression" for d in diffs)
+    slower = sum(d.status == "slower" for d in diffs)
+    print(f"\n{regressions} regressions, {slower} slower but not significant, {len(diffs)} metrics compared")
+    untested = [d for d in diffs if not d.tested]
+    if untested:
+        d = untested[0]
+        print(
+            f"⚠️ {len(untested)} metrics have too few samples for the significance test"
+            f" (n={d.baseline_n}/{d.current_n} cannot reach p < {alpha}); they were judged on the threshold alone."
+            f" Use --repeats {repeats_for_alpha(alpha)} or more in both runs."
+        )
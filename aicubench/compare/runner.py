@@ -3,15 +3,33 @@ Multi-model comparison runner
 Based on elena-comparison/run_elena.py
 """
 import json
-import urllib.request
-import urllib.error
 import time
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
-from .models import ModelConfig, BUILTIN_MODELS
+from .client import ComfyClient, ComfyHTTPError, run_sync
+from .models import ModelConfig
+from .pipeline import WindowTuner
+from .stats import TimingStats, summarize
+from .telemetry import TelemetrySampler
+from .timeouts import TimeoutPolicy
+
+# Seconds between /queue checks while waiting on the event stream
+QUEUE_CHECK_INTERVAL = 5.0
+
+
+@dataclass
+class PhaseTimings:
+    """Where the time of one generation went, in seconds"""
+    prepare: Optional[float] = None     # load_workflow + inject_prompt
+    http_queue: Optional[float] = None  # POST /prompt round trip
+    queue_wait: Optional[float] = None  # queued on the server until execution starts
+    execution: Optional[float] = None   # execution start until outputs are reported
+    download: Optional[float] = None    # fetching output images
+    nodes: Dict[str, float] = field(default_factory=dict)  # per node class_type
+    sampler_its: Optional[float] = None  # sampler iterations per second
 
 
 @dataclass
@@ -24,123 +42,382 @@ class GenerationResult:
     elapsed_time: float
     success: bool
     error: Optional[str] = None
+    server: str = ""
+    queue_time: Optional[float] = None
+    execution_time: Optional[float] = None
+    cold_load: Optional[bool] = None
+    phases: PhaseTimings = field(default_factory=PhaseTimings)
+    repeat: int = 0
+    warmup: bool = False
+    prompt_name: str = ""
+    images: List[Dict[str, Any]] = field(default_factory=list)  # every image the workflow emitted
+    local_paths: List[str] = field(default_factory=list)
+    telemetry: Dict[str, Dict[str, float]] = field(default_factory=dict)  # field -> peak/mean
+    queue_failed: bool = False  # POST /prompt failed; the server never accepted the job
+
+
+def result_to_dict(r: GenerationResult) -> Dict[str, Any]:
+    """Serialize a result the way results.json stores it"""
+    return {
+        "model_id": r.model_id,
+        "seed": r.seed,
+        "filename": r.filename,
+        "prompt_id": r.prompt_id,
+        "elapsed_time": r.elapsed_time,
+        "success": r.success,
+        "error": r.error,
+        "server": r.server,
+        "queue_time": r.queue_time,
+        "execution_time": r.execution_time,
+        "cold_load": r.cold_load,
+        "phases": asdict(r.phases),
+        "repeat": r.repeat,
+        "warmup": r.warmup,
+        "prompt_name": r.prompt_name,
+        "images": r.images,
+        "local_paths": r.local_paths,
+        "telemetry": r.telemetry,
+    }
+
+
+def result_from_dict(data: Dict[str, Any]) -> GenerationResult:
+    """Rebuild a result from its results.json / journal form"""
+    return GenerationResult(
+        model_id=data["model_id"],
+        seed=data["seed"],
+        filename=data.get("filename", ""),
+        prompt_id=data.get("prompt_id", ""),
+        elapsed_time=data.get("elapsed_time", 0),
+        success=data.get("success", False),
+        error=data.get("error"),
+        server=data.get("server", ""),
+        queue_time=data.get("queue_time"),
+        execution_time=data.get("execution_time"),
+        cold_load=data.get("cold_load"),
+        phases=PhaseTimings(**(data.get("phases") or {})),
+        repeat=data.get("repeat", 0),
+        warmup=data.get("warmup", False),
+        prompt_name=data.get("prompt_name", ""),
+        images=data.get("images") or [],
+        local_paths=data.get("local_paths") or [],
+        telemetry=data.get("telemetry") or {},
+    )
+
+
+@dataclass
+class GenerationJob:
+    """A single generation to run: one model, prompt and seed"""
+    index: int
+    model: ModelConfig
+    positive: str
+    negative: str = ""
+    seed: int = 42
+    repeat: int = 0
+    warmup: bool = False
+    prompt_name: str = ""
+    overrides: Dict[str, Any] = field(default_factory=dict)  # template fields, e.g. width/height/batch_size
+
+
+def affinity_key(model: ModelConfig) -> Tuple[str, Tuple[Tuple[str, Any], ...]]:
+    """Checkpoint + LoRA set identifying what a model keeps loaded on the GPU"""
+    loras = tuple(sorted((l.get("name", ""), l.get("strength")) for l in model.loras))
+    return (model.checkpoint or model.id, loras)
+
+
+def order_by_affinity(jobs: List[GenerationJob], loaded: Optional[tuple] = None) -> List[GenerationJob]:
+    """Group jobs sharing a checkpoint/LoRA set so each set is loaded once
+
+    Groups keep their first-appearance order, except that the group for
+    the currently `loaded` key (if any) runs first.
+    """
+    groups: Dict[tuple, List[GenerationJob]] = {}
+    for job in jobs:
+        groups.setdefault(affinity_key(job.model), []).append(job)
+    keys = list(groups)
+    if loaded in groups:
+        keys.remove(loaded)
+        keys.insert(0, loaded)
+    return [job for key in keys for job in groups[key]]
+
+
+@dataclass
+class PendingPrompt:
+    """A job that has been queued on the server and not yet collected"""
+    job: GenerationJob
+    prompt_id: str
+    output_nodes: List[str]
+    submitted_at: float
+    loader_nodes: List[str] = field(default_factory=list)
+    predicted_cold: Optional[bool] = None
+    node_types: Dict[str, str] = field(default_factory=dict)
+    post_started_at: Optional[float] = None
+    queued_at: Optional[float] = None
+    limit: Optional[float] = None           # seconds it may execute before it counts as hung
+    running_since: Optional[float] = None   # when it was first seen executing
+
+
+@dataclass
+class Completion:
+    """How a queued prompt ended, as seen by the runner"""
+    images: List[Dict[str, Any]]
+    error: Optional[str]
+    finished_at: float
+    started_at: Optional[float] = None
+    execution_time: Optional[float] = None
+    cached_nodes: Optional[List[str]] = None
+    node_times: Dict[str, float] = field(default_factory=dict)
+    sampler_its: Optional[float] = None
+
+    @property
+    def filename(self) -> str:
+        return self.images[0].get("filename", "") if self.images else ""
+
+
+def queue_states(queue: Dict[str, Any]) -> Dict[str, str]:
+    """prompt_id -> "running" or "pending" from a /queue response"""
+    states = {}
+    for state in ("running", "pending"):
+        for entry in queue.get(f"queue_{state}") or []:
+            if len(entry) > 1:
+                states[str(entry[1])] = state
+    return states
+
+
+def describe_queue_error(error: Exception) -> str:
+    """Why POST /prompt failed, with ComfyUI's validation errors when it sent them"""
+    if not isinstance(error, ComfyHTTPError):
+        return str(error)
+    try:
+        body = json.loads(error.body.decode("utf-8"))
+    except ValueError:
+        return str(error)
+    if not isinstance(body, dict):
+        return str(error)
+    problem = body.get("error")
+    parts = [problem.get("message", "") if isinstance(problem, dict) else str(problem or f"HTTP {error.status}")]
+    for node_id, node in (body.get("node_errors") or {}).items():
+        for e in node.get("errors") or []:
+            detail = f": {e['details']}" if e.get("details") else ""
+            parts.append(f"{node.get('class_type', '')} (node {node_id}) {e.get('message', '')}{detail}")
+    return "; ".join(p for p in parts if p)[:500]
+
+
+def print_comparison_header(model_ids: List[str], seed: int):
+    """Print the banner shown at the start of a comparison"""
+    print("=" * 60)
+    print("Multi-Model Comparison")
+    print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Models: {', '.join(model_ids)}")
+    print(f"Seed: {seed}")
+    print("=" * 60)
+
+
+def print_comparison_summary(results: List[GenerationResult]):
+    """Print the success summary shown at the end of a comparison"""
+    print("\n" + "=" * 60)
+    print("SUMMARY")
+    print("=" * 60)
+    success_count = sum(1 for r in results if r.success)
+    print(f"Successful: {success_count}/{len(results)}")
+
+    for r in results:
+        status = "✅" if r.success else "❌"
+        load = "" if r.cold_load is None else (" [cold]" if r.cold_load else " [warm]")
+        print(f"  {status} {r.model_id}{load}: {r.filename or r.error}")
+
+    load_costs = model_load_costs(results)
+    if load_costs:
+        print("\nModel load cost (mean cold - mean warm):")
+        for model_id, cost in load_costs.items():
+            print(f"  {model_id}: {cost:+.1f}s")
+
+
+def generation_seconds(r: GenerationResult) -> float:
+    """Time the server spent on a result, excluding time queued behind other prompts
+
+    Execution time from the history when reported, else elapsed time minus
+    the queue wait, else the elapsed time.
+    """
+    if r.execution_time is not None:
+        return r.execution_time
+    if r.phases.queue_wait is not None:
+        return max(r.elapsed_time - r.phases.queue_wait, 0.0)
+    return r.elapsed_time
+
+
+def model_stats(results: List[GenerationResult], outlier_rule: str = "iqr") -> Dict[str, TimingStats]:
+    """Per-model generation_seconds statistics over measured (non-warmup) runs"""
+    times: Dict[str, List[float]] = {}
+    for r in results:
+        if r.success and not r.warmup:
+            times.setdefault(r.model_id, []).append(generation_seconds(r))
+    return {model_id: summarize(values, outlier_rule) for model_id, values in times.items()}
+
+
+def print_model_stats(stats: Dict[str, TimingStats]):
+    """Print the repeated-run statistics table"""
+    print("\n" + "=" * 60)
+    print("TIMING STATISTICS (execution seconds, queue wait excluded)")
+    print("=" * 60)
+    print(f"  {'model':20s} {'n':>3s} {'median':>8s} {'mean':>8s} {'p95':>8s} {'stddev':>8s}  95% CI")
+    for model_id, st in stats.items():
+        dropped = f" ({st.discarded} outliers dropped)" if st.discarded else ""
+        print(
+            f"  {model_id:20s} {st.n:3d} {st.median:8.2f} {st.mean:8.2f} {st.p95:8.2f} "
+            f"{st.stddev:8.2f}  [{st.ci_low:.2f}, {st.ci_high:.2f}]{dropped}"
+        )
+
+
+def model_load_costs(results: List[GenerationResult]) -> Dict[str, float]:
+    """Per-model load cost: mean cold-load time minus mean warm-load time"""
+    times: Dict[str, Dict[bool, List[float]]] = {}
+    for r in results:
+        if r.success and r.cold_load is not None:
+            times.setdefault(r.model_id, {True: [], False: []})[r.cold_load].append(generation_seconds(r))
+    return {
+        model_id: sum(t[True]) / len(t[True]) - sum(t[False]) / len(t[False])
+        for model_id, t in times.items()
+        if t[True] and t[False]
+    }
 
 
 class ComparisonRunner:
-    """Run image generation across multiple models for comparison"""
+    """Run image generation across multiple models for comparison
+
+    The blocking face of AsyncComparisonRunner (held as .core): every
+    call runs the core's coroutine on the shared background event loop
+    (client.run_sync), so runners used from several threads, e.g. by
+    MultiServerScheduler, wait on one loop instead of a thread each.
+    Settings and helpers not defined here are the core's.
+    """
 
     def __init__(
         self,
         comfyui_url: str = "http://127.0.0.1:8188",
         workflow_dir: Optional[Path] = None,
         output_dir: Optional[Path] = None,
+        completion: str = "ws",
+        client_id: Optional[str] = None,
+        verbose: bool = True,
+        window: int = 1,
+        affinity: bool = True,
+        http: Optional[ComfyClient] = None,
+        telemetry: Optional[TelemetrySampler] = None,
+        timeouts: Optional[TimeoutPolicy] = None,
     ):
-        self.comfyui_url = comfyui_url.rstrip("/")
-        self.workflow_dir = workflow_dir or Path("workflows/api")
-        self.output_dir = output_dir or Path("output")
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        """completion: "ws" (WebSocket events, polling if unavailable) or "poll"
+        window: prompts kept in flight on the server (0 = auto-tune)
+        affinity: group jobs by checkpoint/LoRA set to minimize model swaps
+        http: client to share or configure (timeouts, retries); one is created if omitted
+        telemetry: running sampler; each result gets a summary over its execution window
+        timeouts: per-model execution limits, learned from finished jobs (a fresh policy if omitted)
+        """
+        from .aio import AsyncComparisonRunner
+
+        self.http = http or ComfyClient(comfyui_url.rstrip("/"))
+        self.core = AsyncComparisonRunner(
+            comfyui_url, workflow_dir, output_dir, completion, client_id,
+            verbose=verbose, max_in_flight=window, poll_interval=2.0, affinity=affinity,
+            http=self.http.aio, telemetry=telemetry, timeouts=timeouts,
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for names not found on the wrapper itself
+        if name == "core":
+            raise AttributeError(name)
+        return getattr(self.core, name)
+
+    @property
+    def verbose(self) -> bool:
+        return self.core.verbose
+
+    @verbose.setter
+    def verbose(self, value: bool):
+        self.core.verbose = value
+
+    @property
+    def window(self) -> int:
+        """Prompts kept in flight by run_jobs (0 = auto-tune)"""
+        return self.core.max_in_flight
+
+    @window.setter
+    def window(self, value: int):
+        self.core.max_in_flight = value
+
+    def close(self):
+        """Close the WebSocket connection, if any, and pooled HTTP connections"""
+        run_sync(self.core.close())
 
     def queue_prompt(self, workflow: dict) -> str:
-        """Queue a prompt to ComfyUI"""
-        data = json.dumps({"prompt": workflow}).encode("utf-8")
-        req = urllib.request.Request(
-            f"{self.comfyui_url}/prompt",
-            data=data,
-            headers={"Content-Type": "application/json"},
-        )
+        """Queue a prompt to ComfyUI ("" on failure, with the reason printed)"""
+
+        async def queue() -> str:
+            # Subscribe before queueing so no execution message is missed
+            await self.core._ensure_events()
+            return await self.core.queue_prompt(workflow)
+
         try:
-            with urllib.request.urlopen(req, timeout=30) as resp:
-                result = json.loads(resp.read().decode("utf-8"))
-                return result.get("prompt_id", "")
-        except Exception as e:
-            print(f"Queue error: {e}")
+            return run_sync(queue())
+        except (OSError, ValueError) as e:
+            print(f"Queue error: {describe_queue_error(e)}")
             return ""
 
+    def interrupt(self, prompt_id: str):
+        """Stop a running prompt (servers that ignore prompt_id stop whatever is running)"""
+        run_sync(self.core.interrupt(prompt_id))
+
+    def cancel(self, prompt_id: str, timeout: float = 10):
+        """Remove a prompt from the server queue, or interrupt it if it is already running
+
+        Raises (ComfyHTTPError, OSError) if the server cannot be reached.
+        """
+        run_sync(self.core.cancel(prompt_id, timeout))
+
     def get_history(self, prompt_id: str) -> dict:
         """Get execution history for a prompt"""
-        try:
-            with urllib.request.urlopen(
-                f"{self.comfyui_url}/history/{prompt_id}", timeout=10
-            ) as resp:
-                return json.loads(resp.read().decode("utf-8"))
-        except Exception:
-            return {}
-
-    def wait_for_completion(self, prompt_id: str, timeout: int = 300) -> str:
-        """Wait for generation to complete and return output filename"""
-        start = time.time()
-        while time.time() - start < timeout:
-            history = self.get_history(prompt_id)
-            if prompt_id in history:
-                outputs = history[prompt_id].get("outputs", {})
-                for node_id, node_output in outputs.items():
-                    if "images" in node_output:
-                        for img in node_output["images"]:
-                            return img.get("filename", "")
-                return ""
-            print(".", end="", flush=True)
-            time.sleep(2)
-        return ""
-
-    def download_image(self, filename: str, subfolder: str = "") -> bytes:
+        return run_sync(self.core.get_history(prompt_id))
+
+    def wait_next(
+        self,
+        pending: List[PendingPrompt],
+        timeout: Optional[float] = None,
+    ) -> Tuple[PendingPrompt, Completion]:
+        """Wait until any pending prompt finishes; see AsyncComparisonRunner.wait_next"""
+        return run_sync(self.core.wait_next(pending, timeout))
+
+    def wait_for_completion(
+        self,
+        prompt_id: str,
+        timeout: Optional[float] = None,
+        output_nodes: Optional[List[str]] = None,
+    ) -> str:
+        """Wait for generation to complete and return output filename ("" on failure; see wait_next)"""
+        pending = PendingPrompt(None, prompt_id, output_nodes or [], time.perf_counter())
+        completion = run_sync(self.core.wait_for_completion(pending, timeout))
+        return "" if completion.error else completion.filename
+
+    def download_image(self, filename: str, subfolder: str = "", timeout: Optional[float] = None) -> bytes:
         """Download a generated image from ComfyUI"""
-        params = f"filename={filename}"
-        if subfolder:
-            params += f"&subfolder={subfolder}"
-        url = f"{self.comfyui_url}/view?{params}"
-        with urllib.request.urlopen(url, timeout=30) as resp:
-            return resp.read()
-
-    def save_image(self, filename: str, dest_path: Path, subfolder: str = "") -> Path:
-        """Download and save an image from ComfyUI to local path"""
-        data = self.download_image(filename, subfolder)
-        dest_path.parent.mkdir(parents=True, exist_ok=True)
-        dest_path.write_bytes(data)
-        return dest_path
-
-    def load_workflow(self, model: ModelConfig) -> dict:
-        """Load and return workflow for a model"""
-        workflow_path = self.workflow_dir / model.workflow_file
-        if not workflow_path.exists():
-            raise FileNotFoundError(f"Workflow not found: {workflow_path}")
-        return json.loads(workflow_path.read_text())
-
-    def inject_prompt(
+        return run_sync(self.core.download_image(filename, subfolder, timeout))
+
+    def save_image(
         self,
-        workflow: dict,
-        model: ModelConfig,
-        positive: str,
-        negative: str,
-        seed: int,
-        output_prefix: str,
-    ) -> dict:
-        """Inject prompt and parameters into workflow"""
-        # Find and update nodes by searching for common patterns
-        for node_id, node in workflow.items():
-            class_type = node.get("class_type", "")
-            inputs = node.get("inputs", {})
-            meta = node.get("_meta", {})
-            title = meta.get("title", "").lower()
-
-            # Positive prompt
-            if class_type == "CLIPTextEncode":
-                if "positive" in title or node_id == model.prompt_node:
-                    inputs["text"] = positive
-                elif "negative" in title or node_id == model.negative_node:
-                    inputs["text"] = negative
-
-            # Seed
-            if class_type in ["KSampler", "SamplerCustomAdvanced"]:
-                if "seed" in inputs:
-                    inputs["seed"] = seed
-                if "noise_seed" in inputs:
-                    inputs["noise_seed"] = seed
-
-            # Output prefix
-            if class_type == "SaveImage":
-                inputs["filename_prefix"] = output_prefix
-
-        return workflow
+        filename: str,
+        dest_path: Path,
+        subfolder: str = "",
+        folder_type: str = "",
+        timeout: Optional[float] = None,
+    ) -> Path:
+        """Stream an image from ComfyUI to a local path"""
+        return run_sync(self.core.save_image(filename, dest_path, subfolder, folder_type, timeout))
+
+    def submit_job(self, job: GenerationJob) -> Union[PendingPrompt, GenerationResult]:
+        """Build and queue the workflow for a job without waiting for it
+
+        Returns a PendingPrompt, or a failed GenerationResult if the job
+        could not be queued.
+        """
+        return run_sync(self.core.submit_job(job))
 
     def run_single(
         self,
@@ -150,67 +427,41 @@ class ComparisonRunner:
         seed: int = 42,
     ) -> GenerationResult:
         """Run a single generation for one model"""
-        start_time = time.time()
+        return run_sync(self.core.run_single(model, positive, negative, seed))
 
-        try:
-            workflow = self.load_workflow(model)
-        except FileNotFoundError as e:
-            return GenerationResult(
-                model_id=model.id,
-                seed=seed,
-                filename="",
-                prompt_id="",
-                elapsed_time=0,
-                success=False,
-                error=str(e),
-            )
-
-        output_prefix = f"{model.id}_{seed:04d}"
-        workflow = self.inject_prompt(
-            workflow, model, positive, negative, seed, output_prefix
-        )
+    def run_workflow(self, workflow: dict, timeout: Optional[float] = None) -> Tuple[str, Completion]:
+        """Queue a ready-made API workflow and wait for it to finish
 
-        print(f"\n[{model.name}] Queueing... ", end="", flush=True)
-        prompt_id = self.queue_prompt(workflow)
-
-        if not prompt_id:
-            return GenerationResult(
-                model_id=model.id,
-                seed=seed,
-                filename="",
-                prompt_id="",
-                elapsed_time=time.time() - start_time,
-                success=False,
-                error="Failed to queue prompt",
-            )
-
-        print(f"OK ({prompt_id[:8]})")
-        print(f"[{model.name}] Generating", end="", flush=True)
-
-        filename = self.wait_for_completion(prompt_id)
-        elapsed = time.time() - start_time
-
-        if filename:
-            print(f" Done! ({elapsed:.1f}s) -> {filename}")
-            return GenerationResult(
-                model_id=model.id,
-                seed=seed,
-                filename=filename,
-                prompt_id=prompt_id,
-                elapsed_time=elapsed,
-                success=True,
-            )
-        else:
-            print(" TIMEOUT or ERROR")
-            return GenerationResult(
-                model_id=model.id,
-                seed=seed,
-                filename="",
-                prompt_id=prompt_id,
-                elapsed_time=elapsed,
-                success=False,
-                error="Timeout or generation error",
-            )
+        Returns (prompt_id, completion); prompt_id is empty if queueing failed.
+        """
+        return run_sync(self.core.run_workflow(workflow, timeout))
+
+    def run_pipeline(
+        self,
+        next_job: Callable[[bool], Optional[GenerationJob]],
+        on_result: Callable[[GenerationJob, GenerationResult], bool],
+        window: int = 1,
+    ) -> WindowTuner:
+        """Keep up to `window` prompts queued on this server at once
+
+        next_job(block) returns the next job, or None when there is nothing
+        to submit (with block=True: nothing left at all). on_result is
+        called for every finished job and may return False to stop
+        submitting. window=0 auto-tunes the window from measured images/s.
+        """
+        return run_sync(self.core.run_pipeline(next_job, on_result, window))
+
+    def run_jobs(
+        self,
+        jobs: List[GenerationJob],
+        window: Optional[int] = None,
+        on_result: Optional[Callable[[GenerationJob, GenerationResult], None]] = None,
+    ) -> List[GenerationResult]:
+        """Run jobs on this server, keeping `window` prompts in flight
+
+        on_result, if given, is called as each job finishes.
+        """
+        return run_sync(self.core.run_jobs(jobs, on_result, window=window))
 
     def run_comparison(
         self,
@@ -219,55 +470,15 @@ class ComparisonRunner:
         negative: str = "",
         seed: int = 42,
         custom_models: Optional[Dict[str, ModelConfig]] = None,
+        warmup: int = 0,
+        repeats: int = 1,
+        outlier_rule: str = "iqr",
+        on_result: Optional[Callable[[GenerationJob, GenerationResult], None]] = None,
     ) -> List[GenerationResult]:
-        """Run comparison across multiple models"""
-        models = {**BUILTIN_MODELS, **(custom_models or {})}
-        results = []
-
-        print("=" * 60)
-        print("Multi-Model Comparison")
-        print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"Models: {', '.join(model_ids)}")
-        print(f"Seed: {seed}")
-        print("=" * 60)
-
-        for model_id in model_ids:
-            if model_id not in models:
-                print(f"\n⚠️  Model not found: {model_id}")
-                continue
-
-            model = models[model_id]
-            result = self.run_single(model, positive, negative, seed)
-            results.append(result)
-
-        # Summary
-        print("\n" + "=" * 60)
-        print("SUMMARY")
-        print("=" * 60)
-        success_count = sum(1 for r in results if r.success)
-        print(f"Successful: {success_count}/{len(results)}")
-
-        for r in results:
-            status = "✅" if r.success else "❌"
-            print(f"  {status} {r.model_id}: {r.filename or r.error}")
-
-        return results
-
-    def save_results(self, results: List[GenerationResult], output_path: Path):
-        """Save results to JSON"""
-        data = {
-            "timestamp": datetime.now().isoformat(),
-            "results": [
-                {
-                    "model_id": r.model_id,
-                    "seed": r.seed,
-                    "filename": r.filename,
-                    "elapsed_time": r.elapsed_time,
-                    "success": r.success,
-                    "error": r.error,
-                }
-                for r in results
-            ],
-        }
-        output_path.write_text(json.dumps(data, indent=2))
-        print(f"\nResults saved to: {output_path}")
+        """Run comparison across multiple models
+
+        on_result, if given, is called as each job finishes.
+        """
+        return run_sync(self.core.run_comparison(
+            model_ids, positive, negative, seed, custom_models, warmup, repeats, outlier_rule, on_result,
+        ))
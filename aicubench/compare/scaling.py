@@ -0,0 +1,228 @@
+"""
+Throughput scaling over batch size and resolution
+"""
+import json
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .models import BUILTIN_MODELS
+from .runner import GenerationJob, GenerationResult
+from .stats import median
+
+OOM_MARKERS = ("out of memory", "outofmemoryerror")
+
+
+@dataclass
+class ScalingPoint:
+    """One model at one resolution and batch size"""
+    model_id: str
+    width: int
+    height: int
+    batch_size: int
+    runs: int = 0
+    latency: Optional[float] = None           # median seconds per prompt
+    images_per_s: Optional[float] = None      # over the measured runs' wall time
+    megapixels_per_s: Optional[float] = None
+    peak_vram_mb: Optional[float] = None      # sampled during this point's runs (telemetry only)
+    reserved_vram_mb: Optional[float] = None  # PyTorch's reserved high-water mark since server start
+    oom: bool = False
+    error: Optional[str] = None
+
+
+def parse_resolutions(value: str) -> List[Tuple[int, int]]:
+    """'512x512,1024x1024' -> [(512, 512), (1024, 1024)]"""
+    resolutions = []
+    for part in value.split(","):
+        if part.strip():
+            w, h = part.lower().split("x")
+            resolutions.append((int(w), int(h)))
+    return resolutions
+
+
+def parse_batches(value: str) -> List[int]:
+    return sorted({int(v) for v in value.split(",") if v.strip()})
+
+
+def is_oom(error: Optional[str]) -> bool:
+    return bool(error) and any(marker in error.lower() for marker in OOM_MARKERS)
+
+
+def _torch_reserved_mb(runner) -> Optional[float]:
+    """VRAM PyTorch holds on the (first) device, from /system_stats
+
+    The caching allocator keeps what it reserved, so this is the high-water
+    mark since the server started, not the peak of the point just run: it
+    does not drop for a smaller point after a larger one.
+    """
+    runner = getattr(runner, "runners", [runner])[0]
+    try:
+        devices = runner.http.get_json("/system_stats").get("devices") or []
+    except Exception:
+        return None
+    if not devices or devices[0].get("torch_vram_total") is None:
+        return None
+    return devices[0]["torch_vram_total"] / 2**20
+
+
+def measure_point(
+    runner,
+    model_id: str,
+    width: int,
+    height: int,
+    batch_size: int,
+    positive: str,
+    negative: str = "",
+    seed: int = 42,
+    repeats: int = 3,
+    warmup: int = 1,
+    telemetry=None,
+) -> ScalingPoint:
+    """Run warmups, then time `repeats` prompts at one operating point"""
+    model = BUILTIN_MODELS[model_id]
+    point = ScalingPoint(model_id, width, height, batch_size)
+    overrides = {"width": width, "height": height, "batch_size": batch_size}
+    first = getattr(runner, "runners", [runner])[0]
+    try:
+        template = first.templates.get(first.workflow_dir / model.workflow_file, model)
+    except FileNotFoundError as e:
+        point.error = str(e)
+        return point
+    missing = [name for name in overrides if name not in template.points]
+    if missing:
+        point.error = f"workflow has no literal latent {', '.join(missing)} to rewrite"
+        return point
+
+    def jobs(count: int, is_warmup: bool) -> List[GenerationJob]:
+        base = seed + (repeats if is_warmup else 0)
+        return [
+            GenerationJob(i, model, positive, negative, base + i, repeat=i, warmup=is_warmup, overrides=overrides)
+            for i in range(count)
+        ]
+
+    def failure(results: List[GenerationResult]) -> Optional[GenerationResult]:
+        return next((r for r in results if not r.success), None)
+
+    failed = failure(runner.run_jobs(jobs(warmup, True))) if warmup else None
+    if failed is None:
+        started = time.perf_counter()
+        results = runner.run_jobs(jobs(repeats, False))
+        wall = time.perf_counter() - started
+        failed = failure(results)
+    if failed is not None:
+        point.oom = is_oom(failed.error)
+        point.error = failed.error
+        return point
+
+    point.runs = len(results)
+    point.latency = median([r.elapsed_time for r in results])
+    images = sum(len(r.images) or batch_size for r in results)
+    point.images_per_s = images / wall
+    point.megapixels_per_s = point.images_per_s * width * height / 1e6
+    if telemetry is not None:
+        vram = telemetry.summary(started, started + wall).get("vram_used_mb")
+        point.peak_vram_mb = vram["peak"] if vram else None
+    point.reserved_vram_mb = _torch_reserved_mb(runner)
+    return point
+
+
+def run_scaling(
+    runner,
+    model_ids: List[str],
+    resolutions: List[Tuple[int, int]],
+    batch_sizes: List[int],
+    positive: str,
+    negative: str = "",
+    seed: int = 42,
+    repeats: int = 3,
+    warmup: int = 1,
+    telemetry=None,
+) -> List[ScalingPoint]:
+    """Sweep batch sizes (ascending) at each resolution for every model
+
+    The first out-of-memory batch ends its resolution's sweep: larger
+    batches, and those batches at larger resolutions, are not attempted.
+    """
+    points = []
+    for model_id in model_ids:
+        if model_id not in BUILTIN_MODELS:
+            print(f"\n⚠️  Model not found: {model_id}")
+            continue
+        cliff: Optional[float] = None  # smallest batch megapixels that ran out of memory
+        for width, height in sorted(resolutions, key=lambda r: r[0] * r[1]):
+            for batch in sorted(batch_sizes):
+                work = batch * width * height
+                if cliff is not None and work >= cliff:
+                    print(f"⏭️ [{model_id}] {width}x{height} x{batch}: beyond the OOM cliff, skipped")
+                    break
+                print(f"📐 [{model_id}] {width}x{height} x{batch}...", end="", flush=True)
+                point = measure_point(
+                    runner, model_id, width, height, batch, positive, negative, seed, repeats, warmup, telemetry
+                )
+                points.append(point)
+                if point.oom:
+                    cliff = work
+                    print(" 💥 out of memory")
+                    break
+                if point.error:
+                    print(f" ❌ {point.error}")
+                    continue
+                print(f" {point.latency:.2f}s/prompt, {point.images_per_s:.2f} img/s, {point.megapixels_per_s:.2f} MP/s")
+    return points
+
+
+def best_points(points: List[ScalingPoint]) -> Dict[Tuple[str, int, int], ScalingPoint]:
+    """Highest images/s per (model, width, height)"""
+    best: Dict[Tuple[str, int, int], ScalingPoint] = {}
+    for p in points:
+        if p.images_per_s is None:
+            continue
+        key = (p.model_id, p.width, p.height)
+        if key not in best or p.images_per_s > best[key].images_per_s:
+            best[key] = p
+    return best
+
+
+def print_scaling(points: List[ScalingPoint]):
+    print(f"\n{'=' * 78}")
+    print("THROUGHPUT SCALING")
+    print("=" * 78)
+    print(f"  {'model':<14} {'resolution':>11} {'batch':>5} {'s/prompt':>9} {'img/s':>7} {'MP/s':>7} {'peak MB':>8}")
+    best = best_points(points)
+    for p in points:
+        resolution = f"{p.width}x{p.height}"
+        if p.oom:
+            print(f"💥 {p.model_id:<14} {resolution:>11} {p.batch_size:>5}   out of memory")
+            continue
+        if p.error:
+            print(f"❌ {p.model_id:<14} {resolution:>11} {p.batch_size:>5}   {p.error}")
+            continue
+        mark = "⭐" if best.get((p.model_id, p.width, p.height)) is p else "  "
+        if p.peak_vram_mb is not None:
+            vram = f"{p.peak_vram_mb:8.0f}"
+        elif p.reserved_vram_mb is not None:
+            vram = f"{p.reserved_vram_mb:7.0f}^"
+        else:
+            vram = f"{'-':>8}"
+        print(
+            f"{mark} {p.model_id:<14} {resolution:>11} {p.batch_size:>5} {p.latency:9.2f}"
+            f" {p.images_per_s:7.2f} {p.megapixels_per_s:7.2f} {vram}"
+        )
+    print("\n⭐ = throughput-optimal batch size for the model at that resolution")
+    if any(p.peak_vram_mb is None and p.reserved_vram_mb is not None for p in points if not (p.oom or p.error)):
+        print("^ = PyTorch's reserved VRAM high-water mark since server start, not this point's peak (use --telemetry)")
+
+
+def save_scaling(points: List[ScalingPoint], output_path: Path):
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "points": [asdict(p) for p in points],
+        "optimal": [
+            {"model_id": m, "width": w, "height": h, "batch_size": p.batch_size, "images_per_s": p.images_per_s}
+            for (m, w, h), p in best_points(points).items()
+        ],
+    }
+    output_path.write_text(json.dumps(data, indent=2))
+    print(f"\nScaling results saved to: {output_path}")
@@ -0,0 +1,215 @@
+"""
+Multi-server scheduler for comparison runs across a pool of ComfyUI endpoints
+"""
+import threading
+from collections import deque
+from itertools import groupby
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional
+
+from .models import ModelConfig
+from .runner import (
+    ComparisonRunner,
+    GenerationJob,
+    GenerationResult,
+    affinity_key,
+    model_stats,
+    order_by_affinity,
+    print_comparison_header,
+    print_comparison_summary,
+    print_model_stats,
+)
+from .stats import TimingStats
+from .telemetry import TelemetrySampler
+from .timeouts import TimeoutPolicy
+
+
+class MultiServerScheduler:
+    """Distribute generation jobs over several ComfyUI servers.
+
+    Every server has its own job queue, filled round-robin. A server whose
+    queue runs dry steals from the back of the longest remaining queue, so
+    each job goes to whichever server frees up first. A server that refuses
+    a prompt is retired and its job handed back to the pool.
+
+    With affinity enabled, jobs sharing a checkpoint/LoRA set are kept
+    together on one server's queue instead of being dealt round-robin.
+    """
+
+    def __init__(
+        self,
+        comfyui_urls: List[str],
+        workflow_dir: Optional[Path] = None,
+        output_dir: Optional[Path] = None,
+        completion: str = "ws",
+        window: int = 1,
+        affinity: bool = True,
+        telemetry: Optional[TelemetrySampler] = None,
+        timeouts: Optional[TimeoutPolicy] = None,
+    ):
+        """window: prompts kept in flight per server (0 = auto-tune)
+        timeouts: execution limits, shared by every server's runner
+        """
+        timeouts = timeouts or TimeoutPolicy()
+        if not comfyui_urls:
+            raise ValueError("At least one ComfyUI URL is required")
+        self.runners = [
+            ComparisonRunner(
+                comfyui_url=url,
+                workflow_dir=workflow_dir,
+                output_dir=output_dir,
+                completion=completion,
+                verbose=False,
+                affinity=affinity,
+                telemetry=telemetry,
+                timeouts=timeouts,
+            )
+            for url in comfyui_urls
+        ]
+        self.window = window
+        self.affinity = affinity
+        self._queues: List[Deque[GenerationJob]] = [deque() for _ in self.runners]
+        self._alive = [True] * len(self.runners)
+        self._in_flight = 0
+        self._on_result = None
+        self._lock = threading.Condition()
+
+    def runner_for(self, comfyui_url: str) -> ComparisonRunner:
+        """Return the runner bound to a server URL"""
+        url = comfyui_url.rstrip("/")
+        for runner in self.runners:
+            if runner.comfyui_url == url:
+                return runner
+        raise KeyError(f"Unknown ComfyUI server: {comfyui_url}")
+
+    def _next_job(self, worker: int, block: bool = True) -> Optional[GenerationJob]:
+        """Pop the next job for a worker, stealing if its own queue is empty"""
+        with self._lock:
+            while True:
+                own = self._queues[worker]
+                victim = max(self._queues, key=len)
+                if own or victim:
+                    self._in_flight += 1
+                    return own.popleft() if own else victim.pop()
+                # A job still running elsewhere may be handed back
+                if not block or self._in_flight == 0:
+                    return None
+                self._lock.wait()
+
+    def _finish(self):
+        self._in_flight -= 1
+        self._lock.notify_all()
+
+    def _give_back(self, worker: int, job: GenerationJob) -> bool:
+        """Retire a failed server and requeue its job on a live one"""
+        with self._lock:
+            self._alive[worker] = False
+            live = [i for i, alive in enumerate(self._alive) if alive]
+            if not live:
+                return False
+            self._finish()
+            target = min(live, key=lambda i: len(self._queues[i]))
+            self._queues[target].appendleft(job)
+            # Leftover jobs of the retired server move over as well
+            while self._queues[worker]:
+                self._queues[target].append(self._queues[worker].popleft())
+            return True
+
+    def _worker(self, worker: int, results: Dict[int, GenerationResult]):
+        runner = self.runners[worker]
+
+        def on_result(job: GenerationJob, result: GenerationResult) -> bool:
+            if result.queue_failed:
+                if self._give_back(worker, job):
+                    print(f"⚠️  {runner.comfyui_url} refused a prompt, retiring server")
+                    return False
+            with self._lock:
+                self._finish()
+                results[job.index] = result
+                if self._on_result:
+                    self._on_result(job, result)
+                status = "✅" if result.success else "❌"
+                print(
+                    f"{status} [{job.model.name}] {result.elapsed_time:.1f}s "
+                    f"@ {runner.comfyui_url} -> {result.filename or result.error}"
+                )
+            return True
+
+        tuner = runner.run_pipeline(
+            lambda block: self._next_job(worker, block), on_result, self.window
+        )
+        if self.window == 0:
+            print(f"Pipeline window for {runner.comfyui_url} auto-tuned to {tuner.window}")
+
+    def run_jobs(
+        self,
+        jobs: List[GenerationJob],
+        on_result: Optional[Callable[[GenerationJob, GenerationResult], None]] = None,
+    ) -> List[GenerationResult]:
+        """Run jobs on all servers and return results in job order
+
+        on_result, if given, is called (serialized) as each job finishes.
+        """
+        self._on_result = on_result
+        if self.affinity:
+            # Whole checkpoint groups go to the least loaded queue
+            ordered = order_by_affinity(jobs)
+            for _, group in groupby(ordered, key=lambda job: affinity_key(job.model)):
+                min(self._queues, key=len).extend(group)
+        else:
+            for i, job in enumerate(jobs):
+                self._queues[i % len(self.runners)].append(job)
+        self._alive = [True] * len(self.runners)
+        self._in_flight = 0
+
+        results: Dict[int, GenerationResult] = {}
+        threads = [
+            threading.Thread(target=self._worker, args=(i, results), daemon=True)
+            for i in range(len(self.runners))
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return [results[job.index] for job in jobs if job.index in results]
+
+    def run_comparison(
+        self,
+        model_ids: List[str],
+        positive: str,
+        negative: str = "",
+        seed: int = 42,
+        custom_models: Optional[Dict[str, ModelConfig]] = None,
+        warmup: int = 0,
+        repeats: int = 1,
+        outlier_rule: str = "iqr",
+        on_result: Optional[Callable[[GenerationJob, GenerationResult], None]] = None,
+    ) -> List[GenerationResult]:
+        """Run comparison across multiple models on all servers
+
+        on_result, if given, is called as each job finishes.
+        """
+        print_comparison_header(model_ids, seed)
+        print(f"Servers: {', '.join(r.comfyui_url for r in self.runners)}")
+        jobs = self.runners[0].build_jobs(
+            model_ids, positive, negative, seed, custom_models, warmup, repeats
+        )
+        results = self.run_jobs(jobs, on_result=on_result)
+        print_comparison_summary(results)
+        if repeats > 1:
+            print_model_stats(model_stats(results, outlier_rule))
+        return results
+
+    def save_results(
+        self,
+        results: List[GenerationResult],
+        output_path: Path,
+        stats: Optional[Dict[str, TimingStats]] = None,
+    ):
+        """Save merged results to JSON"""
+        http = {runner.comfyui_url: runner.http.stats() for runner in self.runners}
+        self.runners[0].save_results(results, output_path, stats, http)
+
+    def close(self):
+        for runner in self.runners:
+            runner.close()
@@ -0,0 +1,203 @@
+"""
+Summary statistics for repeated benchmark runs
+"""
+import math
+import random
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+OUTLIER_RULES = ("none", "iqr", "mad")
+
+
+@dataclass
+class TimingStats:
+    """Distribution of one timing over repeated runs, in seconds"""
+    n: int
+    discarded: int
+    mean: float
+    median: float
+    p95: float
+    stddev: float
+    ci_low: float
+    ci_high: float
+
+    @property
+    def spread(self) -> float:
+        """Half-width of the confidence interval around the median"""
+        return (self.ci_high - self.ci_low) / 2
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Linear-interpolated percentile, q in [0, 100]"""
+    if not values:
+        raise ValueError("percentile of empty list")
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q / 100
+    lo = math.floor(pos)
+    hi = math.ceil(pos)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def median(values: List[float]) -> float:
+    return percentile(values, 50)
+
+
+def discard_outliers(values: List[float], rule: str = "iqr") -> Tuple[List[float], List[float]]:
+    """Split values into (kept, discarded) by an outlier rule
+
+    iqr: outside [Q1 - 1.5 IQR, Q3 + 1.5 IQR] (Tukey fences)
+    mad: modified z-score above 3.5 (median absolute deviation)
+    none: keep everything
+    """
+    if rule not in OUTLIER_RULES:
+        raise ValueError(f"Unknown outlier rule: {rule}")
+    if rule == "none" or len(values) < 4:
+        return list(values), []
+
+    if rule == "iqr":
+        q1, q3 = percentile(values, 25), percentile(values, 75)
+        fence = 1.5 * (q3 - q1)
+        keep = [v for v in values if q1 - fence <= v <= q3 + fence]
+    else:
+        mid = median(values)
+        mad = median([abs(v - mid) for v in values])
+        if mad == 0:
+            return list(values), []
+        keep = [v for v in values if 0.6745 * abs(v - mid) / mad <= 3.5]
+
+    discarded = [v for v in values if v not in keep]
+    return keep, discarded
+
+
+def bootstrap_ci(
+    values: List[float],
+    confidence: float = 0.95,
+    resamples: int = 2000,
+    seed: int = 0,
+) -> Tuple[float, float]:
+    """Percentile bootstrap confidence interval for the median"""
+    if len(values) < 2:
+        return values[0], values[0]
+    rng = random.Random(seed)
+    medians = sorted(
+        median([rng.choice(values) for _ in values]) for _ in range(resamples)
+    )
+    alpha = (1 - confidence) / 2
+    return percentile(medians, alpha * 100), percentile(medians, (1 - alpha) * 100)
+
+
+def summarize(values: List[float], outlier_rule: str = "iqr", confidence: float = 0.95) -> Optional[TimingStats]:
+    """Summarize repeated timings after discarding outliers"""
+    if not values:
+        return None
+    kept, discarded = discard_outliers(values, outlier_rule)
+    mean = sum(kept) / len(kept)
+    stddev = math.sqrt(sum((v - mean) ** 2 for v in kept) / (len(kept) - 1)) if len(kept) > 1 else 0.0
+    ci_low, ci_high = bootstrap_ci(kept, confidence)
+    return TimingStats(
+        n=len(kept),
+        discarded=len(discarded),
+        mean=mean,
+        median=median(kept),
+        p95=percentile(kept, 95),
+        stddev=stddev,
+        ci_low=ci_low,
+        ci_high=ci_high,
+    )
+
+
+def _ranks(values: List[float]) -> List[float]:
+    """1-based ranks, ties getting the average of the ranks they span"""
+    order = sorted(range(len(values)), key=lambda i: values[i])
+    ranks = [0.0] * len(values)
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = (i + j) / 2 + 1
+        i = j + 1
+    return ranks
+
+
+def _exact_u_counts(n1: int, n2: int) -> List[int]:
+    """Number of orderings giving each U statistic, for samples without ties"""
+    # counts[j][u] for the current n1 prefix, built up one x-sample at a time
+    counts = [[1] for _ in range(n2 + 1)]
+    for _ in range(n1):
+        nxt = [[1]]
+        for j in range(1, n2 + 1):
+            # Largest element is an x (adds j to U) or a y
+            a, b = counts[j], nxt[j - 1]
+            size = max(len(a) + j, len(b))
+            row = [0] * size
+            for u, c in enumerate(a):
+                row[u + j] += c
+            for u, c in enumerate(b):
+                row[u] += c
+            nxt.append(row)
+        counts = nxt
+    return counts[n2]
+
+
+def mann_whitney_greater(x: List[float], y: List[float]) -> float:
+    """One-sided Mann–Whitney U p-value that x tends to be larger than y
+
+    Exact for small samples without ties, otherwise the normal
+    approximation with tie and continuity corrections.
+    """
+    n1, n2 = len(x), len(y)
+    if not n1 or not n2:
+        return 1.0
+    combined = list(x) + list(y)
+    ranks = _ranks(combined)
+    u = sum(ranks[:n1]) - n1 * (n1 + 1) / 2
+
+    ties = len(set(combined)) < len(combined)
+    if not ties and n1 * n2 <= 400:
+        counts = _exact_u_counts(n1, n2)
+        return sum(counts[math.ceil(u):]) / sum(counts)
+
+    n = n1 + n2
+    tie_term = 0.0
+    for value in set(combined):
+        t = combined.count(value)
+        tie_term += t ** 3 - t
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def mann_whitney_min_p(n1: int, n2: int) -> float:
+    """Smallest one-sided Mann–Whitney p-value any n1 vs n2 samples can give (exact test)"""
+    if not n1 or not n2:
+        return 1.0
+    return 1 / math.comb(n1 + n2, n1)
+
+
+def repeats_for_alpha(alpha: float) -> int:
+    """Samples per side needed before the exact test can reach p < alpha"""
+    n = 1
+    while mann_whitney_min_p(n, n) >= alpha:
+        n += 1
+    return n
+
+
+def linear_fit(xs: List[float], ys: List[float]) -> Tuple[float, float, float]:
+    """Least-squares line y = intercept + slope * x; returns (intercept, slope, r²)"""
+    if len(xs) != len(ys) or len(set(xs)) < 2:
+        raise ValueError("linear fit needs at least two distinct x values")
+    n = len(xs)
+    mean_x = sum(xs) / n
+    mean_y = sum(ys) / n
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    slope = sxy / sxx
+    intercept = mean_y - slope * mean_x
+    ss_tot = sum((y - mean_y) ** 2 for y in ys)
+    ss_res = sum((y - intercept - slope * x) ** 2 for x, y in zip(xs, ys))
+    r2 = 1 - ss_res / ss_tot if ss_tot > 0 else 1.0
+    return intercept, slope, r2
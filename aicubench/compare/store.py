@@ -0,0 +1,317 @@
+"""
+Append-only SQLite store of every benchmark run, for trends across runs
+"""
+import hashlib
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .costmodel import StepCostFit
+from .models import BUILTIN_MODELS
+from .runner import GenerationResult, result_from_dict, result_to_dict
+from .stats import median
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    label TEXT,
+    host TEXT NOT NULL,
+    host_name TEXT,
+    host_info TEXT,
+    comfyui_version TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    host TEXT NOT NULL,
+    model_id TEXT NOT NULL,
+    checkpoint TEXT,
+    workflow_hash TEXT,
+    comfyui_version TEXT,
+    prompt_name TEXT,
+    seed INTEGER,
+    repeat INTEGER,
+    warmup INTEGER,
+    success INTEGER,
+    elapsed_time REAL,
+    queue_time REAL,
+    execution_time REAL,
+    cold_load INTEGER,
+    error TEXT,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_results_model_host_run ON results(model_id, host, run_id);
+CREATE INDEX IF NOT EXISTS idx_results_workflow ON results(workflow_hash);
+CREATE INDEX IF NOT EXISTS idx_runs_host ON runs(host, started_at);
+CREATE TABLE IF NOT EXISTS step_costs (
+    id INTEGER PRIMARY KEY,
+    recorded_at TEXT NOT NULL,
+    host TEXT NOT NULL,
+    model_id TEXT NOT NULL,
+    workflow_hash TEXT,
+    comfyui_version TEXT,
+    fixed REAL,
+    per_step REAL,
+    r2 REAL,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_step_costs_model_host ON step_costs(model_id, host, id);
+"""
+
+TREND_METRICS = ("elapsed_time", "execution_time", "queue_time")
+
+
+def host_fingerprint() -> Tuple[str, Dict[str, Any]]:
+    """Short stable id of this machine (name, OS, CPU, RAM, GPU) and the details it hashes"""
+    info: Dict[str, Any] = {
+        "node": platform.node(),
+        "system": platform.system(),
+        "release": platform.release(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+    try:
+        import psutil
+        info["ram_gb"] = round(psutil.virtual_memory().total / 2**30)
+    except ImportError:
+        pass
+    try:
+        gpus = subprocess.check_output(
+            ["nvidia-smi", "--query-gpu=name", "--format=csv,noheader"],
+            encoding="utf-8", stderr=subprocess.DEVNULL, timeout=5,
+        )
+        info["gpus"] = [g.strip() for g in gpus.splitlines() if g.strip()]
+    except (OSError, subprocess.SubprocessError):
+        pass
+    digest = hashlib.sha1(json.dumps(info, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    return digest, info
+
+
+def run_metadata(runner, model_ids: List[str]) -> Dict[str, Any]:
+    """ComfyUI version plus checkpoint and workflow hash per model, for ResultsStore.append
+
+    runner is a ComparisonRunner or MultiServerScheduler (its first server is asked).
+    """
+    runner = getattr(runner, "runners", [runner])[0]
+    meta: Dict[str, Any] = {"comfyui_version": "", "models": {}}
+    try:
+        meta["comfyui_version"] = runner.http.get_json("/system_stats").get("system", {}).get("comfyui_version", "")
+    except Exception:
+        pass
+    for model_id in model_ids:
+        model = BUILTIN_MODELS.get(model_id)
+        if model is None:
+            continue
+        try:
+            digest = runner.templates.get(runner.workflow_dir / model.workflow_file, model).digest
+        except (OSError, ValueError):
+            digest = ""
+        meta["models"][model_id] = {"checkpoint": model.checkpoint or "", "workflow_hash": digest}
+    return meta
+
+
+class ResultsStore:
+    """Every run's results in one SQLite file; rows are only ever inserted.
+
+    Results carry their run's host fingerprint and ComfyUI version plus the
+    model's checkpoint and workflow hash, indexed so "model X on host Y,
+    last N runs" reads a few rows instead of every results.json.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self) -> "ResultsStore":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(
+        self,
+        results: List[GenerationResult],
+        metadata: Optional[Dict[str, Any]] = None,
+        label: str = "",
+        started_at: Optional[str] = None,
+        host: Optional[Tuple[str, Dict[str, Any]]] = None,
+    ) -> int:
+        """Record one run and its results; returns the run id
+
+        metadata: run_metadata() output
+        host: (fingerprint, info), default this machine's
+        """
+        metadata = metadata or {}
+        fingerprint, info = host or host_fingerprint()
+        version = metadata.get("comfyui_version", "")
+        models = metadata.get("models", {})
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (started_at, label, host, host_name, host_info, comfyui_version) VALUES (?, ?, ?, ?, ?, ?)",
+                (started_at or datetime.now().isoformat(), label, fingerprint, info.get("node", ""), json.dumps(info), version),
+            )
+            run_id = cursor.lastrowid
+            self.conn.executemany(
+                "INSERT INTO results (run_id, host, model_id, checkpoint, workflow_hash, comfyui_version, prompt_name,"
+                " seed, repeat, warmup, success, elapsed_time, queue_time, execution_time, cold_load, error, data)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        run_id, fingerprint, r.model_id,
+                        models.get(r.model_id, {}).get("checkpoint", ""),
+                        models.get(r.model_id, {}).get("workflow_hash", ""),
+                        version, r.prompt_name, r.seed, r.repeat, int(r.warmup), int(r.success),
+                        r.elapsed_time, r.queue_time, r.execution_time,
+                        None if r.cold_load is None else int(r.cold_load),
+                        r.error, json.dumps(result_to_dict(r)),
+                    )
+                    for r in results
+                ],
+            )
+        return run_id
+
+    def run_results(self, run_id: int) -> List[GenerationResult]:
+        """Results of one recorded run, in recording order"""
+        rows = self.conn.execute("SELECT data FROM results WHERE run_id = ? ORDER BY id", (run_id,)).fetchall()
+        return [result_from_dict(json.loads(data)) for (data,) in rows]
+
+    def durations(self, host: Optional[str] = None, last: int = 200) -> List[Tuple[str, bool, float]]:
+        """(model, cold load, execution seconds) of the `last` successful results per model and load kind, oldest first
+
+        host matches a fingerprint prefix. Elapsed time stands in where no
+        execution time was recorded.
+        """
+        where = "success = 1"
+        params: List[Any] = []
+        if host:
+            where += " AND host LIKE ?"
+            params.append(host + "%")
+        rows = self.conn.execute(
+            f"SELECT model_id, cold, seconds FROM ("
+            f"   SELECT id, model_id, COALESCE(cold_load, 0) AS cold, COALESCE(execution_time, elapsed_time) AS seconds,"
+            f"   ROW_NUMBER() OVER (PARTITION BY model_id, COALESCE(cold_load, 0) ORDER BY id DESC) AS n"
+            f"   FROM results WHERE {where}"
+            f" ) WHERE n <= ? AND seconds IS NOT NULL ORDER BY id",
+            params + [last],
+        ).fetchall()
+        return [(model_id, bool(cold), seconds) for model_id, cold, seconds in rows]
+
+    def append_step_costs(
+        self,
+        fits: List[StepCostFit],
+        metadata: Optional[Dict[str, Any]] = None,
+        host: Optional[Tuple[str, Dict[str, Any]]] = None,
+    ):
+        """Record fitted step cost models (failed fits are skipped)"""
+        metadata = metadata or {}
+        fingerprint = (host or host_fingerprint())[0]
+        models = metadata.get("models", {})
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO step_costs (recorded_at, host, model_id, workflow_hash, comfyui_version, fixed, per_step, r2, data)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        datetime.now().isoformat(), fingerprint, f.model_id,
+                        models.get(f.model_id, {}).get("workflow_hash", ""), metadata.get("comfyui_version", ""),
+                        f.fixed, f.per_step, f.r2, json.dumps(asdict(f)),
+                    )
+                    for f in fits if f.error is None
+                ],
+            )
+
+    def step_costs(self, host: Optional[str] = None) -> Dict[str, StepCostFit]:
+        """Latest fitted step cost model per model (host: fingerprint prefix)"""
+        where, params = "", []
+        if host:
+            where, params = "WHERE host LIKE ?", [host + "%"]
+        rows = self.conn.execute(
+            f"SELECT model_id, data FROM step_costs WHERE id IN ("
+            f"   SELECT MAX(id) FROM step_costs {where} GROUP BY model_id"
+            f" ) ORDER BY model_id",
+            params,
+        ).fetchall()
+        fits = {}
+        for model_id, data in rows:
+            fields = json.loads(data)
+            fields["points"] = {int(k): v for k, v in fields.get("points", {}).items()}
+            fits[model_id] = StepCostFit(**fields)
+        return fits
+
+    def hosts(self) -> List[Tuple[str, str, int]]:
+        """(fingerprint, host name, run count) per host"""
+        return self.conn.execute(
+            "SELECT host, MAX(host_name), COUNT(*) FROM runs GROUP BY host ORDER BY MAX(started_at) DESC"
+        ).fetchall()
+
+    def trend(
+        self,
+        model_id: str,
+        host: Optional[str] = None,
+        last: int = 30,
+        metric: str = "elapsed_time",
+    ) -> List[Dict[str, Any]]:
+        """Per-run median of a metric for a model over its `last` most recent runs, oldest first
+
+        host matches a fingerprint prefix or a host name. Only successful,
+        measured (non-warmup) results count.
+        """
+        if metric not in TREND_METRICS:
+            raise ValueError(f"Unknown metric: {metric}")
+        where = "r.model_id = ? AND r.success = 1 AND r.warmup = 0"
+        params: List[Any] = [model_id]
+        if host:
+            where += " AND (r.host LIKE ? OR runs.host_name = ?)"
+            params += [host + "%", host]
+        rows = self.conn.execute(
+            f"SELECT r.run_id, runs.started_at, runs.label, runs.host_name, r.comfyui_version, r.{metric}"
+            f" FROM results r JOIN runs ON runs.id = r.run_id"
+            f" WHERE {where} AND r.run_id IN ("
+            f"   SELECT DISTINCT r.run_id FROM results r JOIN runs ON runs.id = r.run_id"
+            f"   WHERE {where} ORDER BY runs.started_at DESC, r.run_id DESC LIMIT ?"
+            f" ) ORDER BY runs.started_at, r.run_id",
+            params + params + [last],
+        ).fetchall()
+
+        runs: Dict[int, Dict[str, Any]] = {}
+        for run_id, started_at, label, host_name, version, value in rows:
+            if value is None:
+                continue
+            run = runs.setdefault(run_id, {
+                "run_id": run_id, "started_at": started_at, "label": label,
+                "host_name": host_name, "comfyui_version": version, "values": [],
+            })
+            run["values"].append(value)
+        for run in runs.values():
+            run["n"] = len(run["values"])
+            run["median"] = median(run.pop("values"))
+        return list(runs.values())
+
+
+def print_trend(model_id: str, trend: List[Dict[str, Any]], metric: str = "elapsed_time"):
+    if not trend:
+        print(f"No runs of {model_id} recorded")
+        return
+    print(f"\n{'=' * 60}")
+    print(f"TREND: {model_id} {metric} (median per run, last {len(trend)} runs)")
+    print("=" * 60)
+    for run in trend:
+        print(
+            f"  #{run['run_id']:<5} {run['started_at'][:19]}  {run['median']:8.2f}s  (n={run['n']})"
+            f"  {run['host_name']}  {run['comfyui_version'] or '-'}  {run['label'] or ''}"
+        )
+    overall = median([run["median"] for run in trend])
+    latest = trend[-1]["median"]
+    print(f"\n  Median of runs: {overall:.2f}s  |  latest: {latest:.2f}s ({(latest / overall - 1) * 100:+.1f}%)")
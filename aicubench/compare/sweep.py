@@ -0,0 +1,129 @@
+"""
+Model x prompt x seed sweeps, resumable through a run journal
+"""
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .journal import RunJournal, job_key
+from .models import BUILTIN_MODELS, ModelConfig
+from .runner import GenerationJob, GenerationResult
+
+
+def load_prompts(paths: List[Path]) -> List[Tuple[str, str]]:
+    """Read (name, text) positive prompts from files and directories
+
+    Directories contribute every *.txt file, except files whose name
+    contains "negative" (those hold negative prompts).
+    """
+    prompts = []
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            files = sorted(p for p in path.glob("*.txt") if "negative" not in p.stem)
+        else:
+            files = [path]
+        for f in files:
+            prompts.append((f.stem, f.read_text().strip()))
+    return prompts
+
+
+def parse_seeds(spec: str) -> List[int]:
+    """Parse a seed list like "1,2,10-15" """
+    seeds = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            lo, hi = part.split("-", 1)
+            seeds.extend(range(int(lo), int(hi) + 1))
+        else:
+            seeds.append(int(part))
+    return seeds
+
+
+def build_sweep_jobs(
+    model_ids: List[str],
+    prompts: List[Tuple[str, str]],
+    seeds: List[int],
+    negative: str = "",
+    warmup: int = 0,
+    repeats: int = 1,
+    custom_models: Optional[Dict[str, ModelConfig]] = None,
+) -> List[GenerationJob]:
+    """Expand models x prompts x seeds (x repeats) into jobs
+
+    Warmup runs are added once per model, ahead of its first cell. Repeat r
+    of a seed runs at seed + r * span, span being the width of the seed
+    range, and warmups run above every measured seed, so no two jobs of a
+    model and prompt share a seed and none is answered from ComfyUI's cache.
+    """
+    models = {**BUILTIN_MODELS, **(custom_models or {})}
+    jobs: List[GenerationJob] = []
+    seeds = list(dict.fromkeys(seeds))
+    span = max(seeds) - min(seeds) + 1 if seeds else 1
+    for model_id in model_ids:
+        if model_id not in models:
+            print(f"⚠️  Model not found: {model_id}")
+            continue
+        model = models[model_id]
+        if prompts and seeds:
+            name, positive = prompts[0]
+            for w in range(warmup):
+                jobs.append(GenerationJob(
+                    len(jobs), model, positive, negative, min(seeds) + repeats * span + w,
+                    repeat=w, warmup=True, prompt_name=name,
+                ))
+        for name, positive in prompts:
+            for seed in seeds:
+                for r in range(repeats):
+                    jobs.append(GenerationJob(
+                        len(jobs), model, positive, negative, seed + r * span,
+                        repeat=r, prompt_name=name,
+                    ))
+    return jobs
+
+
+def run_sweep(
+    runner,
+    jobs: List[GenerationJob],
+    journal: RunJournal,
+    on_result: Optional[Callable[[GenerationJob, GenerationResult], None]] = None,
+) -> List[GenerationResult]:
+    """Run the jobs not yet completed in the journal, streaming each result to it
+
+    runner is a ComparisonRunner or MultiServerScheduler. Warmups are re-run
+    for any model that still has measured jobs left, since a resumed server
+    starts cold. on_result, if given, is called after each result is
+    journaled. Returns the results for all jobs, in job order: the ones run
+    now as produced, the rest as journaled.
+    """
+    done = journal.completed()
+    measured_left = {
+        job.model.id for job in jobs
+        if not job.warmup and job_key(job) not in done
+    }
+    todo = [
+        job for job in jobs
+        if (job.model.id in measured_left if job.warmup else job_key(job) not in done)
+    ]
+
+    print(f"Sweep: {len(jobs)} jobs, {len(jobs) - len(todo)} already journaled, {len(todo)} to run")
+    print(f"Journal: {journal.path}")
+    fresh: Dict[str, GenerationResult] = {}
+
+    def record(job: GenerationJob, result: GenerationResult):
+        journal.append(job, result)
+        fresh[job_key(job)] = result
+        if on_result:
+            on_result(job, result)
+
+    if todo:
+        runner.run_jobs(todo, on_result=record)
+    journaled = journal.load()
+    results = []
+    for job in jobs:
+        key = job_key(job)
+        if key in fresh or key in journaled:
+            results.append(fresh.get(key) or journaled[key])
+    return results
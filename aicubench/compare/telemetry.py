@@ -0,0 +1,197 @@
+"""
+Background hardware telemetry sampling during generation
+"""
+import json
+import os
+import shlex
+import subprocess
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+GPU_FIELDS = ("gpu_util", "vram_used_mb", "gpu_clock_mhz", "mem_clock_mhz")
+HOST_FIELDS = ("cpu_util", "ram_used_mb", "rss_mb")
+NVIDIA_SMI_QUERY = "utilization.gpu,memory.used,clocks.sm,clocks.mem"
+
+
+class NvidiaSmiSource:
+    """GPU metrics from one long-running `nvidia-smi --query-gpu ... -lms` process.
+
+    nvidia-smi prints a CSV line per interval; a reader thread keeps the
+    latest one, so sampling never waits on a subprocess. The command is
+    pluggable (argument or AICUBENCH_NVIDIA_SMI) so any program printing
+    the same CSV can stand in for it.
+    """
+
+    fields = GPU_FIELDS
+
+    def __init__(self, interval: float = 0.1, gpu_index: int = 0, command: Optional[Sequence[str]] = None):
+        if command is None:
+            command = shlex.split(os.environ.get("AICUBENCH_NVIDIA_SMI", "nvidia-smi"))
+        self.command = list(command) + [
+            f"--query-gpu={NVIDIA_SMI_QUERY}",
+            "--format=csv,noheader,nounits",
+            f"--id={gpu_index}",
+            f"-lms={max(int(interval * 1000), 10)}",
+        ]
+        self._process: Optional[subprocess.Popen] = None
+        self._latest: Optional[List[float]] = None
+
+    def start(self) -> bool:
+        """Launch the stream; False if the command is unavailable"""
+        try:
+            self._process = subprocess.Popen(
+                self.command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, bufsize=1
+            )
+        except OSError:
+            return False
+        threading.Thread(target=self._read, daemon=True).start()
+        return True
+
+    def _read(self):
+        for line in self._process.stdout:
+            values = []
+            for part in line.split(","):
+                try:
+                    values.append(float(part))
+                except ValueError:
+                    values.append(float("nan"))  # "[N/A]" on unsupported GPUs
+            if len(values) == len(self.fields):
+                self._latest = values
+
+    def sample(self) -> Optional[List[float]]:
+        return self._latest
+
+    def stop(self):
+        if self._process is not None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+            self._process = None
+
+
+class HostSource:
+    """CPU utilization, used RAM and the RSS of one process, via psutil"""
+
+    fields = HOST_FIELDS
+
+    def __init__(self, pid: Optional[int] = None):
+        self.pid = pid or os.getpid()
+        self._process = None
+
+    def start(self) -> bool:
+        if psutil is None:
+            return False
+        try:
+            self._process = psutil.Process(self.pid)
+        except psutil.Error:
+            return False
+        psutil.cpu_percent(None)  # the first call only sets the baseline
+        return True
+
+    def sample(self) -> Optional[List[float]]:
+        try:
+            rss = self._process.memory_info().rss / 2**20
+        except psutil.Error:
+            rss = float("nan")
+        return [psutil.cpu_percent(None), psutil.virtual_memory().used / 2**20, rss]
+
+    def stop(self):
+        self._process = None
+
+
+class TelemetrySampler:
+    """Sample all sources on a thread into compact per-field arrays.
+
+    Timestamps are time.perf_counter(), the clock the runner uses for
+    job timings, so each generation can be summarized over exactly the
+    window it ran in.
+    """
+
+    def __init__(self, sources: Optional[list] = None, interval: float = 0.1):
+        self.interval = interval
+        self.sources = sources if sources is not None else [NvidiaSmiSource(interval), HostSource()]
+        self._active: list = []
+        self.times = array("d")
+        self.series: Dict[str, array] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def fields(self) -> List[str]:
+        return [f for source in self._active for f in source.fields]
+
+    def start(self) -> "TelemetrySampler":
+        self._active = [source for source in self.sources if source.start()]
+        self.series = {f: array("f") for f in self.fields}
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for source in self._active:
+            source.stop()
+
+    def __enter__(self) -> "TelemetrySampler":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self):
+        next_at = time.perf_counter()
+        while not self._stop.is_set():
+            row = []
+            for source in self._active:
+                values = source.sample()
+                row.extend(values if values is not None else [float("nan")] * len(source.fields))
+            with self._lock:
+                self.times.append(time.perf_counter())
+                for name, value in zip(self.fields, row):
+                    self.series[name].append(value)
+            next_at += self.interval
+            self._stop.wait(max(next_at - time.perf_counter(), 0))
+
+    def summary(self, start: Optional[float] = None, end: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """Peak and mean of each field over samples in [start, end]"""
+        with self._lock:
+            lo = 0 if start is None else bisect_left(self.times, start)
+            hi = len(self.times) if end is None else bisect_right(self.times, end)
+            result = {}
+            for name, values in self.series.items():
+                window = [v for v in values[lo:hi] if v == v]  # drop NaN
+                if window:
+                    result[name] = {
+                        "peak": round(max(window), 2),
+                        "mean": round(sum(window) / len(window), 2),
+                    }
+            return result
+
+    def export(self, path: Path):
+        """Write the raw series as JSON columns (t in seconds from the first sample)"""
+        with self._lock:
+            t0 = self.times[0] if self.times else 0.0
+            data = {
+                "interval": self.interval,
+                "t": [round(t - t0, 4) for t in self.times],
+                **{name: [None if v != v else round(v, 2) for v in values] for name, values in self.series.items()},
+            }
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(json.dumps(data))
+
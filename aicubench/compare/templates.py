@@ -0,0 +1,163 @@
+"""
+Compiled workflow templates: parse once, inject per job
+"""
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from .models import ModelConfig
+
+# Nodes whose cache state tells whether the model weights had to be loaded
+MODEL_LOADER_TYPES = ("CheckpointLoaderSimple", "CheckpointLoader", "UNETLoader", "LoraLoader")
+SAMPLER_NODE_TYPES = ("KSampler", "KSamplerAdvanced", "SamplerCustomAdvanced")
+# Custom-sampling nodes that hold the sampler fields split out of KSampler
+SAMPLING_PARAM_TYPES = ("BasicScheduler", "Flux2Scheduler", "KSamplerSelect", "CFGGuider")
+LATENT_NODE_TYPES = ("EmptyLatentImage", "EmptySD3LatentImage", "EmptyHunyuanLatentVideo")
+
+# Injectable fields and the node inputs that receive them
+SAMPLER_FIELDS = ("steps", "cfg", "sampler_name", "scheduler")
+LATENT_FIELDS = ("width", "height", "batch_size")
+
+InjectionPoints = Dict[str, List[Tuple[str, str]]]  # field -> [(node_id, input name)]
+
+
+def index_injection_points(workflow: dict, model: ModelConfig) -> InjectionPoints:
+    """Find where each per-job value goes
+
+    Prompt texts by node title or ModelConfig node id, seeds, literal
+    sampler and latent fields, and the SaveImage filename prefix.
+    """
+    points: InjectionPoints = {}
+
+    def add(name: str, node_id: str, key: str):
+        points.setdefault(name, []).append((node_id, key))
+
+    for node_id, node in workflow.items():
+        class_type = node.get("class_type", "")
+        inputs = node.get("inputs", {})
+        title = node.get("_meta", {}).get("title", "").lower()
+
+        if class_type == "CLIPTextEncode":
+            if "positive" in title or node_id == model.prompt_node:
+                add("positive", node_id, "text")
+            elif "negative" in title or node_id == model.negative_node:
+                add("negative", node_id, "text")
+
+        if class_type in ("KSampler", "SamplerCustomAdvanced"):
+            for key in ("seed", "noise_seed"):
+                if key in inputs:
+                    add("seed", node_id, key)
+
+        # Only literal inputs; linked ones ([node, slot]) are left alone
+        if class_type in SAMPLER_NODE_TYPES + SAMPLING_PARAM_TYPES:
+            for key in SAMPLER_FIELDS:
+                if key in inputs and not isinstance(inputs[key], list):
+                    add(key, node_id, key)
+        if class_type in LATENT_NODE_TYPES:
+            for key in LATENT_FIELDS:
+                if key in inputs and not isinstance(inputs[key], list):
+                    add(key, node_id, key)
+
+        if class_type == "SaveImage":
+            add("output_prefix", node_id, "filename_prefix")
+
+    return points
+
+
+@dataclass
+class WorkflowTemplate:
+    """A parsed API workflow plus where to inject each job's values.
+
+    render() returns a new workflow that shares every untouched node with
+    the template; only injected nodes and their inputs are copied. The
+    template itself is never mutated, so treat rendered workflows as
+    read-only (they are only serialized for /prompt).
+    """
+    path: Path
+    digest: str
+    workflow: Dict[str, Any]
+    points: InjectionPoints
+    output_nodes: List[str] = field(default_factory=list)
+    loader_nodes: List[str] = field(default_factory=list)
+    node_types: Dict[str, str] = field(default_factory=dict)
+
+    def render(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """Workflow with values injected; fields missing from values keep the template's"""
+        workflow = dict(self.workflow)
+        copied = set()
+        for name, value in values.items():
+            if value is None:
+                continue
+            for node_id, key in self.points.get(name, ()):
+                if node_id not in copied:
+                    node = dict(workflow[node_id])
+                    node["inputs"] = dict(node.get("inputs", {}))
+                    workflow[node_id] = node
+                    copied.add(node_id)
+                workflow[node_id]["inputs"][key] = value
+        return workflow
+
+    def copy(self) -> Dict[str, Any]:
+        """A deep, freely mutable copy of the template workflow"""
+        return json.loads(json.dumps(self.workflow))
+
+
+class TemplateCache:
+    """Compiled templates keyed by workflow file and model node mapping.
+
+    Each lookup stats the file; a changed mtime or size triggers a re-read,
+    and the template is only recompiled if the content hash changed.
+    Safe to share between threads.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Tuple[str, str, str], Tuple[Tuple[int, int], WorkflowTemplate]] = {}
+        self._lock = threading.Lock()
+        self.compiles = 0
+
+    def get(self, path: Path, model: ModelConfig) -> WorkflowTemplate:
+        """Template for a workflow file; raises FileNotFoundError if missing"""
+        path = Path(path)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Workflow not found: {path}") from None
+        stamp = (st.st_mtime_ns, st.st_size)
+        key = (str(path.resolve()), model.prompt_node, model.negative_node)
+
+        with self._lock:
+            cached = self._entries.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        raw = path.read_bytes()
+        digest = hashlib.sha1(raw).hexdigest()
+        if cached is not None and cached[1].digest == digest:
+            template = cached[1]
+        else:
+            template = self._compile(path, digest, json.loads(raw.decode("utf-8")), model)
+        with self._lock:
+            self._entries[key] = (stamp, template)
+        return template
+
+    def _compile(self, path: Path, digest: str, workflow: dict, model: ModelConfig) -> WorkflowTemplate:
+        with self._lock:
+            self.compiles += 1
+        return WorkflowTemplate(
+            path=path,
+            digest=digest,
+            workflow=workflow,
+            points=index_injection_points(workflow, model),
+            output_nodes=[n for n, node in workflow.items() if node.get("class_type") == "SaveImage"],
+            loader_nodes=[n for n, node in workflow.items() if node.get("class_type") in MODEL_LOADER_TYPES],
+            node_types={n: node.get("class_type", "") for n, node in workflow.items()},
+        )
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
@@ -0,0 +1,64 @@
+"""
+Per-model execution time limits derived from past durations
+"""
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Optional, Tuple
+
+from .stats import percentile
+
+
+@dataclass
+class TimeoutPolicy:
+    """How long a prompt may execute before it is treated as hung
+
+    A model's limit is `factor` times the `quantile` percentile of its
+    recent execution times, clamped to [floor, ceiling]. Cold runs (model
+    load included) are tracked apart from warm ones. Until a model has
+    `min_samples` durations of the right kind, `default` applies.
+    Successful runs are added as they finish.
+    """
+    default: float = 300.0
+    quantile: float = 99.0
+    factor: float = 3.0
+    floor: float = 30.0
+    ceiling: float = 3600.0
+    min_samples: int = 5
+    window: int = 200
+    samples: Dict[Tuple[str, bool], Deque[float]] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+
+    def observe(self, model_id: str, seconds: float, cold: Optional[bool] = False):
+        with self._lock:
+            key = (model_id, bool(cold))
+            if key not in self.samples:
+                self.samples[key] = deque(maxlen=self.window)
+            self.samples[key].append(seconds)
+
+    def limit(self, model_id: str, cold: Optional[bool] = False) -> float:
+        """Seconds a prompt of this model may execute"""
+        with self._lock:
+            durations = list(self.samples.get((model_id, bool(cold)), ()))
+        if len(durations) < self.min_samples:
+            return self.default
+        return min(max(percentile(durations, self.quantile) * self.factor, self.floor), self.ceiling)
+
+    def limits(self) -> Dict[str, Dict[str, float]]:
+        """model -> {"warm"/"cold": limit} for every model with enough history"""
+        with self._lock:
+            keys = [key for key, durations in self.samples.items() if len(durations) >= self.min_samples]
+        table: Dict[str, Dict[str, float]] = {}
+        for model_id, cold in sorted(keys):
+            table.setdefault(model_id, {})["cold" if cold else "warm"] = self.limit(model_id, cold)
+        return table
+
+    @classmethod
+    def from_store(cls, store, host: Optional[str] = None, **kwargs) -> "TimeoutPolicy":
+        """A policy seeded with the recent durations recorded in a ResultsStore"""
+        policy = cls(**kwargs)
+        for model_id, cold, seconds in store.durations(host, policy.window):
+            policy.observe(model_id, seconds, cold)
+        return policy
@@ -0,0 +1,284 @@
+"""
+Parallel, resumable model downloader
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+CHUNK_SIZE = 1024 * 1024
+SEGMENT_MIN_SIZE = 64 * 1024 * 1024  # files below this are fetched in one stream
+STATE_FLUSH_BYTES = 16 * 1024 * 1024
+
+
+@dataclass
+class DownloadSpec:
+    """One file to fetch; sha256/size are verified when known"""
+    url: str
+    dest_path: Path
+    sha256: Optional[str] = None
+    size: Optional[int] = None
+
+
+@dataclass
+class DownloadReport:
+    """Outcome of one file: downloaded, resumed, skipped or failed"""
+    url: str
+    dest_path: Path
+    status: str
+    bytes: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def mb_per_s(self) -> float:
+        return self.bytes / self.seconds / 1e6 if self.seconds > 0 else 0.0
+
+
+def parse_wget_lines(lines: Iterable[str], comfy_dir: str) -> List[DownloadSpec]:
+    """Download specs from basemodels.txt-style `wget -c URL -P DIR` lines
+
+    A `sha256=<hex>` token on the line (e.g. in a trailing comment) sets
+    the hash the file is verified against.
+    """
+    specs = []
+    for line in lines:
+        if not line.strip().startswith("wget"):
+            continue
+        parts = line.strip().split()
+        if "-c" not in parts or "-P" not in parts:
+            print("⚠️ Malformed wget line, skipping:", line)
+            continue
+        url = parts[parts.index("-c") + 1]
+        dest_dir = parts[parts.index("-P") + 1]
+        if "models" in dest_dir and not dest_dir.startswith(comfy_dir):
+            dest_dir = os.path.join(comfy_dir, dest_dir)
+        sha256 = next((p[len("sha256="):].lower() for p in parts if p.startswith("sha256=")), None)
+        specs.append(DownloadSpec(url, Path(dest_dir) / os.path.basename(url), sha256))
+    return specs
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def probe(url: str, timeout: float = 30) -> Tuple[Optional[int], bool]:
+    """Remote (size, supports byte ranges), following redirects
+
+    Asks for the first byte so servers that do not answer HEAD properly
+    still report the total through Content-Range.
+    """
+    req = urllib.request.Request(url, headers={"Range": "bytes=0-0"})
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        content_range = resp.headers.get("Content-Range", "")
+        if resp.status == 206 and "/" in content_range:
+            total = content_range.rsplit("/", 1)[1]
+            return (int(total) if total.isdigit() else None), True
+        length = resp.headers.get("Content-Length")
+        return (int(length) if length else None), False
+
+
+class ModelDownloader:
+    """Fetch files concurrently, splitting large ones into range requests.
+
+    A download in progress lives in <dest>.part, with <dest>.part.json
+    recording how far each segment got, so an interrupted run continues
+    where it stopped. Complete files are skipped when their size (and
+    sha256, if given) match.
+    """
+
+    def __init__(self, max_files: int = 3, segments: int = 4, timeout: float = 60, retries: int = 3, backoff: float = 1.0):
+        self.max_files = max_files
+        self.segments = segments
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+
+    def download_all(self, specs: List[DownloadSpec]) -> List[DownloadReport]:
+        """Download every spec, max_files at a time; reports are in spec order"""
+        if not specs:
+            return []
+        with ThreadPoolExecutor(max_workers=self.max_files) as pool:
+            reports = list(pool.map(self.download, specs))
+        total = sum(r.bytes for r in reports)
+        failed = sum(r.status == "failed" for r in reports)
+        print(f"📦 {len(reports)} files, {total / 1e6:.1f} MB fetched, {failed} failed")
+        return reports
+
+    def download(self, spec: DownloadSpec) -> DownloadReport:
+        """Fetch one file, resuming or skipping as appropriate"""
+        start = time.perf_counter()
+        dest = Path(spec.dest_path)
+        try:
+            size, ranges = probe(spec.url, self.timeout)
+            size = spec.size or size
+            if self._is_complete(spec, dest, size):
+                print(f"⏭️ Already complete: {dest}")
+                return DownloadReport(spec.url, dest, "skipped")
+
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            fetched, resumed = self._fetch(spec.url, dest, size, ranges)
+            if size is not None and dest.stat().st_size != size:
+                raise IOError(f"size mismatch: expected {size}, got {dest.stat().st_size}")
+            if spec.sha256 and file_sha256(dest) != spec.sha256.lower():
+                dest.unlink()
+                raise IOError("sha256 mismatch")
+        except Exception as e:
+            print(f"❌ Download failed for {spec.url}: {e}")
+            return DownloadReport(spec.url, dest, "failed", seconds=time.perf_counter() - start, error=str(e))
+
+        report = DownloadReport(spec.url, dest, "resumed" if resumed else "downloaded", fetched, time.perf_counter() - start)
+        print(f"✅ {dest.name}: {fetched / 1e6:.1f} MB in {report.seconds:.2f}s ({report.mb_per_s:.1f} MB/s)")
+        return report
+
+    @staticmethod
+    def _is_complete(spec: DownloadSpec, dest: Path, size: Optional[int]) -> bool:
+        if not dest.exists():
+            return False
+        if size is not None and dest.stat().st_size != size:
+            return False
+        if spec.sha256:
+            return file_sha256(dest) == spec.sha256.lower()
+        # Without a size or hash there is nothing to check against; like
+        # wget -c, an existing file is taken as done
+        return True
+
+    def _fetch(self, url: str, dest: Path, size: Optional[int], ranges: bool) -> Tuple[int, bool]:
+        """Fill <dest>.part and move it into place; returns (bytes fetched, resumed)"""
+        part = dest.with_name(dest.name + ".part")
+        state_path = dest.with_name(dest.name + ".part.json")
+
+        if not (ranges and size):
+            # No way to resume or split: one plain stream from the start
+            written = self._stream(url, part, 0, None, None)
+            os.replace(part, dest)
+            return written, False
+
+        segments = self._load_state(state_path, size) if part.exists() else None
+        resumed = segments is not None
+        if segments is None:
+            if dest.exists() and dest.stat().st_size < size:
+                # wget -c semantics: an existing short file is continued
+                os.replace(dest, part)
+                segments = [[0, size - 1, part.stat().st_size]]
+                resumed = True
+            else:
+                count = self.segments if size >= SEGMENT_MIN_SIZE else 1
+                bounds = [size * i // count for i in range(count + 1)]
+                segments = [[bounds[i], bounds[i + 1] - 1, bounds[i]] for i in range(count)]
+        with open(part, "ab") as f:
+            f.truncate(size)
+
+        state = _SegmentState(state_path, segments)
+        state.flush()
+        with ThreadPoolExecutor(max_workers=len(segments)) as pool:
+            futures = [
+                pool.submit(self._stream, url, part, seg[2], seg[1], (state, i))
+                for i, seg in enumerate(segments)
+                if seg[2] <= seg[1]
+            ]
+            written = sum(f.result() for f in futures)
+        os.replace(part, dest)
+        state_path.unlink()
+        return written, resumed
+
+    @staticmethod
+    def _load_state(state_path: Path, size: int) -> Optional[List[List[int]]]:
+        try:
+            data = json.loads(state_path.read_text())
+        except (OSError, ValueError):
+            return None
+        if data.get("size") != size:
+            return None
+        return data["segments"]
+
+    def _stream(self, url: str, path: Path, offset: int, end: Optional[int], progress) -> int:
+        """Write bytes offset..end of url into path at the same offset, retrying from where it stopped"""
+        written = 0
+        attempt = 0
+        while True:
+            headers = {}
+            if end is not None:
+                headers["Range"] = f"bytes={offset + written}-{end}"
+            try:
+                req = urllib.request.Request(url, headers=headers)
+                with urllib.request.urlopen(req, timeout=self.timeout) as resp, open(path, "r+b" if end is not None else "wb") as f:
+                    if end is not None and resp.status != 206:
+                        raise IOError(f"server ignored range request (HTTP {resp.status})")
+                    f.seek(offset + written)
+                    while True:
+                        chunk = resp.read(CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        f.write(chunk)
+                        written += len(chunk)
+                        if progress is not None:
+                            state, index = progress
+                            state.advance(index, offset + written)
+                if end is None or offset + written > end:
+                    return written
+                raise IOError("connection closed before the range was complete")
+            except (OSError, urllib.error.URLError) as e:
+                if end is None or attempt >= self.retries:
+                    raise
+                attempt += 1
+                print(f"⚠️ {path.name[:-len('.part')]}: {e}; retrying from byte {offset + written}")
+                time.sleep(self.backoff * 2 ** attempt)
+            finally:
+                if progress is not None:
+                    progress[0].flush()
+
+
+class _SegmentState:
+    """Per-segment progress of a ranged download, persisted next to the .part file"""
+
+    def __init__(self, path: Path, segments: List[List[int]]):
+        self.path = path
+        self.segments = segments  # [start, end, next byte to fetch]
+        self.size = segments[-1][1] + 1
+        self._lock = threading.Lock()
+        self._unflushed = 0
+
+    def advance(self, index: int, position: int):
+        with self._lock:
+            self._unflushed += position - self.segments[index][2]
+            self.segments[index][2] = position
+            due = self._unflushed >= STATE_FLUSH_BYTES
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            self._unflushed = 0
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_text(json.dumps({"size": self.size, "segments": self.segments}))
+            os.replace(tmp, self.path)
+
+
+def load_hashes(path: Path) -> Dict[str, str]:
+    """sha256 per filename from a `sha256sum`-style file ("<hash>  <name>")"""
+    hashes = {}
+    for line in Path(path).read_text().splitlines():
+        parts = line.split()
+        if len(parts) >= 2:
+            hashes[os.path.basename(parts[-1].lstrip("*"))] = parts[0].lower()
+    return hashes
+
+
+def apply_hashes(specs: List[DownloadSpec], hashes: Dict[str, str]) -> int:
+    """Set sha256 on specs without one, by file name; returns how many have a hash"""
+    for spec in specs:
+        if not spec.sha256:
+            spec.sha256 = hashes.get(Path(spec.dest_path).name)
+    return sum(1 for spec in specs if spec.sha256)
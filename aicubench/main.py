@@ -8,6 +8,10 @@ import platform
 import json
 from pathlib import Path
 
+from aicubench.downloader import ModelDownloader, apply_hashes, load_hashes, parse_wget_lines
+from aicubench.spool import SPOOL_DIR, SubmissionSpool, spool_benchmark_summary
+from aicubench.startup import ReadinessProbe, StartupProfiler, print_startup_profile
+
 COMFY_DIR = os.environ.get("COMFY_DIR", "./ComfyUI")
 COMFY_PORT = int(os.environ.get("COMFY_PORT", "8188"))
 BASEMODELS_TXT_URL = "https://raw.githubusercontent.com/aicuai/Book-SD-MasterGuide/main/basemodels.txt"
@@ -15,9 +19,24 @@ WORKFLOW_DIR = Path("workflows")
 WORKFLOW_TEMPLATE = "sd15-{i:02}.json"
 
 NO_DELETE = "--nodelete" in sys.argv
+COLD_SUBPROCESS = "--cold-subprocess" in sys.argv
 
 GPU_INFO_PATH = Path("Artifacts/gpu_info.json")
 LAST_SUCCESS_PATH = Path("Artifacts/last_success.json")
+BENCHMARK_SUMMARY_PATH = Path("Artifacts/benchmark_summary.json")
+OUTPUT_IMAGES_DIR = Path("output_images")
+COMFYUI_LOG_PATH = Path("Artifacts/comfyui.log")
+STARTUP_TIMEOUT = float(os.environ.get("AICUBENCH_STARTUP_TIMEOUT", "300"))
+
+# Files fetched at once, and range requests per large file
+MODEL_DOWNLOAD_FILES = int(os.environ.get("AICUBENCH_DOWNLOAD_FILES", "3"))
+MODEL_DOWNLOAD_SEGMENTS = int(os.environ.get("AICUBENCH_DOWNLOAD_SEGMENTS", "4"))
+# sha256sum-style list ("<hash>  <file name>") the downloaded models are verified against
+MODEL_HASHES_PATH = Path(os.environ.get("AICUBENCH_MODEL_HASHES", "model_hashes.sha256"))
+
+# GPU/host sampling interval during the benchmark loop (0 disables)
+TELEMETRY_INTERVAL = float(os.environ.get("AICUBENCH_TELEMETRY_INTERVAL", "0.25"))
+TELEMETRY_PATH = Path("Artifacts/telemetry.json")
 
 def ensure_build_tools():
     system = platform.system()
@@ -74,31 +93,19 @@ def download_recommended_models():
     try:
         with urllib.request.urlopen(BASEMODELS_TXT_URL) as response:
             lines = response.read().decode().splitlines()
-            for line in lines:
-                if line.strip().startswith("wget"):
-                    print(f"🌐 {line}")
-                    parts = line.strip().split()
-                    if "-c" in parts and "-P" in parts:
-                        url = parts[parts.index("-c") + 1]
-                        dest_dir = parts[parts.index("-P") + 1]
-                        filename = os.path.basename(url)
-                        if "models" in dest_dir and not dest_dir.startswith(COMFY_DIR):
-                            dest_dir = os.path.join(COMFY_DIR, dest_dir)
-                        os.makedirs(dest_dir, exist_ok=True)
-                        dest_path = os.path.join(dest_dir, filename)
-                        try:
-                            start = time.time()
-                            urllib.request.urlretrieve(url, dest_path)
-                            elapsed = time.time() - start
-                            print(f"✅ Downloaded to {dest_path} in {elapsed:.2f} seconds")
-                        except Exception as e:
-                            print(f"❌ Download failed for {url}: {e}")
-                    else:
-                        print("⚠️ Malformed wget line, skipping:", line)
     except Exception as e:
         print(f"❌ Failed to download models: {e}")
         sys.exit(1)
 
+    specs = parse_wget_lines(lines, COMFY_DIR)
+    if MODEL_HASHES_PATH.exists():
+        verified = apply_hashes(specs, load_hashes(MODEL_HASHES_PATH))
+        print(f"🔐 {verified}/{len(specs)} files will be verified against {MODEL_HASHES_PATH}")
+    for spec in specs:
+        print(f"🌐 {spec.url} -> {spec.dest_path}")
+    downloader = ModelDownloader(max_files=MODEL_DOWNLOAD_FILES, segments=MODEL_DOWNLOAD_SEGMENTS)
+    return downloader.download_all(specs)
+
 def install_comfy_requirements():
     print("📦 Installing ComfyUI requirements...")
     req_file = os.path.join(COMFY_DIR, "requirements.txt")
@@ -110,38 +117,103 @@ def install_comfy_requirements():
     else:
         print(f"⚠️ requirements.txt not found in {COMFY_DIR}")
 
-def start_comfyui():
+def start_comfyui(profiler=None):
     print("🚀 Launching ComfyUI headless server...")
     main_py_path = os.path.join(COMFY_DIR, "main.py")
     if not os.path.isfile(main_py_path):
         print(f"❌ Error: main.py not found in {COMFY_DIR}")
         sys.exit(1)
-    return subprocess.Popen(
+    profiler = profiler or StartupProfiler(COMFYUI_LOG_PATH)
+    return profiler.start(
         ["python", "main.py", "--listen", "127.0.0.1", "--port", str(COMFY_PORT)],
         cwd=COMFY_DIR,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
     )
 
 def measure_startup_time():
+    """Launch ComfyUI and profile its startup phases until it answers"""
     print("⏱ Measuring initial ComfyUI startup time...")
-    start = time.time()
-    process = start_comfyui()
-    for _ in range(20):
-        try:
-            import requests
-            r = requests.get(f"http://127.0.0.1:{COMFY_PORT}")
-            if r.status_code == 200:
-                break
-        except Exception:
-            time.sleep(0.5)
-    else:
-        print("❌ ComfyUI failed to start.")
+    COMFYUI_LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+    profiler = StartupProfiler(COMFYUI_LOG_PATH)
+    process = start_comfyui(profiler)
+    profile = profiler.wait_ready(
+        f"http://127.0.0.1:{COMFY_PORT}",
+        ReadinessProbe(timeout=STARTUP_TIMEOUT),
+    )
+    print_startup_profile(profile)
+    if not profile.ready:
+        for line in profiler.log_tail:
+            print(f"   | {line}")
         clean()
         sys.exit(1)
-    elapsed = time.time() - start
-    print(f"🚀 ComfyUI started in {elapsed:.2f} seconds")
-    return process
+    return process, profile
+
+def run_warm_iteration(runner, json_file, iteration):
+    """Submit one workflow to the already running ComfyUI and time it.
+
+    The seed is offset by the iteration so ComfyUI's node cache does not
+    turn repeated runs of the same workflow into no-ops.
+    """
+    workflow = json.loads(Path(json_file).read_text(encoding="utf-8"))
+    for node in workflow.values():
+        inputs = node.get("inputs", {})
+        for key in ("seed", "noise_seed"):
+            if isinstance(inputs.get(key), int):
+                inputs[key] += iteration
+
+    start = time.perf_counter()
+    prompt_id, completion = runner.run_workflow(workflow, timeout=120)
+    if completion.error:
+        raise RuntimeError(completion.error)
+    for img in completion.images:
+        filename = img.get("filename")
+        if filename:
+            runner.save_image(filename, OUTPUT_IMAGES_DIR / filename, img.get("subfolder", ""))
+    return time.perf_counter() - start
+
+def summarize_latencies(latencies):
+    """Mean/median/min/max of a list of per-image latencies in seconds"""
+    if not latencies:
+        return {"images": 0}
+    ordered = sorted(latencies)
+    mid = len(ordered) // 2
+    median = ordered[mid] if len(ordered) % 2 else (ordered[mid - 1] + ordered[mid]) / 2
+    return {
+        "images": len(ordered),
+        "mean": sum(ordered) / len(ordered),
+        "median": median,
+        "min": ordered[0],
+        "max": ordered[-1],
+    }
+
+def write_benchmark_summary(startup, latencies, mode, http=None, telemetry=None):
+    """Report cold start separately from steady-state per-image latency
+
+    startup: StartupProfile of the ComfyUI launch
+    http: HTTP latency counters of the warm runner's client, if any
+    telemetry: peak/mean GPU and host metrics over the benchmark loop, if sampled
+    """
+    startup_seconds = startup.total
+    summary = {
+        "mode": mode,
+        "cold_start": startup.to_dict(),
+        "first_image_seconds": latencies[0] if latencies else None,
+        "steady_state": summarize_latencies(latencies[1:]),
+        "per_image_seconds": latencies,
+    }
+    if http:
+        summary["http"] = http
+    if telemetry:
+        summary["telemetry"] = telemetry
+    BENCHMARK_SUMMARY_PATH.parent.mkdir(parents=True, exist_ok=True)
+    BENCHMARK_SUMMARY_PATH.write_text(json.dumps(summary, indent=2))
+
+    steady = summary["steady_state"]
+    print(f"🧊 Cold start: {startup_seconds:.2f}s")
+    if latencies:
+        print(f"🥇 First image (includes model load): {latencies[0]:.2f}s")
+    if steady["images"]:
+        print(f"🔥 Steady state: {steady['images']} images, median {steady['median']:.2f}s, mean {steady['mean']:.2f}s")
+    return summary
 
 def get_gpu_info():
     import platform
@@ -172,11 +244,27 @@ def main():
     download_recommended_models()
     get_gpu_info()
 
-    process = measure_startup_time()
-    print("🧠 Placeholder: Load checkpoints into memory...")
+    process, startup = measure_startup_time()
+
+    sampler = None
+    if TELEMETRY_INTERVAL > 0:
+        from aicubench.compare.telemetry import HostSource, NvidiaSmiSource, TelemetrySampler
+        # Host metrics track the ComfyUI process, not this driver
+        sampler = TelemetrySampler(
+            [NvidiaSmiSource(TELEMETRY_INTERVAL), HostSource(pid=process.pid)], TELEMETRY_INTERVAL
+        ).start()
+
+    runner = None
+    if not COLD_SUBPROCESS:
+        from aicubench.compare.runner import ComparisonRunner
+        runner = ComparisonRunner(
+            comfyui_url=f"http://127.0.0.1:{COMFY_PORT}",
+            output_dir=OUTPUT_IMAGES_DIR,
+            verbose=False,
+        )
 
-    import requests
     last_success = ""
+    latencies = []
 
     for i in range(100):
         json_file = WORKFLOW_DIR / f"sd15-{i:02}.json"
@@ -188,14 +276,41 @@ def main():
                 print(f"❌ JSON file not found and no fallback available: {json_file.name}")
                 continue
 
+        if runner is not None:
+            print(f"🧠 Running {json_file.name} on warm server (iteration {i})...")
+            try:
+                latency = run_warm_iteration(runner, json_file, i)
+                latencies.append(latency)
+                print(f"🖼️ Done in {latency:.2f} seconds")
+                LAST_SUCCESS_PATH.write_text(json_file.name)
+                last_success = str(json_file)
+            except Exception as e:
+                print(f"❌ Benchmark iteration failed: {e}")
+            continue
+
         print(f"🧠 Launching benchmark script for {json_file.name}...")
         try:
+            start = time.perf_counter()
             subprocess.run(["python", "scripts/generate_sd15.py", "--json", str(json_file)], check=True)
+            latencies.append(time.perf_counter() - start)
             LAST_SUCCESS_PATH.write_text(json_file.name)
             last_success = str(json_file)
         except subprocess.CalledProcessError as e:
             print(f"❌ Benchmark subprocess failed: {e}")
 
+    http = None
+    if runner is not None:
+        http = runner.http.stats()
+        runner.close()
+    telemetry = None
+    if sampler is not None:
+        sampler.stop()
+        telemetry = sampler.summary()
+        sampler.export(TELEMETRY_PATH)
+    summary = write_benchmark_summary(startup, latencies, "cold-subprocess" if COLD_SUBPROCESS else "warm", http, telemetry)
+    # Spooled before submitting, so a failed upload is retried by the next submission
+    spool_benchmark_summary(SubmissionSpool(SPOOL_DIR), summary, GPU_INFO_PATH.parent)
+
     print("🛑 Shutting down ComfyUI...")
     process.terminate()
     try:
@@ -203,7 +318,7 @@ def main():
     except subprocess.TimeoutExpired:
         process.kill()
 
-    print("📤 Submitting benchmark results to GAS...")
+    print("📤 Submitting spooled benchmark results...")
     try:
         subprocess.run(["python", "scripts/submit_result.py"], check=True)
     except subprocess.CalledProcessError as e:
@@ -0,0 +1,300 @@
+"""
+Local submission spool: results are written to disk as they complete and
+sent to the collection endpoint later, in batches, surviving lost connectivity
+"""
+import gzip
+import hashlib
+import json
+import os
+import platform
+import random
+import time
+import urllib.error
+import urllib.request
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+SPOOL_DIR = Path("Artifacts/spool")
+DEFAULT_ENDPOINT = "https://script.google.com/macros/s/AKfycbzgjRG-ebQxZDF6sdJwCGGZj3JMYF8nqNYQ4dCvMHuxlm8AKxp1zI_-N2NSVMB4eoG9/exec"
+
+# Endpoints that only take one flat JSON object per POST (Apps Script doPost)
+FLAT_HOSTS = ("script.google.com",)
+FLAT_SCHEMA = "1.1"
+BATCH_SCHEMA = "2.0"
+
+
+def flatten_dict(d: Dict[str, Any], parent_key: str = "", sep: str = ".") -> Dict[str, Any]:
+    items = []
+    for k, v in d.items():
+        new_key = f"{parent_key}{sep}{k}" if parent_key else k
+        if isinstance(v, dict):
+            items.extend(flatten_dict(v, new_key, sep=sep).items())
+        else:
+            items.append((new_key, v))
+    return dict(items)
+
+
+def content_key(payload: Any) -> str:
+    """Stable key of a payload, so the same result spooled twice is one record"""
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _record_id(key: str) -> str:
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"aicubench:{key}"))
+
+
+class SubmissionSpool:
+    """Directory of records waiting to be submitted, one JSON file each
+
+    Records are written atomically (temp file + rename), so a runner can
+    append while a submitter drains. A record's state lives beside it:
+    `<id>.submitted` once the endpoint accepted it, `<id>.rejected` if the
+    endpoint refused it for good. Record ids double as idempotency keys.
+    """
+
+    def __init__(self, directory: Path = SPOOL_DIR):
+        self.directory = Path(directory)
+
+    def _path(self, record_id: str, suffix: str = ".json") -> Path:
+        return self.directory / f"{record_id}{suffix}"
+
+    def contains(self, key: str) -> bool:
+        return self._path(_record_id(key)).exists()
+
+    def append(self, kind: str, payload: Dict[str, Any], key: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Spool a payload; returns the record, or None if `key` was already spooled"""
+        record_id = _record_id(key) if key else str(uuid.uuid4())
+        path = self._path(record_id)
+        if path.exists():
+            return None
+        record = {
+            "id": record_id,
+            "kind": kind,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "host": platform.node(),
+            "payload": payload,
+        }
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.directory / f".{record_id}.tmp"
+        tmp.write_text(json.dumps(record, indent=2, default=str))
+        os.replace(tmp, path)
+        return record
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Records neither submitted nor rejected, oldest first"""
+        if not self.directory.exists():
+            return []
+        records = []
+        for path in self.directory.glob("*.json"):
+            if path.with_suffix(".submitted").exists() or path.with_suffix(".rejected").exists():
+                continue
+            try:
+                records.append(json.loads(path.read_text()))
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"⚠️ Skipping unreadable spool record {path.name}: {e}")
+        return sorted(records, key=lambda r: (r.get("created_at", ""), r["id"]))
+
+    def mark_submitted(self, record: Dict[str, Any], detail: str = ""):
+        self._path(record["id"], ".submitted").write_text(f"{time.strftime('%Y-%m-%dT%H:%M:%S')} {detail}".strip())
+
+    def mark_rejected(self, record: Dict[str, Any], detail: str):
+        self._path(record["id"], ".rejected").write_text(f"{time.strftime('%Y-%m-%dT%H:%M:%S')} {detail}")
+
+    def counts(self) -> Dict[str, int]:
+        if not self.directory.exists():
+            return {"pending": 0, "submitted": 0, "rejected": 0}
+        submitted = len(list(self.directory.glob("*.submitted")))
+        rejected = len(list(self.directory.glob("*.rejected")))
+        total = len(list(self.directory.glob("*.json")))
+        return {"pending": total - submitted - rejected, "submitted": submitted, "rejected": rejected}
+
+
+def benchmark_payload(summary: Dict[str, Any], artifacts_dir: Path = Path("Artifacts")) -> Dict[str, Any]:
+    """A benchmark summary with the GPU info and last workflow the submission carries"""
+    payload = dict(summary)
+    gpu_info = artifacts_dir / "gpu_info.json"
+    if gpu_info.exists() and gpu_info.stat().st_size > 0:
+        try:
+            payload["gpu_info"] = json.loads(gpu_info.read_text(encoding="utf-8"))
+        except json.JSONDecodeError as e:
+            print(f"⚠️ Failed to parse gpu_info.json: {e}")
+    else:
+        print("⚠️ gpu_info.json is missing or empty.")
+    last_success = artifacts_dir / "last_success.json"
+    if last_success.exists() and last_success.stat().st_size > 0:
+        # main.py writes the bare workflow file name; older runs wrote {"workflow": ...}
+        text = last_success.read_text(encoding="utf-8").strip()
+        try:
+            last = json.loads(text)
+            payload["last_prompt"] = last.get("workflow") if isinstance(last, dict) else last
+        except json.JSONDecodeError:
+            payload["last_prompt"] = text
+    return payload
+
+
+def spool_benchmark_summary(
+    spool: SubmissionSpool, summary: Dict[str, Any], artifacts_dir: Path = Path("Artifacts")
+) -> Optional[Dict[str, Any]]:
+    """Spool a benchmark summary once; keyed by its content, so re-spooling is a no-op"""
+    key = content_key(summary)
+    if spool.contains(key):
+        return None
+    return spool.append("benchmark_summary", benchmark_payload(summary, artifacts_dir), key=key)
+
+
+@dataclass
+class SubmitPolicy:
+    """How records are sent and how hard a failed send is retried
+
+    Connection errors, 408, 429 and 5xx are retried with exponential
+    backoff and jitter, honouring Retry-After. Other 4xx responses are
+    final: the batch is split until the refused record is isolated and
+    marked rejected, so one bad record does not block the rest.
+    """
+    batch_size: int = 50
+    compress: bool = True
+    retries: int = 5
+    backoff: float = 1.0
+    backoff_max: float = 60.0
+    timeout: float = 30.0
+    statuses: Tuple[int, ...] = (408, 429, 500, 502, 503, 504)
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        wait = min(self.backoff * 2 ** attempt, self.backoff_max) * random.uniform(0.5, 1.0)
+        if retry_after is not None:
+            wait = max(wait, min(retry_after, self.backoff_max))
+        return wait
+
+
+@dataclass
+class DrainReport:
+    submitted: int = 0
+    rejected: int = 0
+    remaining: int = 0
+    requests: int = 0
+    retries: int = 0
+    error: Optional[str] = None
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_flat(endpoint: str, fmt: str) -> bool:
+    if fmt != "auto":
+        return fmt == "flat"
+    host = urlparse(endpoint).hostname or ""
+    return any(host == h or host.endswith("." + h) for h in FLAT_HOSTS)
+
+
+def encode_batch(records: List[Dict[str, Any]], flat: bool, compress: bool) -> Tuple[bytes, Dict[str, str]]:
+    """Request body and headers for a batch (flat: exactly one record)"""
+    if flat:
+        record = records[0]
+        data = dict(record["payload"])
+        data.update(uuid=record["id"], timestamp=record["created_at"], schema_version=FLAT_SCHEMA)
+        body = json.dumps(flatten_dict(data), default=str).encode()
+        return body, {"Content-Type": "application/json", "Idempotency-Key": record["id"]}
+
+    batch_id = str(uuid.uuid5(uuid.NAMESPACE_URL, "aicubench-batch:" + ",".join(r["id"] for r in records)))
+    body = json.dumps({"schema_version": BATCH_SCHEMA, "batch_id": batch_id, "records": records}, default=str).encode()
+    headers = {"Content-Type": "application/json", "Idempotency-Key": batch_id}
+    if compress:
+        body = gzip.compress(body)
+        headers["Content-Encoding"] = "gzip"
+    return body, headers
+
+
+def _post(endpoint: str, body: bytes, headers: Dict[str, str], policy: SubmitPolicy, report: DrainReport) -> Tuple[Optional[int], str]:
+    """POST with retries; (status, detail), status None when the endpoint was never reached"""
+    status: Optional[int] = None
+    detail = ""
+    for attempt in range(policy.retries + 1):
+        if attempt:
+            report.retries += 1
+        retry_after = None
+        report.requests += 1
+        try:
+            request = urllib.request.Request(endpoint, data=body, headers=headers, method="POST")
+            with urllib.request.urlopen(request, timeout=policy.timeout) as response:
+                return response.status, response.read(200).decode("utf-8", "replace")
+        except urllib.error.HTTPError as e:
+            status, detail = e.code, e.read(200).decode("utf-8", "replace")
+            if status not in policy.statuses:
+                return status, detail
+            retry_after = _retry_after(e.headers.get("Retry-After"))
+        except (urllib.error.URLError, OSError) as e:
+            status, detail = None, str(getattr(e, "reason", e))
+        if attempt < policy.retries:
+            wait = policy.delay(attempt, retry_after)
+            print(f"⚠️ Submission failed ({status or detail}); retrying in {wait:.1f}s")
+            time.sleep(wait)
+    return status, detail
+
+
+def drain(
+    spool: SubmissionSpool,
+    endpoint: str = DEFAULT_ENDPOINT,
+    policy: Optional[SubmitPolicy] = None,
+    fmt: str = "auto",
+) -> DrainReport:
+    """Submit every pending record; stops at the first batch that exhausts its retries
+
+    fmt: "batch" (records in one gzip JSON body per batch), "flat" (one
+    flattened record per POST, for Apps Script), or "auto" by endpoint host.
+    Resending an accepted batch is harmless: the endpoint dedupes on the
+    record ids and the Idempotency-Key header.
+    """
+    policy = policy or SubmitPolicy()
+    report = DrainReport()
+    flat = _is_flat(endpoint, fmt)
+    size = 1 if flat else max(policy.batch_size, 1)
+    records = spool.pending()
+    batches = [records[i:i + size] for i in range(0, len(records), size)]
+    while batches:
+        batch = batches.pop(0)
+        body, headers = encode_batch(batch, flat, policy.compress)
+        status, detail = _post(endpoint, body, headers, policy, report)
+        if status is not None and 200 <= status < 300:
+            for record in batch:
+                spool.mark_submitted(record, str(status))
+            report.submitted += len(batch)
+        elif status is not None and status not in policy.statuses:
+            if len(batch) > 1:
+                half = len(batch) // 2
+                batches[:0] = [batch[:half], batch[half:]]
+            else:
+                spool.mark_rejected(batch[0], f"{status} {detail}")
+                report.rejected += 1
+                print(f"❌ Record {batch[0]['id']} rejected with status {status}: {detail}")
+        else:
+            report.error = f"status {status}: {detail}" if status else detail
+            break
+    report.remaining = len(spool.pending())
+    return report
+
+
+def print_drain(report: DrainReport, endpoint: str):
+    if report.submitted:
+        print(f"✅ Submitted {report.submitted} record(s) to {endpoint} in {report.requests} request(s)")
+    if report.rejected:
+        print(f"❌ {report.rejected} record(s) rejected; see the .rejected files in the spool")
+    if report.remaining:
+        reason = f" ({report.error})" if report.error else ""
+        print(f"📥 {report.remaining} record(s) left in the spool for the next submission{reason}")
+    elif not (report.submitted or report.rejected):
+        print("ℹ️ Nothing to submit.")
@@ -0,0 +1,182 @@
+"""
+ComfyUI startup profiling from the child's log stream
+"""
+import os
+import re
+import subprocess
+import threading
+import time
+import urllib.request
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Log lines marking the end of each startup phase, in order. The first
+# pattern that matches a line sets that mark; later matches are ignored.
+STARTUP_MARKS = [
+    ("python_start", re.compile(r"Python version|ComfyUI startup time|Checkpoint files will")),
+    ("torch_ready", re.compile(r"pytorch version|Total VRAM|^Device: ")),
+    ("nodes_loaded", re.compile(r"Import times for custom nodes|Starting server")),
+    ("listening", re.compile(r"To see the GUI go to")),
+]
+
+# Phase name -> (mark it starts at, mark it ends at)
+STARTUP_PHASES = {
+    "interpreter": ("spawn", "python_start"),
+    "torch_import": ("python_start", "torch_ready"),
+    "custom_nodes": ("torch_ready", "nodes_loaded"),
+    "server_start": ("nodes_loaded", "listening"),
+    "readiness": ("listening", "ready"),
+}
+
+
+@dataclass
+class ReadinessProbe:
+    """How to poll the server until it answers
+
+    Waits start at `initial` seconds and grow by `factor` up to `max_interval`,
+    so a fast start is seen quickly without hammering a slow one.
+    """
+    path: str = "/system_stats"
+    timeout: float = 300.0
+    initial: float = 0.05
+    factor: float = 1.5
+    max_interval: float = 1.0
+    request_timeout: float = 2.0
+
+
+@dataclass
+class StartupProfile:
+    """Monotonic timestamps of each startup mark, relative to spawn"""
+    marks: Dict[str, float] = field(default_factory=dict)
+    ready: bool = False
+    error: Optional[str] = None
+
+    @property
+    def total(self) -> Optional[float]:
+        return self.marks.get("ready")
+
+    def phases(self) -> Dict[str, float]:
+        """Seconds per phase; a phase with a missing mark is folded into the next one"""
+        phases = {}
+        previous = "spawn"
+        for name, (_, end) in STARTUP_PHASES.items():
+            if end in self.marks:
+                phases[name] = self.marks[end] - self.marks.get(previous, 0.0)
+                previous = end
+        return phases
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "startup_seconds": self.total,
+            "ready": self.ready,
+            "error": self.error,
+            "marks": self.marks,
+            "phases": self.phases(),
+        }
+
+
+class StartupProfiler:
+    """Launch ComfyUI, timestamp its startup log lines and probe readiness.
+
+    The child's stdout and stderr are merged and drained by a reader
+    thread (also keeping the pipe from filling up and stalling ComfyUI),
+    and optionally teed to a log file.
+    """
+
+    def __init__(self, log_path: Optional[Path] = None, echo: bool = False):
+        self.log_path = Path(log_path) if log_path else None
+        self.echo = echo
+        self.profile = StartupProfile()
+        self.process: Optional[subprocess.Popen] = None
+        self._spawned_at = 0.0
+        self._listening = threading.Event()
+        self._tail: List[str] = []
+
+    def start(self, cmd: List[str], cwd: Optional[str] = None) -> subprocess.Popen:
+        env = {**os.environ, "PYTHONUNBUFFERED": "1"}
+        self._spawned_at = time.monotonic()
+        self.profile.marks["spawn"] = 0.0
+        self.process = subprocess.Popen(
+            cmd,
+            cwd=cwd,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors="replace",
+            bufsize=1,
+        )
+        threading.Thread(target=self._read_log, daemon=True).start()
+        return self.process
+
+    def _mark(self, name: str):
+        if name not in self.profile.marks:
+            self.profile.marks[name] = time.monotonic() - self._spawned_at
+
+    def _read_log(self):
+        log = open(self.log_path, "a", encoding="utf-8") if self.log_path else None
+        try:
+            for line in self.process.stdout:
+                for name, pattern in STARTUP_MARKS:
+                    if name not in self.profile.marks and pattern.search(line):
+                        self._mark(name)
+                        if name == "listening":
+                            self._listening.set()
+                        break
+                self._tail = (self._tail + [line.rstrip()])[-20:]
+                if log:
+                    log.write(line)
+                    log.flush()
+                if self.echo:
+                    print(line, end="")
+        finally:
+            if log:
+                log.close()
+
+    def wait_ready(self, base_url: str, probe: Optional[ReadinessProbe] = None) -> StartupProfile:
+        """Poll base_url + probe.path until it answers 200, the child exits or the timeout passes"""
+        probe = probe or ReadinessProbe()
+        url = base_url.rstrip("/") + probe.path
+        deadline = self._spawned_at + probe.timeout
+        interval = probe.initial
+
+        while True:
+            try:
+                with urllib.request.urlopen(url, timeout=probe.request_timeout) as resp:
+                    if resp.status == 200:
+                        self._mark("ready")
+                        self.profile.ready = True
+                        return self.profile
+            except Exception:
+                pass
+
+            if self.process is not None and self.process.poll() is not None:
+                self.profile.error = f"ComfyUI exited with code {self.process.returncode}"
+                return self.profile
+            if time.monotonic() >= deadline:
+                self.profile.error = f"not ready after {probe.timeout:.0f}s"
+                return self.profile
+
+            wait = min(interval, max(deadline - time.monotonic(), 0))
+            if self._listening.is_set():
+                time.sleep(wait)
+            elif self._listening.wait(wait):
+                # The listening line means the socket is up: probe right away
+                interval = probe.initial
+                continue
+            interval = min(interval * probe.factor, probe.max_interval)
+
+    @property
+    def log_tail(self) -> List[str]:
+        """Last lines the child printed, for error reports"""
+        return list(self._tail)
+
+
+def print_startup_profile(profile: StartupProfile):
+    if profile.ready:
+        print(f"🚀 ComfyUI ready in {profile.total:.2f} seconds")
+    else:
+        print(f"❌ ComfyUI failed to start: {profile.error}")
+    for name, seconds in profile.phases().items():
+        print(f"   {name:<14} {seconds:6.2f}s")
@@ -3,35 +3,40 @@ import os
 import sys
 import time
 import json
-import requests
 import argparse
 from pathlib import Path
 
+# Runs as `python scripts/generate_sd15.py` from the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from aicubench.compare.client import ComfyClient, ComfyHTTPError  # noqa: E402
+from aicubench.startup import ReadinessProbe, StartupProfiler, print_startup_profile  # noqa: E402
+
 COMFY_PORT = int(os.environ.get("COMFY_PORT", "8188"))
 DEFAULT_JSON = "3939API.json"
 COMFY_URL = f"http://127.0.0.1:{COMFY_PORT}"
 COMFY_DIR = os.environ.get("COMFY_DIR", "./ComfyUI")
+STARTUP_TIMEOUT = float(os.environ.get("AICUBENCH_STARTUP_TIMEOUT", "300"))
+
+# One keep-alive connection pool for queueing, polling and downloads
+client = ComfyClient(COMFY_URL)
+profiler = StartupProfiler()
 
 def start_comfyui():
     print("🚀 Starting ComfyUI headless server...")
-    return subprocess.Popen(
+    return profiler.start(
         ["python", "main.py", "--listen", "127.0.0.1", "--port", str(COMFY_PORT)],
         cwd=COMFY_DIR,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
     )
 
-def wait_for_comfyui(timeout=20):
+def wait_for_comfyui(timeout=STARTUP_TIMEOUT):
     print("⏳ Waiting for ComfyUI to be ready...")
-    for _ in range(timeout * 2):
-        try:
-            r = requests.get(f"{COMFY_URL}")
-            if r.status_code == 200:
-                print("✅ ComfyUI is ready.")
-                return True
-        except Exception:
-            time.sleep(0.5)
-    print("❌ ComfyUI did not become ready in time.")
+    profile = profiler.wait_ready(COMFY_URL, ReadinessProbe(timeout=timeout))
+    if profile.ready:
+        print("✅ ComfyUI is ready.")
+        print_startup_profile(profile)
+        return True
+    print(f"❌ ComfyUI did not become ready in time: {profile.error}")
     return False
 
 def queue_prompt(prompt):
@@ -39,10 +44,9 @@ def queue_prompt(prompt):
     print("📤 Sending prompt to ComfyUI...")
     print(f"📤 Payload preview (truncated): {json.dumps(payload)[:500]}")
     try:
-        r = requests.post(f"{COMFY_URL}/prompt", json=payload)
-        print(f"📬 Status: {r.status_code}")
-        print(r.text)
-        return r
+        resp_json = client.post_json("/prompt", payload)
+        print(f"📬 Response: {json.dumps(resp_json)}")
+        return resp_json
     except Exception as e:
         print(f"❌ Failed to send prompt: {e}")
         return None
@@ -52,14 +56,12 @@ def wait_for_completion(prompt_id, timeout=120, poll_interval=2):
     elapsed = 0
     while elapsed < timeout:
         try:
-            r = requests.get(f"{COMFY_URL}/history/{prompt_id}")
-            if r.status_code == 200:
-                data = r.json()
-                if "outputs" in data.get(prompt_id, {}):
-                    print("✅ Prompt processing completed.")
-                    return data
-            else:
-                print(f"⚠️ Unexpected status code {r.status_code} while polling.")
+            data = client.get_json(f"/history/{prompt_id}")
+            if "outputs" in data.get(prompt_id, {}):
+                print("✅ Prompt processing completed.")
+                return data
+        except ComfyHTTPError as e:
+            print(f"⚠️ Unexpected status code {e.status} while polling.")
         except Exception as e:
             print(f"⚠️ Error while polling for completion: {e}")
         time.sleep(poll_interval)
@@ -87,14 +89,13 @@ def download_images(history_data):
                         "subfolder": subfolder,
                         "type": folder_type,
                     }
-                    r = requests.get(f"{COMFY_URL}/view", params=params)
-                    if r.status_code == 200:
-                        image_path = output_dir / filename
-                        with open(image_path, "wb") as f:
-                            f.write(r.content)
-                        images_saved += 1
-                    else:
-                        print(f"⚠️ Failed to download {filename}, status code {r.status_code}")
+                    content = client.get("/view", params)
+                    image_path = output_dir / filename
+                    with open(image_path, "wb") as f:
+                        f.write(content)
+                    images_saved += 1
+                except ComfyHTTPError as e:
+                    print(f"⚠️ Failed to download {filename}, status code {e.status}")
                 except Exception as e:
                     print(f"⚠️ Error downloading {filename}: {e}")
     return images_saved
@@ -116,10 +117,9 @@ def main():
     proc = start_comfyui()
     try:
         if wait_for_comfyui():
-            response = queue_prompt(prompt)
-            if response is not None:
+            resp_json = queue_prompt(prompt)
+            if resp_json is not None:
                 try:
-                    resp_json = response.json()
                     prompt_id = resp_json.get("prompt_id")
                     if prompt_id:
                         history_data = wait_for_completion(prompt_id)
@@ -127,6 +127,7 @@ def main():
                             images_saved = download_images(history_data)
                             elapsed_time = time.time() - start_time
                             print(f"🖼️ Saved {images_saved} image(s) in {elapsed_time:.2f} seconds.")
+                            print(f"📡 HTTP: {json.dumps(client.stats())}")
                         else:
                             print("❌ No history data received.")
                     else:
@@ -134,6 +135,7 @@ def main():
                 except Exception as e:
                     print(f"❌ Failed to process response JSON: {e}")
     finally:
+        client.close()
         print("🛑 Shutting down ComfyUI...")
         proc.terminate()
         try:
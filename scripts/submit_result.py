@@ -1,79 +1,52 @@
-import os
+import argparse
 import json
-import requests
+import os
+import sys
 from pathlib import Path
-from datetime import datetime
-import uuid
 
-ARTIFACTS_DIR = Path("Artifacts")
-BENCHMARK_LOG = ARTIFACTS_DIR / "benchmark_summary.json"
-GPU_INFO_FILE = ARTIFACTS_DIR / "gpu_info.json"
-LAST_SUCCESS_FILE = ARTIFACTS_DIR / "last_success.json"
-SUBMIT_MARKER = ARTIFACTS_DIR / ".submitted"
-GAS_ENDPOINT = os.environ.get("GAS_ENDPOINT", "https://script.google.com/macros/s/AKfycbzgjRG-ebQxZDF6sdJwCGGZj3JMYF8nqNYQ4dCvMHuxlm8AKxp1zI_-N2NSVMB4eoG9/exec")
+# Runs as `python scripts/submit_result.py` from the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
+from aicubench.spool import (  # noqa: E402
+    DEFAULT_ENDPOINT,
+    SPOOL_DIR,
+    SubmissionSpool,
+    SubmitPolicy,
+    drain,
+    print_drain,
+    spool_benchmark_summary,
+)
 
-def flatten_dict(d, parent_key='', sep='.'):
-    items = []
-    for k, v in d.items():
-        new_key = f"{parent_key}{sep}{k}" if parent_key else k
-        if isinstance(v, dict):
-            items.extend(flatten_dict(v, new_key, sep=sep).items())
-        else:
-            items.append((new_key, v))
-    return dict(items)
+ARTIFACTS_DIR = Path("Artifacts")
+BENCHMARK_LOG = ARTIFACTS_DIR / "benchmark_summary.json"
+GAS_ENDPOINT = os.environ.get("GAS_ENDPOINT", DEFAULT_ENDPOINT)
 
 
 def submit_to_gas():
-    if not BENCHMARK_LOG.exists():
-        print(f"❌ Benchmark result not found: {BENCHMARK_LOG}")
-        return
-
-    if SUBMIT_MARKER.exists():
-        print("ℹ️ Submission already completed. Skipping.")
-        return
-
-    with open(BENCHMARK_LOG, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    submission_id = str(uuid.uuid5(uuid.NAMESPACE_DNS, f"{os.uname().nodename}-{datetime.utcnow().isoformat()}"))
-    data['uuid'] = submission_id
-
-    if GPU_INFO_FILE.exists() and GPU_INFO_FILE.stat().st_size > 0:
+    parser = argparse.ArgumentParser(description="Submit spooled benchmark results")
+    parser.add_argument("--endpoint", default=GAS_ENDPOINT, help="Collection endpoint (default: $GAS_ENDPOINT)")
+    parser.add_argument("--spool", default=str(SPOOL_DIR), help=f"Spool directory (default: {SPOOL_DIR})")
+    parser.add_argument("--batch-size", type=int, default=50, help="Records per request (default: 50)")
+    parser.add_argument("--format", choices=["auto", "batch", "flat"], default="auto",
+                        help="batch: gzip JSON batches; flat: one flattened record per POST (auto: flat for Apps Script)")
+    parser.add_argument("--retries", type=int, default=5, help="Retries per request (default: 5)")
+    args = parser.parse_args()
+
+    spool = SubmissionSpool(Path(args.spool))
+    # Summaries written before the spool existed, or by runs that did not spool them
+    if BENCHMARK_LOG.exists():
         try:
-            with open(GPU_INFO_FILE, 'r', encoding='utf-8') as gf:
-                gpu_info = json.load(gf)
-                data['gpu_info'] = gpu_info
+            summary = json.loads(BENCHMARK_LOG.read_text(encoding="utf-8"))
+            if spool_benchmark_summary(spool, summary, ARTIFACTS_DIR):
+                print(f"📥 Spooled {BENCHMARK_LOG}")
         except json.JSONDecodeError as e:
-            print(f"⚠️ Failed to parse gpu_info.json: {e}")
-    else:
-        print("⚠️ GPU_INFO_FILE is missing or empty.")
-
-    if LAST_SUCCESS_FILE.exists() and LAST_SUCCESS_FILE.stat().st_size > 0:
-        try:
-            with open(LAST_SUCCESS_FILE, 'r', encoding='utf-8') as lf:
-                last_prompt = json.load(lf)
-                data['last_prompt'] = last_prompt.get("workflow")
-        except json.JSONDecodeError as e:
-            print(f"⚠️ Failed to parse last_success.json: {e}")
-    else:
-        print("⚠️ LAST_SUCCESS_FILE is missing or empty.")
-
-    data['timestamp'] = datetime.utcnow().isoformat()
-    data['schema_version'] = "1.1"
+            print(f"⚠️ Failed to parse {BENCHMARK_LOG}: {e}")
 
-    flat = flatten_dict(data)
-    print(f"🌐 Submitting to GAS ({GAS_ENDPOINT})...")
-    try:
-        response = requests.post(GAS_ENDPOINT, json=flat)
-        if response.status_code == 200:
-            print("✅ Submission successful.")
-            SUBMIT_MARKER.touch()
-        else:
-            print(f"⚠️ Submission failed with status {response.status_code}: {response.text}")
-    except Exception as e:
-        print(f"❌ Error submitting to GAS: {e}")
+    print(f"🌐 Submitting to {args.endpoint}...")
+    report = drain(spool, args.endpoint, SubmitPolicy(batch_size=args.batch_size, retries=args.retries), args.format)
+    print_drain(report, args.endpoint)
+    return 1 if report.remaining else 0
 
 
 if __name__ == "__main__":
-    submit_to_gas()
+    sys.exit(submit_to_gas())
@@ -10,6 +10,7 @@ setup(
         "transformers",
         "jinja2",
         "requests",
+        "aiohttp",
         "pillow",
         "psutil",
         "platformdirs"
@@ -0,0 +1,41 @@
+"""
+ModelDownloader against the fake file server
+"""
+import hashlib
+import os
+
+from aicubench.compare.fakeserver import FakeFileServer
+from aicubench.downloader import DownloadSpec, ModelDownloader, apply_hashes, load_hashes
+
+
+def serve_blob(tmp_path, size: int = 3 * 2**20) -> bytes:
+    models_dir = tmp_path / "models"
+    models_dir.mkdir()
+    blob = os.urandom(size)
+    (models_dir / "model.safetensors").write_bytes(blob)
+    return blob
+
+
+def test_dropped_connection_resumes_with_a_range_request(tmp_path):
+    blob = serve_blob(tmp_path)
+    hashes_path = tmp_path / "model_hashes.sha256"
+    hashes_path.write_text(f"{hashlib.sha256(blob).hexdigest()}  model.safetensors\n")
+    with FakeFileServer(tmp_path / "models", drop_after=2**21) as files:
+        spec = DownloadSpec(f"{files.url}/model.safetensors", tmp_path / "fetched" / "model.safetensors")
+        apply_hashes([spec], load_hashes(hashes_path))
+        report = ModelDownloader(max_files=1, backoff=0.01).download(spec)
+
+    assert report.status != "failed", report.error
+    assert spec.dest_path.read_bytes() == blob
+    assert any(r and not r.startswith("bytes=0-") for _, r in files.requests)
+
+
+def test_sha256_mismatch_is_rejected(tmp_path):
+    serve_blob(tmp_path)
+    with FakeFileServer(tmp_path / "models") as files:
+        spec = DownloadSpec(f"{files.url}/model.safetensors", tmp_path / "fetched" / "bad.safetensors", sha256="0" * 64)
+        report = ModelDownloader(max_files=1, backoff=0.01).download(spec)
+
+    assert report.status == "failed"
+    assert "sha256" in (report.error or "")
+    assert not spec.dest_path.exists()
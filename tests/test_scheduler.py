@@ -0,0 +1,31 @@
+"""
+MultiServerScheduler against the fake ComfyUI
+"""
+import socket
+from pathlib import Path
+
+from aicubench.compare.fakeserver import FakeComfyUI
+from aicubench.compare.scheduler import MultiServerScheduler
+
+WORKFLOW_DIR = Path(__file__).resolve().parent.parent / "workflows" / "api"
+
+
+def dead_url() -> str:
+    """URL of a port nothing listens on"""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{probe.getsockname()[1]}"
+
+
+def test_dead_server_is_retired_and_its_jobs_run_on_the_live_one(tmp_path):
+    with FakeComfyUI() as server:
+        scheduler = MultiServerScheduler([dead_url(), server.url], WORKFLOW_DIR, tmp_path, affinity=False)
+        try:
+            jobs = scheduler.runners[1].build_jobs(["sdxl"], "a red apple", "blurry", repeats=6)
+            results = scheduler.run_jobs(jobs)
+        finally:
+            scheduler.close()
+
+    assert len(results) == len(jobs)
+    assert all(r.success for r in results), [r.error for r in results if not r.success]
+    assert {r.server for r in results} == {server.url}